@@ -0,0 +1,30 @@
+"""
+Per-request config overhead: cached settings snapshot vs. re-parsing.
+
+Run with: python -m benchmarks.bench_config
+"""
+import timeit
+
+from .common import use_placeholder_env
+
+use_placeholder_env()
+
+from src.config import Settings, get_settings
+
+def _per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+def run_benchmark():
+    print("\n=== Settings access cost per call ===")
+    get_settings()  # load the snapshot once
+    
+    # What get_settings() did before: build and validate a new Settings()
+    reparse = _per_call_us(Settings, number=200)
+    cached = _per_call_us(get_settings, number=200_000)
+    
+    print(f"Re-parse on every call: {reparse:10.2f} us")
+    print(f"Cached snapshot:        {cached:10.3f} us")
+    print(f"Speedup:                {reparse / cached:10.0f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
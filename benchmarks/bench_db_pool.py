@@ -0,0 +1,81 @@
+"""
+Query latency through the async engine: pooled vs. a new connection per session.
+
+Run with: python -m benchmarks.bench_db_pool [--url postgresql://...] [--queries 200]
+
+Without --url a temporary SQLite file is used, where connecting is cheap;
+against remote Postgres each unpooled session pays the TCP, TLS and auth
+round trips.
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from .common import use_placeholder_env
+
+use_placeholder_env()
+
+from sqlalchemy import text
+
+from src.database.connection import create_async_db_engine
+
+async def _session_latencies(url: str, pooled: bool, queries: int, concurrency: int) -> List[float]:
+    """Seconds per session (checkout, one query, release)"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    
+    engine = create_async_db_engine(url, pooled=pooled)
+    sessions = async_sessionmaker(engine)
+    latencies = []
+    
+    async def one():
+        started = time.perf_counter()
+        async with sessions() as session:
+            await session.execute(text("SELECT 1"))
+        latencies.append(time.perf_counter() - started)
+    
+    try:
+        # Warm up; the pool opens its first connection here
+        await one()
+        latencies.clear()
+        for start in range(0, queries, concurrency):
+            await asyncio.gather(*(one() for _ in range(min(concurrency, queries - start))))
+    finally:
+        await engine.dispose()
+    return latencies
+
+def measure(url: str, queries: int = 200, concurrency: int = 4) -> Dict[str, Dict[str, float]]:
+    """Median and p95 session latency in ms, pooled and unpooled"""
+    results = {}
+    for name, pooled in (("pooled", True), ("unpooled", False)):
+        latencies = sorted(asyncio.run(_session_latencies(url, pooled, queries, concurrency)))
+        results[name] = {
+            "median_ms": statistics.median(latencies) * 1000,
+            "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        }
+    return results
+
+def run_benchmark(url: str, queries: int, concurrency: int):
+    print(f"\n=== Async engine, {queries} sessions of SELECT 1, {concurrency} concurrent ===")
+    print(f"{'engine':>10} {'median ms':>10} {'p95 ms':>10}")
+    for name, stats in measure(url, queries, concurrency).items():
+        print(f"{name:>10} {stats['median_ms']:>10.3f} {stats['p95_ms']:>10.3f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="database URL (default: a temporary SQLite file)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+    
+    if args.url:
+        run_benchmark(args.url, args.queries, args.concurrency)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            run_benchmark(f"sqlite:///{Path(directory) / 'bench.sqlite3'}", args.queries, args.concurrency)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Lead-signal matching: the old substring loop vs. the compiled matcher.
+
+Run with: python -m benchmarks.bench_lead_signals
+"""
+import random
+
+from .common import median_ms, time_calls, use_placeholder_env
+
+use_placeholder_env()
+
+from src.analytics.lead_signals import DEFAULT_SIGNALS, LeadSignalMatcher
+
+WORDS = (
+    "hi I am looking for a two bedroom apartment in the marina with sea view "
+    "what is the service charge and is there a payment plan available for it"
+).split()
+
+def _signals(count: int, rng: random.Random):
+    signals = dict(DEFAULT_SIGNALS)
+    while len(signals) < count:
+        length = rng.randint(4, 10)
+        signals["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(length))] = 1
+    return signals
+
+def _messages(count: int, rng: random.Random):
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 40))) for _ in range(count)]
+
+def run_benchmark():
+    rng = random.Random(1)
+    messages = _messages(1000, rng)
+    
+    print("\n=== Lead-signal matching, per 1000 messages ===")
+    print(f"{'signals':>8} {'any() loop ms':>14} {'all matches ms':>15} {'compiled ms':>12} {'compile ms':>11}")
+    for count in (6, 100, 1000, 10_000):
+        signals = _signals(count, rng)
+        terms = list(signals)
+        
+        # Old code: stop at the first hit (and find substrings inside words)
+        def any_loop():
+            for message in messages:
+                lowered = message.lower()
+                any(signal in lowered for signal in terms)
+        
+        # Same loop, but collecting every hit like the matcher does
+        def all_loop():
+            for message in messages:
+                lowered = message.lower()
+                [signal for signal in terms if signal in lowered]
+        
+        compile_ms = median_ms(time_calls(lambda: LeadSignalMatcher(signals), repeat=3))
+        matcher = LeadSignalMatcher(signals)
+        
+        def compiled():
+            for message in messages:
+                matcher.match(message)
+        
+        print(
+            f"{count:>8} {median_ms(time_calls(any_loop)):>14.2f} "
+            f"{median_ms(time_calls(all_loop)):>15.2f} "
+            f"{median_ms(time_calls(compiled)):>12.2f} {compile_ms:>11.1f}"
+        )
+
+if __name__ == "__main__":
+    run_benchmark()
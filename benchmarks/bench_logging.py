@@ -0,0 +1,76 @@
+"""
+Logging overhead per request, as seen by the request handler.
+
+A request logs what the webhook path logs: the inbound message, the
+(sampled) AI response and the outbound send. Output goes to a stream that
+takes 50us per write, like a stdout pipe whose reader is falling behind.
+
+Run with: python -m benchmarks.bench_logging
+"""
+import contextlib
+import logging
+import time
+
+from src.observability.log import configure_logging, shutdown_logging
+
+REQUESTS = 2_000
+BODY = "Looking for a 2BR in JVC, budget 1.2M"
+PHONE = "whatsapp:+971501234567"
+
+class SlowStream:
+    def __init__(self, delay: float = 50e-6):
+        self.delay = delay
+    
+    def write(self, text):
+        # Blocking I/O releases the GIL, so sleep rather than spin
+        time.sleep(self.delay)
+        return len(text)
+    
+    def flush(self):
+        pass
+
+def print_request(stream):
+    # What the handlers did before: synchronous prints
+    with contextlib.redirect_stdout(stream):
+        print(f"\nReceived Message:")
+        print(f"From: {PHONE}")
+        print(f"Message: {BODY}\n")
+        print(f"AI Response: {BODY}\n")
+        print(f"Message sent successfully: SM123")
+
+def log_request(logger):
+    logger.info("Received message", extra={"from_number": PHONE, "message_body": BODY})
+    logger.debug("AI response generated", extra={"reply": BODY})
+    logger.info("Message sent", extra={"message_id": "SM123", "to_number": PHONE})
+
+def _per_request_us(fn) -> float:
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        fn()
+    return (time.perf_counter() - started) / REQUESTS * 1e6
+
+def run_benchmark():
+    print("\n=== Logging cost per request (caller side) ===")
+    stream = SlowStream()
+    
+    printed = _per_request_us(lambda: print_request(stream))
+    
+    logger = logging.getLogger("bench")
+    sync_handler = logging.StreamHandler(stream)
+    root = logging.getLogger()
+    root.handlers[:] = [sync_handler]
+    root.setLevel(logging.INFO)
+    sync = _per_request_us(lambda: log_request(logger))
+    
+    configure_logging(level="DEBUG", debug_sample_rate=0.01, stream=stream)
+    queued = _per_request_us(lambda: log_request(logger))
+    flush_started = time.perf_counter()
+    shutdown_logging()
+    drained = (time.perf_counter() - flush_started) * 1000
+    
+    print(f"print():                 {printed:8.1f} us")
+    print(f"Synchronous handler:     {sync:8.1f} us")
+    print(f"Queue-backed JSON:       {queued:8.1f} us  (listener drained the rest in {drained:.0f} ms)")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,73 @@
+"""
+Cold start: import time of src.main and time until the server answers 200.
+
+Run with: python -m benchmarks.bench_startup
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import src.main; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_for_200(url: str, started: float, timeout: float = 30.0) -> float:
+    """Poll `url` until it answers 200, return ms since `started`"""
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return (time.perf_counter() - started) * 1000
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(f"{url} did not answer 200 within {timeout}s")
+
+def measure_import(runs: int = 5) -> list:
+    timings = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT
+        )
+        timings.append(float(output.decode().strip().splitlines()[-1]))
+    return timings
+
+def measure_first_200(runs: int = 3, path: str = "/") -> list:
+    timings = []
+    for _ in range(runs):
+        port = _free_port()
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.main:app",
+             "--port", str(port), "--log-level", "warning"],
+            cwd=ROOT,
+        )
+        try:
+            timings.append(_wait_for_200(f"http://127.0.0.1:{port}{path}", started))
+        finally:
+            server.terminate()
+            server.wait()
+    return timings
+
+def run_benchmark():
+    print("\n=== Cold start ===")
+    imports = measure_import()
+    first_200 = measure_first_200()
+    print(f"Import src.main:       median {statistics.median(imports):8.1f} ms  (min {min(imports):.1f})")
+    print(f"Spawn to first 200:    median {statistics.median(first_200):8.1f} ms  (min {min(first_200):.1f})")
+
+if __name__ == "__main__":
+    run_benchmark()
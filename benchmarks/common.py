@@ -0,0 +1,29 @@
+"""Helpers shared by the benchmark scripts"""
+import os
+import statistics
+import time
+from typing import Callable, List
+
+REQUIRED_ENV = (
+    "OPENAI_API_KEY", "WHATSAPP_API_TOKEN", "DATABASE_URL",
+    "WHATSAPP_PHONE_NUMBER_ID", "TWILIO_ACCOUNT_SID",
+    "TWILIO_AUTH_TOKEN", "TWILIO_WHATSAPP_NUMBER",
+)
+
+def use_placeholder_env(value: str = "bench") -> None:
+    """Fill required settings with placeholders so Settings() validates without a .env"""
+    for key in REQUIRED_ENV:
+        os.environ.setdefault(key, value)
+
+def time_calls(fn: Callable[[], object], repeat: int = 5, number: int = 1) -> List[float]:
+    """Seconds per call for `repeat` rounds of `number` calls each"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+    return timings
+
+def median_ms(timings: List[float]) -> float:
+    return statistics.median(timings) * 1000
@@ -0,0 +1,6 @@
+"""
+Load-testing harness: in-process fakes for OpenAI, Twilio and Pinecone plus
+an async load generator for the webhook endpoints.
+
+Run with: python -m benchmarks.loadtest --help
+"""
@@ -0,0 +1,147 @@
+"""
+End-to-end load test against fake OpenAI, Twilio and Pinecone services.
+
+The app runs in-process under uvicorn with its clients pointed at the fakes,
+so nothing leaves the machine. Example:
+
+    python -m benchmarks.loadtest --rps 50 --duration 20 \\
+        --openai-latency lognormal:900:0.5 --openai-error-rate 0.02
+
+Retrieval is not covered: the reply path (FAQ match, then the LLM) doesn't
+query the vector store, so the Pinecone fake sees no traffic and its
+latency and error settings have no effect on the results.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from ..common import use_placeholder_env
+from .fakes import FakeOpenAI, FakePinecone, FakeTwilio
+from .generator import LoadGenerator, LoadProfile
+
+# Fakes the reply path doesn't call yet; reported so empty stats aren't misread
+NOT_ON_REPLY_PATH = {"pinecone": "the reply path does not query the vector store"}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=20, help="conversations started per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--sms-share", type=float, default=0.1)
+    parser.add_argument("--burst-probability", type=float, default=0.3)
+    parser.add_argument("--retry-rate", type=float, default=0.05)
+    parser.add_argument("--openai-latency", default="lognormal:800:0.4")
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--twilio-latency", default="lognormal:150:0.3")
+    parser.add_argument("--twilio-error-rate", type=float, default=0.0)
+    parser.add_argument("--pinecone-latency", default="lognormal:40:0.3", help="no effect until replies use retrieval")
+    parser.add_argument("--pinecone-error-rate", type=float, default=0.0)
+    parser.add_argument("--debounce-ms", type=int, default=None, help="override DEBOUNCE_WINDOW_MS")
+    parser.add_argument("--settle", type=float, default=10, help="seconds to wait for outstanding replies")
+    parser.add_argument("--json", dest="json_path", help="also write results as JSON to this path")
+    return parser.parse_args(argv)
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _start_app(port: int):
+    import uvicorn
+    from src.main import app
+    
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="app", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("App failed to start")
+        time.sleep(0.01)
+    return server, thread
+
+def _print_report(results):
+    print("\n=== Load test ===")
+    print(f"Duration: {results['duration_s']} s")
+    print(f"{'endpoint':<30}{'requests':>10}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = dict(results["endpoints"])
+    rows["reply (message -> send)"] = results["reply_latency"]
+    for name, row in rows.items():
+        print(
+            f"{name:<30}{row['requests']:>10}{row['errors']:>8}{row['throughput_rps']:>9}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+        )
+    print(f"Users still waiting for a reply: {results['reply_latency']['unanswered_users']}")
+    print("\nFake provider calls:")
+    for name, stats in results["fakes"].items():
+        print(f"  {name:<10} requests={stats['requests']} errors={stats['errors']}")
+    for name, reason in results["not_covered"].items():
+        print(f"Not covered: {name} ({reason})")
+
+def main(argv=None):
+    args = parse_args(argv)
+    profile = LoadProfile(
+        rps=args.rps,
+        duration=args.duration,
+        users=args.users,
+        sms_share=args.sms_share,
+        burst_probability=args.burst_probability,
+        retry_rate=args.retry_rate,
+    )
+    port = _free_port()
+    generator = LoadGenerator(f"http://127.0.0.1:{port}", profile)
+    
+    fakes = {
+        "openai": FakeOpenAI(args.openai_latency, args.openai_error_rate, seed=2).start(),
+        "twilio": FakeTwilio(args.twilio_latency, args.twilio_error_rate, seed=3,
+                             on_message=generator.on_reply).start(),
+        "pinecone": FakePinecone(args.pinecone_latency, args.pinecone_error_rate, seed=4).start(),
+    }
+    
+    # Point the app's clients at the fakes before anything reads settings
+    use_placeholder_env("loadtest")
+    os.environ["OPENAI_BASE_URL"] = fakes["openai"].url + "/v1"
+    os.environ["PINECONE_INDEX_HOST"] = fakes["pinecone"].url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.debounce_ms is not None:
+        os.environ["DEBOUNCE_WINDOW_MS"] = str(args.debounce_ms)
+    
+    from src.api.messaging import get_message_provider
+    
+    server, thread = _start_app(port)
+    # Warm lazy clients the way a readiness probe would before traffic arrives
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=30):
+            pass
+    except urllib.error.HTTPError as e:
+        print(f"Warning: /ready answered {e.code}: {e.read().decode()}")
+    # The Twilio client has no base URL setting; redirect its API domain
+    get_message_provider().client.api.base_url = fakes["twilio"].url
+    
+    try:
+        results = asyncio.run(generator.run(settle=args.settle))
+    finally:
+        server.should_exit = True
+        thread.join(timeout=30)
+        for fake in fakes.values():
+            fake.stop()
+    
+    results["fakes"] = {name: fake.stats() for name, fake in fakes.items()}
+    results["not_covered"] = {
+        name: reason for name, reason in NOT_ON_REPLY_PATH.items() if not results["fakes"][name]["requests"]
+    }
+    results["profile"] = vars(args)
+    _print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,304 @@
+"""
+In-process HTTP fakes for the external APIs on the reply path.
+
+Each fake listens on a local port, delays every request according to its
+LatencyModel and fails a configurable fraction of them, so the app can be
+load-tested against realistic (or pathological) provider behaviour.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from abc import ABC, abstractmethod
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+
+class LatencyModel:
+    """
+    Latency distribution, parsed from a spec string:
+    
+    - "fixed:50"            always 50 ms
+    - "uniform:20:80"       uniform between 20 and 80 ms
+    - "lognormal:800:0.5"   median 800 ms, log-space sigma 0.5 (long tail)
+    """
+    
+    def __init__(self, spec: str = "fixed:0", seed: Optional[int] = None):
+        self.spec = spec
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self._random = random.Random(seed)
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency model: {spec}")
+    
+    def sample_ms(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self._random.uniform(self.params[0], self.params[1])
+        median, sigma = self.params
+        return self._random.lognormvariate(math.log(median), sigma)
+
+class FakeService(ABC):
+    """Base class: a threaded HTTP server that routes to `handle`"""
+    
+    name = "fake"
+    
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = LatencyModel(latency, seed)
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> "FakeService":
+        service = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def _dispatch(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, payload = service._respond(self.command, self.path, body, self.headers)
+                data = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client timed out and hung up
+
+            
+            do_GET = do_POST = do_DELETE = _dispatch
+            
+            def log_message(self, *args):
+                pass
+        
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=f"{self.name}-fake", daemon=True).start()
+        return self
+    
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def _respond(self, method: str, path: str, body: bytes, headers) -> Tuple[int, Any]:
+        route = self.route(method, path)
+        time.sleep(self.delay_ms(method, path, body) / 1000)
+        with self._lock:
+            self.requests[route] += 1
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors[route] += 1
+        if failed:
+            return 503, {"error": {"message": f"{self.name} fake injected error", "type": "server_error"}}
+        return self.handle(method, path, body, headers)
+    
+    def route(self, method: str, path: str) -> str:
+        return f"{method} {path.split('?')[0]}"
+    
+    def delay_ms(self, method: str, path: str, body: bytes) -> float:
+        return self.latency.sample_ms()
+    
+    @abstractmethod
+    def handle(self, method: str, path: str, body: bytes, headers) -> Tuple[int, Any]:
+        """Status and JSON payload for a request that wasn't failed on purpose"""
+        pass
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": dict(self.requests), "errors": dict(self.errors)}
+
+def fake_embedding(text: str, dimension: int) -> List[float]:
+    """Deterministic unit vector for `text`, so equal texts embed equally"""
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big")
+    rng = random.Random(seed)
+    vector = [rng.gauss(0, 1) for _ in range(dimension)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+class FakeOpenAI(FakeService):
+    """
+    Chat completions and embeddings (base URL: <url>/v1).
+    
+    `model_latency` maps model names to latency specs that override the
+    service-wide one, e.g. to make the primary model slow but not the fallback.
+    """
+    
+    name = "openai"
+    
+    def __init__(
+        self,
+        *args,
+        embedding_dimension: int = 1536,
+        model_latency: Optional[Dict[str, str]] = None,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.embedding_dimension = embedding_dimension
+        self.model_latency = {
+            model: LatencyModel(spec, kwargs.get("seed"))
+            for model, spec in (model_latency or {}).items()
+        }
+    
+    def delay_ms(self, method, path, body):
+        if self.model_latency:
+            model = json.loads(body or b"{}").get("model")
+            if model in self.model_latency:
+                return self.model_latency[model].sample_ms()
+        return super().delay_ms(method, path, body)
+    
+    def route(self, method, path):
+        if path.endswith("/chat/completions"):
+            return "chat.completions"
+        if path.endswith("/embeddings"):
+            return "embeddings"
+        return super().route(method, path)
+    
+    def handle(self, method, path, body, headers):
+        request = json.loads(body or b"{}")
+        if path.endswith("/chat/completions"):
+            prompt = request["messages"][-1]["content"]
+            return 200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-3.5-turbo"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": f"Thanks for your message about: {prompt[:200]}"},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 20,
+                          "total_tokens": len(prompt.split()) + 20},
+            }
+        if path.endswith("/embeddings"):
+            inputs = request["input"]
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            return 200, {
+                "object": "list",
+                "data": [
+                    {"object": "embedding", "index": i,
+                     "embedding": fake_embedding(text, self.embedding_dimension)}
+                    for i, text in enumerate(inputs)
+                ],
+                "model": request.get("model", "text-embedding-ada-002"),
+                "usage": {"prompt_tokens": 8 * len(inputs), "total_tokens": 8 * len(inputs)},
+            }
+        return 404, {"error": {"message": f"Unknown path {path}"}}
+
+class FakeTwilio(FakeService):
+    """Twilio Messages API; calls `on_message(to, body)` for every accepted send"""
+    
+    name = "twilio"
+    
+    def __init__(self, *args, on_message: Optional[Callable[[str, str], None]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_message = on_message
+    
+    def route(self, method, path):
+        if path.endswith("/Messages.json"):
+            return "messages.create"
+        return super().route(method, path)
+    
+    def handle(self, method, path, body, headers):
+        if not path.endswith("/Messages.json"):
+            return 404, {"message": f"Unknown path {path}"}
+        form = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+        if self.on_message is not None:
+            self.on_message(form.get("To", ""), form.get("Body", ""))
+        return 201, {
+            "sid": f"SM{uuid.uuid4().hex}",
+            "status": "queued",
+            "to": form.get("To"),
+            "from": form.get("From"),
+            "body": form.get("Body"),
+            "num_segments": "1",
+        }
+
+class FakePinecone(FakeService):
+    """Pinecone index data plane with in-memory, brute-force cosine search"""
+    
+    name = "pinecone"
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.namespaces: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    
+    def route(self, method, path):
+        return path.split("?")[0].strip("/")
+    
+    @staticmethod
+    def _matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+        for key, condition in (filter or {}).items():
+            value = metadata.get(key)
+            if isinstance(condition, dict):
+                if "$eq" in condition and value != condition["$eq"]:
+                    return False
+                if "$in" in condition and value not in condition["$in"]:
+                    return False
+                if "$ne" in condition and value == condition["$ne"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+    
+    def handle(self, method, path, body, headers):
+        request = json.loads(body or b"{}")
+        route = self.route(method, path)
+        if route == "vectors/upsert":
+            namespace = self.namespaces.setdefault(request.get("namespace", ""), {})
+            with self._lock:
+                for vector in request["vectors"]:
+                    namespace[vector["id"]] = vector
+            return 200, {"upsertedCount": len(request["vectors"])}
+        if route == "query":
+            query = request["vector"]
+            with self._lock:
+                candidates = list(self.namespaces.get(request.get("namespace", ""), {}).values())
+            scored = [
+                (sum(a * b for a, b in zip(query, vector["values"])), vector)
+                for vector in candidates
+                if self._matches_filter(vector.get("metadata", {}), request.get("filter"))
+            ]
+            scored.sort(key=lambda item: item[0], reverse=True)
+            return 200, {
+                "namespace": request.get("namespace", ""),
+                "matches": [
+                    {
+                        "id": vector["id"],
+                        "score": score,
+                        "values": [],
+                        **({"metadata": vector.get("metadata", {})} if request.get("includeMetadata") else {}),
+                    }
+                    for score, vector in scored[:request.get("topK", 10)]
+                ],
+            }
+        if route == "describe_index_stats":
+            with self._lock:
+                namespaces = {name: {"vectorCount": len(vectors)} for name, vectors in self.namespaces.items()}
+            return 200, {
+                "namespaces": namespaces,
+                "dimension": 1536,
+                "indexFullness": 0.0,
+                "totalVectorCount": sum(ns["vectorCount"] for ns in namespaces.values()),
+            }
+        return 404, {"message": f"Unknown path {path}"}
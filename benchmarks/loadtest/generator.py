@@ -0,0 +1,172 @@
+"""
+Async open-loop load generator for the inbound webhooks.
+
+Requests are started on a fixed schedule (`rps`) regardless of how fast the
+server answers, like real provider traffic, so a slow server shows up as
+growing latency instead of a lower request rate.
+"""
+from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from dataclasses import dataclass, field
+import asyncio
+import random
+import threading
+import time
+import uuid
+
+import httpx
+
+MESSAGES = [
+    "hi",
+    "hello, are you there?",
+    "looking for a 2BR in JVC",
+    "budget 1.2M",
+    "what's the service charge for Marina Gate?",
+    "is there a payment plan for off-plan units in Dubai Hills?",
+    "can I book a viewing this weekend?",
+    "compare Downtown and Business Bay for rental yield",
+    "do you have anything on the Palm under 5M?",
+    "thanks!",
+]
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(latencies_ms: List[float], errors: int, duration: float) -> Dict[str, Any]:
+    return {
+        "requests": len(latencies_ms) + errors,
+        "errors": errors,
+        "throughput_rps": round((len(latencies_ms) + errors) / duration, 2) if duration else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+    }
+
+@dataclass
+class LoadProfile:
+    rps: float = 20.0
+    duration: float = 10.0
+    users: int = 200
+    sms_share: float = 0.1  # fraction of requests sent to /sms/incoming
+    burst_probability: float = 0.3  # chance a message is followed by 1-3 quick follow-ups
+    retry_rate: float = 0.05  # chance a webhook is delivered twice (provider retry)
+    to_number: str = "whatsapp:+14155238886"
+    seed: Optional[int] = 1
+
+@dataclass
+class _Results:
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    replies: List[float] = field(default_factory=list)
+
+class LoadGenerator:
+    def __init__(self, base_url: str, profile: LoadProfile):
+        self.base_url = base_url
+        self.profile = profile
+        self._random = random.Random(profile.seed)
+        self._results = _Results()
+        # user number -> send times of messages still waiting for a reply
+        self._awaiting_reply: Dict[str, List[float]] = defaultdict(list)
+        self._reply_lock = threading.Lock()
+    
+    def on_reply(self, to: str, body: str) -> None:
+        """Hook for the fake Twilio: record message-to-reply latency"""
+        user = to.replace("whatsapp:", "")
+        now = time.perf_counter()
+        with self._reply_lock:
+            pending = self._awaiting_reply.pop(user, None)
+        if pending:
+            # A coalesced reply answers every message it merged
+            self._results.replies.append((now - min(pending)) * 1000)
+    
+    def _payload(self, user: str, body: str, channel: str) -> Dict[str, str]:
+        sid = f"SM{uuid.uuid4().hex}"
+        prefix = "whatsapp:" if channel == "whatsapp" else ""
+        return {
+            "SmsMessageSid": sid,
+            "NumMedia": "0",
+            "ProfileName": "Load Test",
+            "SmsSid": sid,
+            "WaId": user.lstrip("+"),
+            "SmsStatus": "received",
+            "Body": body,
+            "To": self.profile.to_number if channel == "whatsapp" else self.profile.to_number.replace("whatsapp:", ""),
+            "NumSegments": "1",
+            "ReferralNumMedia": "0",
+            "MessageSid": sid,
+            "AccountSid": "ACloadtest",
+            "From": f"{prefix}{user}",
+            "ApiVersion": "2010-04-01",
+        }
+    
+    async def _post(self, client: httpx.AsyncClient, channel: str, payload: Dict[str, str], retry: bool = False) -> None:
+        path = "/whatsapp/webhook" if channel == "whatsapp" else "/sms/incoming"
+        if channel == "whatsapp" and not retry:
+            with self._reply_lock:
+                self._awaiting_reply[payload["From"].replace("whatsapp:", "")].append(time.perf_counter())
+        started = time.perf_counter()
+        try:
+            response = await client.post(path, data=payload)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        key = f"{path} (retry)" if retry else path
+        if ok:
+            self._results.latencies[key].append((time.perf_counter() - started) * 1000)
+        else:
+            self._results.errors[key] += 1
+    
+    async def _conversation(self, client: httpx.AsyncClient) -> None:
+        profile = self.profile
+        user = f"+97150{self._random.randrange(profile.users):07d}"
+        channel = "sms" if self._random.random() < profile.sms_share else "whatsapp"
+        messages = [self._random.choice(MESSAGES)]
+        if self._random.random() < profile.burst_probability:
+            messages += [self._random.choice(MESSAGES) for _ in range(self._random.randint(1, 3))]
+        
+        for i, body in enumerate(messages):
+            if i:
+                await asyncio.sleep(self._random.uniform(0.2, 0.8))
+            payload = self._payload(user, body, channel)
+            await self._post(client, channel, payload)
+            if channel == "whatsapp" and self._random.random() < profile.retry_rate:
+                await self._post(client, channel, payload, retry=True)
+    
+    async def run(self, settle: float = 5.0) -> Dict[str, Any]:
+        """Drive load for `profile.duration`, then wait up to `settle` for replies"""
+        profile = self.profile
+        interval = 1 / profile.rps
+        tasks = []
+        limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=60, limits=limits) as client:
+            started = time.perf_counter()
+            next_at = started
+            while next_at - started < profile.duration:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.ensure_future(self._conversation(client)))
+                next_at += interval
+            await asyncio.gather(*tasks)
+            duration = time.perf_counter() - started
+        
+        deadline = time.perf_counter() + settle
+        while self._awaiting_reply and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        
+        endpoints = {
+            key: summarize(self._results.latencies[key], self._results.errors[key], duration)
+            for key in sorted(set(self._results.latencies) | set(self._results.errors))
+        }
+        return {
+            "duration_s": round(duration, 2),
+            "endpoints": endpoints,
+            "reply_latency": {
+                **summarize(self._results.replies, 0, duration),
+                "unanswered_users": len(self._awaiting_reply),
+            },
+        }
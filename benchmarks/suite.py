@@ -0,0 +1,411 @@
+"""
+Microbenchmarks for the core subsystems, with a regression gate.
+
+External APIs are replaced by the local fakes from benchmarks.loadtest
+(zero latency), so the numbers are the cost of our own code.
+
+    python -m benchmarks.suite run --output results.json
+    python -m benchmarks.suite run --compare baseline.json --threshold 0.25
+    python -m benchmarks.suite compare baseline.json results.json
+
+`compare` (or `run --compare`) exits with status 1 when any metric is worse
+than the baseline by more than the threshold (a fraction, 0.25 = 25%), or
+is in the baseline but missing from the results. Pass --allow-missing when
+a benchmark was removed or renamed on purpose.
+"""
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from .common import median_ms, time_calls, use_placeholder_env
+
+# name -> benchmark function returning {metric: {"value", "unit", "better"}}
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace], Dict[str, Dict[str, Any]]]] = {}
+
+def benchmark(name: str):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+def metric(value: float, unit: str, better: str = "lower") -> Dict[str, Any]:
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+@contextlib.contextmanager
+def _fakes():
+    """Start zero-latency fakes and point the settings at them"""
+    from .loadtest.fakes import FakeOpenAI, FakePinecone
+    from src.config import reload_settings
+    
+    openai_fake = FakeOpenAI(seed=1).start()
+    pinecone_fake = FakePinecone(seed=1).start()
+    previous = {key: os.environ.get(key) for key in ("OPENAI_BASE_URL", "PINECONE_INDEX_HOST")}
+    os.environ["OPENAI_BASE_URL"] = openai_fake.url + "/v1"
+    os.environ["PINECONE_INDEX_HOST"] = pinecone_fake.url
+    reload_settings()
+    try:
+        yield openai_fake, pinecone_fake
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        reload_settings()
+        openai_fake.stop()
+        pinecone_fake.stop()
+
+@contextlib.contextmanager
+def _in_tempdir():
+    """Run in an empty working directory so data/*.json stores start clean"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as path:
+        os.chdir(path)
+        try:
+            yield path
+        finally:
+            os.chdir(previous)
+
+def _sample_document(size_bytes: int) -> str:
+    rng = random.Random(1)
+    words = ("apartment villa Marina JVC Downtown service charge payment plan handover "
+             "bedroom bathroom balcony view yield rent price AED sqft community").split()
+    paragraphs = []
+    total = 0
+    while total < size_bytes:
+        paragraph = " ".join(rng.choice(words) for _ in range(rng.randint(40, 120))) + "."
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+@benchmark("document_chunking")
+def bench_document_chunking(args):
+    from src.document_processing.processor import DocumentProcessor
+    
+    text = _sample_document(1_000_000)
+    with _fakes():
+        processor = DocumentProcessor()
+        timings = time_calls(lambda: processor.text_splitter.split_text(text), repeat=args.repeat)
+    seconds = sorted(timings)[len(timings) // 2]
+    return {
+        "chunking_throughput_mb_s": metric(len(text) / 1e6 / seconds, "MB/s", better="higher"),
+    }
+
+@benchmark("vector_store")
+def bench_vector_store(args):
+    import src.database.vector_store as vector_store_module
+    from src.database.vector_store import VectorStore
+    
+    texts = [f"Unit {i} in JVC, 2BR, {1_000_000 + i * 1000} AED" for i in range(50)]
+    metadata = [{"source": "listings.csv", "client_id": "bench", "file_type": ".csv"} for _ in texts]
+    with _fakes():
+        store = VectorStore()
+        store_timings = time_calls(
+            lambda: asyncio.run(store.store_embeddings(texts, metadata, namespace="bench")),
+            repeat=args.repeat
+        )
+        search_timings = time_calls(
+            lambda: asyncio.run(store.search("2BR in JVC", namespace="bench")),
+            repeat=args.repeat, number=10
+        )
+        queries = ["2BR in JVC", "studio in Marina", "villa with garden", "service charge"]
+        
+        async def one_by_one():
+            for query in queries:
+                await store.search(query, namespace="bench")
+        
+        sequential_timings = time_calls(lambda: asyncio.run(one_by_one()), repeat=args.repeat)
+        batched_timings = time_calls(
+            lambda: asyncio.run(store.search_many(queries, "bench")), repeat=args.repeat
+        )
+    vector_store_module.vector_store = None
+    return {
+        "store_50_chunks_ms": metric(median_ms(store_timings), "ms"),
+        "search_ms": metric(median_ms(search_timings), "ms"),
+        "search_4_queries_sequential_ms": metric(median_ms(sequential_timings), "ms"),
+        "search_many_4_queries_ms": metric(median_ms(batched_timings), "ms"),
+    }
+
+@benchmark("lexical_index")
+def bench_lexical_index(args):
+    from src.document_processing.lexical_index import LexicalIndex
+    
+    chunks = _sample_document(5_000_000).split("\n\n")
+    metadata = [{"source": "bench.txt"}] * len(chunks)
+    
+    def build():
+        index = LexicalIndex()
+        index.add(chunks, metadata)
+        return index
+    
+    build_timings = time_calls(build, repeat=min(args.repeat, 3))
+    index = build()
+    search_timings = time_calls(lambda: index.search("Marina payment plan handover"), repeat=args.repeat, number=20)
+    return {
+        "build_chunks_per_s": metric(len(chunks) / (median_ms(build_timings) / 1000), "chunks/s", better="higher"),
+        f"search_{len(chunks)}_chunks_ms": metric(median_ms(search_timings), "ms"),
+    }
+
+def _make_users(client_id: str, count: int):
+    from src.database.models import UserProfile
+    
+    now = datetime.now()
+    history = [{"timestamp": now.isoformat(), "message": "looking for a 2BR", "response": "Sure!"}] * 3
+    return {
+        f"+97150{i:07d}": UserProfile(
+            user_id=f"+97150{i:07d}",
+            client_id=client_id,
+            last_interaction=now - timedelta(hours=i % 500),
+            interaction_count=i % 40,
+            conversation_history=list(history),
+        )
+        for i in range(count)
+    }
+
+@benchmark("user_manager")
+def bench_user_manager(args):
+    from src.clients.user_manager import UserManager
+    
+    results = {}
+    with _in_tempdir():
+        for size in args.user_sizes:
+            manager = UserManager()
+            manager.users = {"bench": _make_users("bench", size)}
+            
+            async def update():
+                await manager.update_user_interaction(
+                    "+971500000001", "bench", "what is the price?", "It's 1.2M AED"
+                )
+            
+            # One call at the largest sizes can take seconds
+            repeat = args.repeat if size <= 100_000 else 1
+            timings = time_calls(lambda: asyncio.run(update()), repeat=repeat)
+            results[f"update_interaction_{size}_users_ms"] = metric(median_ms(timings), "ms")
+            del manager
+    return results
+
+@benchmark("analytics")
+def bench_analytics(args):
+    from src.analytics.user_analytics import UserAnalytics
+    
+    analytics = UserAnalytics()
+    users = list(_make_users("bench", args.analytics_users).values())
+    timings = time_calls(lambda: asyncio.run(analytics.get_client_analytics(users)), repeat=args.repeat)
+    return {
+        f"client_analytics_{args.analytics_users}_users_ms": metric(median_ms(timings), "ms"),
+    }
+
+@benchmark("rescoring")
+def bench_rescoring(args):
+    from src.analytics.lead_signals import DEFAULT_SIGNALS, LeadSignalMatcher
+    from src.analytics.rescoring import LeadRescorer
+    from src.clients.user_manager import UserManager
+    
+    with _in_tempdir():
+        manager = UserManager()
+    manager.users = {"bench": _make_users("bench", args.analytics_users)}
+    rescorer = LeadRescorer(manager)
+    matcher = LeadSignalMatcher(DEFAULT_SIGNALS)
+    timings = time_calls(
+        lambda: asyncio.run(rescorer.rescore_client("bench", matcher, dry_run=True)),
+        repeat=min(args.repeat, 3)
+    )
+    return {
+        "dry_run_users_per_s": metric(args.analytics_users / (median_ms(timings) / 1000), "users/s", better="higher"),
+    }
+
+@benchmark("client_manager")
+def bench_client_manager(args):
+    from src.clients.client_manager import ClientManager, ClientSettings
+    
+    with _in_tempdir():
+        manager = ClientManager()
+    manager.clients = {
+        f"client-{i}": ClientSettings(client_id=f"client-{i}", whatsapp_number=f"+1415{i:07d}")
+        for i in range(10_000)
+    }
+    manager._index_numbers()
+    rng = random.Random(1)
+    ids = [f"client-{rng.randrange(10_000)}" for _ in range(1000)]
+    numbers = [f"whatsapp:+1415{rng.randrange(10_000):07d}" for _ in range(1000)]
+    
+    async def by_id():
+        for client_id in ids:
+            await manager.get_client(client_id)
+    
+    async def by_number():
+        for number in numbers:
+            await manager.get_client_by_number(number)
+    
+    id_timings = time_calls(lambda: asyncio.run(by_id()), repeat=args.repeat)
+    number_timings = time_calls(lambda: asyncio.run(by_number()), repeat=args.repeat)
+    return {
+        "get_client_us": metric(median_ms(id_timings) * 1000 / len(ids), "us"),
+        "get_client_by_number_us": metric(median_ms(number_timings) * 1000 / len(numbers), "us"),
+    }
+
+@benchmark("database")
+def bench_database(args):
+    from .bench_db_pool import measure
+    
+    with _in_tempdir():
+        results = measure("sqlite:///bench.sqlite3", queries=200)
+    return {
+        f"session_{name}_ms": metric(stats["median_ms"], "ms")
+        for name, stats in results.items()
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+def run(args) -> Dict[str, Any]:
+    use_placeholder_env()
+    selected = args.only or list(BENCHMARKS)
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in selected:
+        started = time.perf_counter()
+        for metric_name, value in BENCHMARKS[name](args).items():
+            results[f"{name}.{metric_name}"] = value
+        print(f"{name}: done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Per-metric change against the baseline; `regressed` marks metrics worse
+    by more than the threshold and `missing` those with no current result.
+    """
+    rows = []
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if now is None:
+            rows.append({
+                "metric": name,
+                "baseline": base["value"],
+                "current": None,
+                "unit": base["unit"],
+                "change": None,
+                "regressed": False,
+                "missing": True,
+            })
+            continue
+        if not base["value"]:
+            continue
+        change = (now["value"] - base["value"]) / base["value"]
+        worse = change if base.get("better", "lower") == "lower" else -change
+        rows.append({
+            "metric": name,
+            "baseline": base["value"],
+            "current": now["value"],
+            "unit": now["unit"],
+            "change": round(change, 4),
+            "regressed": worse > threshold,
+            "missing": False,
+        })
+    return rows
+
+def print_report(results: Dict[str, Any], rows: Optional[List[Dict[str, Any]]] = None) -> None:
+    if rows is None:
+        for name, value in results["results"].items():
+            print(f"{name:<60}{value['value']:>14} {value['unit']}")
+        return
+    for row in rows:
+        if row["missing"]:
+            print(f"{row['metric']:<60}{row['baseline']:>12} -> {'-':<12} {row['unit']:<5}{'':>8}  MISSING")
+            continue
+        flag = "REGRESSED" if row["regressed"] else ""
+        print(
+            f"{row['metric']:<60}{row['baseline']:>12} -> {row['current']:<12} "
+            f"{row['unit']:<5}{row['change'] * 100:+7.1f}%  {flag}"
+        )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument(
+        "--user-sizes", type=lambda value: [int(v) for v in value.split(",")],
+        default=[1_000, 100_000], help="comma-separated user counts, e.g. 1000,100000,1000000"
+    )
+    run_parser.add_argument("--analytics-users", type=int, default=100_000)
+    run_parser.add_argument("--output", help="write results as JSON to this path")
+    run_parser.add_argument("--compare", help="baseline JSON to gate against")
+    run_parser.add_argument("--threshold", type=float, default=0.25)
+    run_parser.add_argument("--allow-missing", action="store_true", help="don't fail on baseline metrics with no result")
+    
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.25)
+    compare_parser.add_argument("--allow-missing", action="store_true", help="don't fail on baseline metrics with no result")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.command == "run":
+        results = run(args)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        baseline_path = args.compare
+    else:
+        with open(args.current) as f:
+            results = json.load(f)
+        baseline_path = args.baseline
+    
+    if not baseline_path:
+        print_report(results)
+        return 0
+    
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if args.command == "run" and args.only:
+        # Benchmarks that weren't selected aren't missing
+        baseline["results"] = {
+            name: value for name, value in baseline["results"].items()
+            if name.split(".", 1)[0] in args.only
+        }
+    rows = compare(baseline, results, args.threshold)
+    print_report(results, rows)
+    failed = False
+    regressed = [row["metric"] for row in rows if row["regressed"]]
+    if regressed:
+        print(f"\n{len(regressed)} metric(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        failed = True
+    missing = [row["metric"] for row in rows if row["missing"]]
+    if missing and not args.allow_missing:
+        print(
+            f"\n{len(missing)} baseline metric(s) missing from the results: {', '.join(missing)} "
+            "(pass --allow-missing if they were removed on purpose)",
+            file=sys.stderr
+        )
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
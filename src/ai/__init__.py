@@ -0,0 +1,10 @@
+from .openai_client import get_openai_client
+from .scheduler import get_scheduler, TenantScheduler
+from .llm_client import get_llm_client, ResilientLLMClient, LLMResult, LLMUnavailable
+from .router import route_message, classify_message, RouteDecision
+
+__all__ = [
+    'get_openai_client', 'get_scheduler', 'TenantScheduler',
+    'get_llm_client', 'ResilientLLMClient', 'LLMResult', 'LLMUnavailable',
+    'route_message', 'classify_message', 'RouteDecision'
+]
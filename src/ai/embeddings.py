@@ -0,0 +1,37 @@
+from typing import List
+import asyncio
+
+from ..observability.metrics import EMBEDDING_LATENCY, ERRORS
+from ..observability.tracing import span
+from .openai_client import get_openai_client
+from .scheduler import get_scheduler
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# Inputs per embeddings request (the API accepts up to 2048)
+EMBEDDING_BATCH_SIZE = 256
+
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """Get OpenAI embeddings for several texts in one request"""
+    response = get_openai_client().embeddings.create(
+        model=EMBEDDING_MODEL,
+        input=texts
+    )
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+async def embed_texts(texts: List[str], tenant_id: str) -> List[List[float]]:
+    """Embed texts in as few requests as possible, through the per-client scheduler"""
+    async def embed(batch):
+        try:
+            with span("vector.embed", namespace=tenant_id, inputs=len(batch)), \
+                    EMBEDDING_LATENCY.time(tenant=tenant_id):
+                return await asyncio.to_thread(get_embeddings, batch)
+        except Exception:
+            ERRORS.inc(tenant=tenant_id, stage="embedding")
+            raise
+    
+    embeddings = []
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        batch = texts[start:start + EMBEDDING_BATCH_SIZE]
+        embeddings.extend(await get_scheduler().run(tenant_id, lambda: embed(batch)))
+    return embeddings
@@ -0,0 +1,315 @@
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass
+import asyncio
+import logging
+import time
+
+from ..config import get_settings
+from ..observability.metrics import ERRORS, LLM_LATENCY, RETRIES, get_registry
+from ..observability.tracing import span
+
+logger = logging.getLogger(__name__)
+
+class LLMUnavailable(Exception):
+    """Raised when no model answered in time and there is no canned response"""
+    pass
+
+class CircuitBreaker:
+    """
+    Stops calling a model that keeps failing or answering too slowly.
+    
+    Opens when at least `failure_ratio` of the last `window` calls (and at
+    least `min_calls` of them) failed. After `open_seconds` one probe call
+    is let through: success closes the circuit, failure opens it again.
+    """
+    
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    
+    def __init__(
+        self,
+        failure_ratio: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+    
+    def allow(self) -> bool:
+        """Whether a call may be made now"""
+        if self.state == self.OPEN and self.clock() >= self._opened_at + self.open_seconds:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+    
+    def record(self, success: bool) -> None:
+        if self.state == self.HALF_OPEN:
+            if success:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            self._probing = False
+            return
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_ratio:
+            self._open()
+    
+    def abandon(self) -> None:
+        """A call was cancelled before it had an outcome"""
+        self._probing = False
+    
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+
+class LatencyTracker:
+    """Recent successful call durations, for the hedging delay"""
+    
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+    
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+    
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+@dataclass
+class LLMResult:
+    text: str
+    model: Optional[str]  # None when the canned response was used
+    fallback: bool = False
+    hedged: bool = False
+
+class ResilientLLMClient:
+    """
+    Chat completions with bounded latency.
+    
+    Each attempt has a timeout and the whole call a deadline. When an
+    attempt takes longer than the model's recent p95, an identical hedge
+    request is sent and the first answer wins. A model whose circuit is
+    open is skipped; failures fall through to `fallback_model` and finally
+    to `fallback_response`.
+    """
+    
+    def __init__(
+        self,
+        create: Callable[..., Any],
+        default_model: str,
+        fallback_model: Optional[str] = None,
+        fallback_response: Optional[str] = None,
+        timeout_seconds: float = 10,
+        deadline_seconds: float = 20,
+        slow_call_seconds: float = 8,
+        hedge: bool = True,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.create = create
+        self.default_model = default_model
+        self.fallback_model = fallback_model
+        self.fallback_response = fallback_response
+        self.timeout_seconds = timeout_seconds
+        self.deadline_seconds = deadline_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker_factory = breaker_factory
+        self.clock = clock
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyTracker] = {}
+    
+    def _breaker(self, model: str) -> CircuitBreaker:
+        breaker = self.breakers.get(model)
+        if breaker is None:
+            breaker = self.breakers[model] = self.breaker_factory()
+        return breaker
+    
+    def _latency(self, model: str) -> LatencyTracker:
+        tracker = self.latencies.get(model)
+        if tracker is None:
+            tracker = self.latencies[model] = LatencyTracker()
+        return tracker
+    
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there's too little data"""
+        tracker = self._latency(model)
+        if not self.hedge or len(tracker) < self.hedge_min_samples:
+            return None
+        return tracker.percentile(self.hedge_quantile)
+    
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        tenant_id: str,
+        model: Optional[str] = None,
+        **params
+    ) -> LLMResult:
+        deadline = self.clock() + self.deadline_seconds
+        models = [model or self.default_model]
+        if self.fallback_model and self.fallback_model not in models:
+            models.append(self.fallback_model)
+        
+        last_error: Optional[Exception] = None
+        for index, candidate in enumerate(models):
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            if not self._breaker(candidate).allow():
+                logger.warning("Circuit open, skipping model", extra={"client_id": tenant_id, "model": candidate})
+                continue
+            if index > 0:
+                RETRIES.inc(tenant=tenant_id, stage="llm.fallback")
+            try:
+                response, hedged = await self._hedged_call(
+                    candidate, messages, min(self.timeout_seconds, remaining), tenant_id, params
+                )
+            except Exception as e:
+                last_error = e
+                logger.warning(
+                    f"Completion failed: {e!r}", extra={"client_id": tenant_id, "model": candidate}
+                )
+                continue
+            return LLMResult(
+                text=response.choices[0].message.content,
+                model=candidate,
+                fallback=index > 0,
+                hedged=hedged
+            )
+        
+        ERRORS.inc(tenant=tenant_id, stage="llm_unavailable")
+        if self.fallback_response:
+            logger.error("No model available, sending the canned response", extra={"client_id": tenant_id})
+            return LLMResult(text=self.fallback_response, model=None, fallback=True)
+        raise LLMUnavailable("No model answered before the deadline") from last_error
+    
+    async def _hedged_call(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        timeout: float,
+        tenant_id: str,
+        params: Dict[str, Any]
+    ) -> Tuple[Any, bool]:
+        started = self.clock()
+        first = asyncio.ensure_future(self._attempt(model, messages, timeout, tenant_id, params))
+        pending = {first}
+        try:
+            delay = self.hedge_delay(model)
+            if delay is None or delay >= timeout or self._breaker(model).state != CircuitBreaker.CLOSED:
+                return await first, False
+            
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result(), False
+            
+            RETRIES.inc(tenant=tenant_id, stage="llm.hedge")
+            hedge = asyncio.ensure_future(self._attempt(
+                model, messages, timeout - (self.clock() - started), tenant_id, params, hedge=True
+            ))
+            pending.add(hedge)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), True
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _attempt(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        timeout: float,
+        tenant_id: str,
+        params: Dict[str, Any],
+        hedge: bool = False
+    ) -> Any:
+        breaker = self._breaker(model)
+        started = self.clock()
+        try:
+            with span("llm.completion", model=model, hedge=hedge):
+                # The HTTP timeout stops the worker thread; wait_for frees the caller
+                response = await asyncio.wait_for(
+                    asyncio.to_thread(
+                        self.create, model=model, messages=messages, timeout=timeout, **params
+                    ),
+                    timeout
+                )
+        except asyncio.CancelledError:
+            breaker.abandon()
+            raise
+        except Exception:
+            ERRORS.inc(tenant=tenant_id, stage="llm")
+            breaker.record(False)
+            raise
+        elapsed = self.clock() - started
+        LLM_LATENCY.observe(elapsed, tenant=tenant_id, model=model)
+        self._latency(model).observe(elapsed)
+        breaker.record(elapsed < self.slow_call_seconds)
+        return response
+    
+    def collect_metrics(self):
+        """Circuit state per model, read at scrape time"""
+        states = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+        yield ("llm_circuit_state", "gauge", "Circuit breaker state (0 closed, 1 half-open, 2 open)", [
+            ({"model": model}, states[breaker.state]) for model, breaker in self.breakers.items()
+        ])
+
+def _openai_create(**kwargs):
+    from .openai_client import get_openai_client
+    
+    # Retries are handled by the fallback chain, not inside the attempt
+    return get_openai_client().with_options(max_retries=0).chat.completions.create(**kwargs)
+
+# Singleton instance
+llm_client: ResilientLLMClient = None
+
+def get_llm_client() -> ResilientLLMClient:
+    """Get or create the resilient completion client"""
+    global llm_client
+    if llm_client is None:
+        settings = get_settings()
+        llm_client = ResilientLLMClient(
+            create=_openai_create,
+            default_model=settings.MODEL_NAME,
+            fallback_model=settings.LLM_FALLBACK_MODEL,
+            fallback_response=settings.LLM_FALLBACK_RESPONSE,
+            timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+            deadline_seconds=settings.LLM_DEADLINE_SECONDS,
+            slow_call_seconds=settings.LLM_SLOW_CALL_SECONDS,
+            hedge=settings.LLM_HEDGE,
+            breaker_factory=lambda: CircuitBreaker(
+                failure_ratio=settings.LLM_BREAKER_FAILURE_RATIO,
+                open_seconds=settings.LLM_BREAKER_OPEN_SECONDS
+            )
+        )
+        get_registry().register_collector(llm_client.collect_metrics)
+    return llm_client
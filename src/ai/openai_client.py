@@ -0,0 +1,22 @@
+from typing import TYPE_CHECKING
+from ..config import get_settings
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+# Singleton instance
+openai_client: "OpenAI" = None
+
+def get_openai_client() -> "OpenAI":
+    """Get or create the shared OpenAI client"""
+    global openai_client
+    if openai_client is None:
+        # Imported here: the openai package is slow to import and only
+        # needed once the first completion or embedding is requested
+        from openai import OpenAI
+        settings = get_settings()
+        openai_client = OpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL
+        )
+    return openai_client
@@ -0,0 +1,93 @@
+from typing import TYPE_CHECKING, Dict, Optional
+from dataclasses import dataclass
+import logging
+import re
+
+from ..config import get_settings
+from ..observability.metrics import ROUTES
+
+if TYPE_CHECKING:
+    from ..clients.client_manager import ClientSettings
+
+logger = logging.getLogger(__name__)
+
+# Model tiers, from fastest/cheapest to most capable
+FAST, STANDARD, ADVANCED = "fast", "standard", "advanced"
+
+CATEGORY_TIERS: Dict[str, str] = {
+    "greeting": FAST,
+    "faq": FAST,
+    "general": STANDARD,
+    "complex": ADVANCED,
+}
+
+GREETINGS = {
+    "hi", "hello", "hey", "hiya", "salam", "salaam", "marhaba", "good morning",
+    "good afternoon", "good evening", "thanks", "thank you", "thx", "ok", "okay",
+    "bye", "goodbye", "yes", "no", "sure", "great", "cool",
+}
+# Words that can pad a greeting ("hi there", "thanks so much")
+GREETING_FILLER = {"there", "so", "much", "a", "lot", "all", "again", "team", "guys"}
+
+FAQ_PATTERN = re.compile(
+    r"\b(opening hours|office hours|working hours|where are you|your address|location|"
+    r"contact|phone number|email|website|who are you|what do you do|how do i|how can i|"
+    r"do you (have|offer|sell|rent))\b"
+)
+
+COMPLEX_PATTERN = re.compile(
+    r"\b(compare|comparison|versus|vs|difference between|pros and cons|better|"
+    r"roi|yield|mortgage|payment plan|calculate|analy[sz]e|recommend)\b"
+)
+
+# Longer messages than this are treated as complex
+COMPLEX_MIN_CHARS = 400
+
+@dataclass
+class RouteDecision:
+    category: str
+    tier: str
+    model: str
+    max_tokens: int
+    temperature: float
+
+def classify_message(text: str) -> str:
+    """Cheap local classification: greeting, faq, complex or general"""
+    normalized = re.sub(r"[^\w\s]", " ", text.lower())
+    words = normalized.split()
+    if not words:
+        return "greeting"
+    if " ".join(word for word in words if word not in GREETING_FILLER) in GREETINGS:
+        return "greeting"
+    if len(text) >= COMPLEX_MIN_CHARS or text.count("?") >= 2 or COMPLEX_PATTERN.search(normalized):
+        return "complex"
+    if len(words) <= 20 and FAQ_PATTERN.search(normalized):
+        return "faq"
+    return "general"
+
+def tier_model(tier: str, client: Optional["ClientSettings"] = None) -> str:
+    """Model for a tier: the client's choice, else the global default"""
+    if client is not None and client.model_tiers.get(tier):
+        return client.model_tiers[tier]
+    settings = get_settings()
+    defaults = {FAST: settings.MODEL_FAST, STANDARD: settings.MODEL_NAME, ADVANCED: settings.MODEL_ADVANCED}
+    return defaults.get(tier) or settings.MODEL_NAME
+
+def route_message(text: str, client_id: str, client: Optional["ClientSettings"] = None) -> RouteDecision:
+    """Pick the model and generation limits for one message"""
+    settings = get_settings()
+    category = classify_message(text)
+    tier = CATEGORY_TIERS[category]
+    decision = RouteDecision(
+        category=category,
+        tier=tier,
+        model=tier_model(tier, client),
+        max_tokens=client.max_tokens if client else settings.MAX_TOKENS,
+        temperature=client.temperature if client else settings.TEMPERATURE,
+    )
+    ROUTES.inc(tenant=client_id, tier=tier)
+    logger.info(
+        "Routed message",
+        extra={"client_id": client_id, "category": category, "tier": tier, "model": decision.model}
+    )
+    return decision
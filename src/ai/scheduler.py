@@ -0,0 +1,179 @@
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+from collections import deque
+from dataclasses import dataclass, field
+import asyncio
+import time
+
+from ..config import get_settings
+from ..observability.metrics import QUEUE_WAIT, get_registry
+
+T = TypeVar("T")
+
+# Returns (weight, max_concurrency) for a tenant
+TenantConfigResolver = Callable[[str], Tuple[float, int]]
+
+@dataclass
+class _TenantState:
+    weight: float = 1.0
+    max_concurrency: int = 1
+    running: int = 0
+    virtual_time: float = 0.0
+    queue: Deque[Tuple[asyncio.Future, float]] = field(default_factory=deque)
+    # Queue-wait metrics
+    dispatched: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+class TenantScheduler:
+    """
+    Weighted fair scheduler for outbound LLM and embedding calls.
+    
+    At most `max_concurrency` calls run at once across all tenants, and at
+    most the tenant's own cap run for any one tenant. When calls are queued,
+    the next free slot goes to the tenant with the lowest virtual time
+    (calls dispatched divided by weight), so a tenant with weight 2 gets
+    twice the share of a tenant with weight 1 and a burst from one tenant
+    can't starve the others.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        tenant_config: Optional[TenantConfigResolver] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.tenant_config = tenant_config or (lambda tenant_id: (1.0, max_concurrency))
+        self._tenants: Dict[str, _TenantState] = {}
+        self._running = 0
+    
+    def _tenant(self, tenant_id: str) -> _TenantState:
+        state = self._tenants.get(tenant_id)
+        if state is None:
+            state = self._tenants[tenant_id] = _TenantState()
+        # Refreshed on every call so config changes apply immediately
+        weight, max_concurrency = self.tenant_config(tenant_id)
+        state.weight = max(weight, 1e-6)
+        state.max_concurrency = max(max_concurrency, 1)
+        return state
+    
+    def _is_eligible(self, state: _TenantState) -> bool:
+        return bool(state.queue) and state.running < state.max_concurrency
+    
+    def _start(self, tenant_id: str, state: _TenantState, waited: float) -> None:
+        state.running += 1
+        self._running += 1
+        state.virtual_time += 1 / state.weight
+        state.dispatched += 1
+        state.total_wait += waited
+        state.max_wait = max(state.max_wait, waited)
+        QUEUE_WAIT.observe(waited, tenant=tenant_id)
+    
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._running < self.max_concurrency:
+            eligible = [
+                (tenant_id, state) for tenant_id, state in self._tenants.items()
+                if self._is_eligible(state)
+            ]
+            if not eligible:
+                return
+            tenant_id, state = min(eligible, key=lambda item: item[1].virtual_time)
+            future, enqueued_at = state.queue.popleft()
+            self._start(tenant_id, state, now - enqueued_at)
+            future.set_result(None)
+    
+    async def _acquire(self, tenant_id: str) -> None:
+        state = self._tenant(tenant_id)
+        
+        if (
+            self._running < self.max_concurrency
+            and state.running < state.max_concurrency
+            # Waiters of tenants at their own cap can't take a free slot anyway
+            and not any(self._is_eligible(s) for s in self._tenants.values())
+        ):
+            self._start(tenant_id, state, 0.0)
+            return
+        
+        if not state.queue and state.running == 0:
+            # A tenant returning from idle starts level with the busiest
+            # active tenant instead of spending credit saved while idle
+            active = [s.virtual_time for s in self._tenants.values() if s.queue or s.running]
+            if active:
+                state.virtual_time = max(state.virtual_time, min(active))
+        
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, time.monotonic())
+        state.queue.append(entry)
+        # Grants the slot now if one is free and this tenant is next in line
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just before cancellation
+                self._release(tenant_id)
+            else:
+                state.queue.remove(entry)
+            raise
+    
+    def _release(self, tenant_id: str) -> None:
+        state = self._tenants[tenant_id]
+        state.running -= 1
+        self._running -= 1
+        self._dispatch()
+    
+    async def run(self, tenant_id: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Run `call` once the tenant is granted a slot"""
+        await self._acquire(tenant_id)
+        try:
+            return await call()
+        finally:
+            self._release(tenant_id)
+    
+    def stats(self) -> Dict[str, Dict]:
+        """Per-tenant queue depth, concurrency and queue-wait metrics"""
+        return {
+            tenant_id: {
+                "weight": state.weight,
+                "max_concurrency": state.max_concurrency,
+                "running": state.running,
+                "queued": len(state.queue),
+                "dispatched": state.dispatched,
+                "avg_wait_ms": round(state.total_wait / state.dispatched * 1000, 3)
+                if state.dispatched else 0.0,
+                "max_wait_ms": round(state.max_wait * 1000, 3),
+            }
+            for tenant_id, state in self._tenants.items()
+        }
+    
+    def collect_metrics(self):
+        """Queue depth and running calls per tenant, read at scrape time"""
+        yield ("llm_queue_depth", "gauge", "Calls waiting for a scheduler slot", [
+            ({"tenant": tenant_id}, len(state.queue)) for tenant_id, state in self._tenants.items()
+        ])
+        yield ("llm_running_calls", "gauge", "Calls holding a scheduler slot", [
+            ({"tenant": tenant_id}, state.running) for tenant_id, state in self._tenants.items()
+        ])
+
+def _client_tenant_config(tenant_id: str) -> Tuple[float, int]:
+    from ..clients.client_manager import get_client_manager, ClientSettings
+    
+    client = get_client_manager().clients.get(tenant_id)
+    if client is None:
+        fields = ClientSettings.model_fields
+        return fields["scheduling_weight"].default, fields["max_concurrent_requests"].default
+    return client.scheduling_weight, client.max_concurrent_requests
+
+# Singleton instance
+scheduler: TenantScheduler = None
+
+def get_scheduler() -> TenantScheduler:
+    """Get or create the LLM/embedding scheduler"""
+    global scheduler
+    if scheduler is None:
+        scheduler = TenantScheduler(
+            max_concurrency=get_settings().LLM_MAX_CONCURRENCY,
+            tenant_config=_client_tenant_config
+        )
+        get_registry().register_collector(scheduler.collect_metrics)
+    return scheduler
@@ -1,3 +1,4 @@
 from .user_analytics import get_analytics_manager
+from .lead_signals import get_signal_matcher, LeadSignalMatcher
 
-__all__ = ['get_analytics_manager'] 
\ No newline at end of file
+__all__ = ['get_analytics_manager', 'get_signal_matcher', 'LeadSignalMatcher'] 
\ No newline at end of file
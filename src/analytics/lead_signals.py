@@ -0,0 +1,133 @@
+from typing import Dict, Iterable, Optional
+import re
+import threading
+
+# Buying signals used when a client hasn't configured its own (signal -> points)
+DEFAULT_SIGNALS: Dict[str, float] = {
+    "price": 5,
+    "cost": 5,
+    "buy": 5,
+    "purchase": 5,
+    "interested": 5,
+    "demo": 5,
+}
+
+# Engagement scoring: points per interaction past the threshold
+ENGAGEMENT_THRESHOLD = 10
+ENGAGEMENT_POINTS = 2
+
+# Separates the signals of one message in UserProfile.signal_counts keys
+COMBINATION_SEPARATOR = "|"
+
+# Inflections accepted after a signal ("prices", "buying", "purchased")
+SUFFIXES = r"(?:s|es|d|ed|ing)?"
+
+def normalize_signal(signal: str) -> str:
+    return " ".join(signal.lower().split())
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Regex alternation factored as a prefix trie.
+    
+    "buy|buyer|budget" becomes "bu(?:dget|y(?:er)?)", so the regex engine
+    walks each position once instead of trying every signal in turn.
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of a term
+    return _node_pattern(trie)
+
+def _node_pattern(node: Dict[str, dict]) -> str:
+    alternatives = [
+        (r"\s+" if char == " " else re.escape(char)) + _node_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not alternatives:
+        return ""
+    pattern = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    if "" in node:
+        pattern = f"(?:{pattern})?"
+    return pattern
+
+class LeadSignalMatcher:
+    """
+    Finds weighted buying signals in a message in one regex pass.
+    
+    Signals match whole words or phrases, case-insensitively and with common
+    inflections, so "cost" matches "costs" but not "costume". Where signals
+    overlap the longest one wins ("payment plan" over "payment").
+    
+    A message scores the largest weight among its signals, or the sum of
+    them with `sum_signals`.
+    """
+    
+    def __init__(self, signals: Dict[str, float], sum_signals: bool = False):
+        self.signals = {normalize_signal(signal): weight for signal, weight in signals.items()}
+        self.sum_signals = sum_signals
+        terms = [signal for signal in self.signals if signal]
+        # Signals are lowercase; lowering the text once beats re.IGNORECASE
+        self._pattern = re.compile(
+            rf"\b({_trie_pattern(terms)}){SUFFIXES}\b"
+        ) if terms else None
+    
+    def match(self, text: str) -> Dict[str, float]:
+        """Distinct signals found in `text`, with their weights"""
+        if self._pattern is None:
+            return {}
+        found = {}
+        for match in self._pattern.finditer(text.lower()):
+            signal = normalize_signal(match.group(1))
+            found[signal] = self.signals[signal]
+        return found
+    
+    def points(self, signals: Iterable[str]) -> float:
+        """Points for one message matching `signals`, at the current weights"""
+        weights = [self.signals.get(signal, 0) for signal in signals]
+        if not weights:
+            return 0
+        return sum(weights) if self.sum_signals else max(weights)
+    
+    def score(self, text: str) -> float:
+        return self.points(self.match(text))
+
+def untracked_signal_points(
+    matcher: LeadSignalMatcher,
+    score: float,
+    interactions: int,
+    messages: Iterable[str]
+) -> float:
+    """
+    Estimated signal points of interactions whose matches weren't counted.
+    
+    At least what the retained messages show, and at least what the stored
+    score holds beyond engagement points (the history keeps 10 turns only).
+    """
+    engagement = ENGAGEMENT_POINTS * max(interactions - ENGAGEMENT_THRESHOLD, 0)
+    return max(sum(matcher.score(message) for message in messages), score - engagement, 0)
+
+# client_id -> (signal config the matcher was built from, matcher)
+_matchers: Dict[str, tuple] = {}
+_matchers_lock = threading.Lock()
+
+def get_signal_matcher(
+    client_id: str,
+    signals: Optional[Dict[str, float]] = None,
+    sum_signals: bool = False
+) -> LeadSignalMatcher:
+    """
+    Compiled matcher for a client's signals (DEFAULT_SIGNALS when None/empty).
+    
+    Cached per client and rebuilt when the client's signal dict is replaced,
+    which is what a settings update does.
+    """
+    signals = signals or DEFAULT_SIGNALS
+    cached = _matchers.get(client_id)
+    if cached is not None and cached[0] is signals and cached[1].sum_signals == sum_signals:
+        return cached[1]
+    matcher = LeadSignalMatcher(signals, sum_signals)
+    with _matchers_lock:
+        _matchers[client_id] = (signals, matcher)
+    return matcher
@@ -0,0 +1,288 @@
+"""
+Bulk lead re-scoring, for applying changed scoring rules to existing users.
+
+Users are streamed per client in batches. Features are extracted once per
+user, and scores and qualification statuses are computed for the whole batch
+with numpy. Changed profiles are written back in bulk.
+
+    python -m src.analytics.rescoring acme other-client --dry-run --diff diffs.jsonl
+    python -m src.analytics.rescoring --all
+"""
+from typing import IO, TYPE_CHECKING, Callable, Counter as CounterType, Dict, List, Optional, Tuple
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+
+import numpy as np
+
+from ..database.models import LeadScore, QualificationStatus, UserProfile
+from .lead_signals import (
+    COMBINATION_SEPARATOR,
+    ENGAGEMENT_POINTS,
+    ENGAGEMENT_THRESHOLD,
+    LeadSignalMatcher,
+    untracked_signal_points,
+)
+
+if TYPE_CHECKING:
+    from ..clients.user_manager import UserManager
+
+logger = logging.getLogger(__name__)
+
+# Status codes used in the score arrays; order matters for the thresholds
+STATUSES = [
+    QualificationStatus.NEW,
+    QualificationStatus.INVESTIGATING,
+    QualificationStatus.QUALIFIED,
+    QualificationStatus.HIGHLY_QUALIFIED,
+    QualificationStatus.CUSTOMER,
+]
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+@dataclass
+class ScoringRules:
+    """
+    Rules for scoring a user from their whole record.
+    
+    The defaults reproduce the per-message rules in UserManager: engagement
+    points for every interaction past the threshold, plus the points, at the
+    current weights, of the signal combinations counted in
+    UserProfile.signal_counts.
+    Interactions from before signals were counted contribute their estimated
+    points as they are (see untracked_signal_points).
+    
+    Statuses are only raised, as in the live path, unless `allow_downgrade`
+    is set; customers always stay customers.
+    """
+    engagement_threshold: int = ENGAGEMENT_THRESHOLD
+    engagement_points: float = ENGAGEMENT_POINTS
+    # Points lost per day of inactivity after `stale_after_days` (0 disables)
+    stale_after_days: float = 30
+    stale_points_per_day: float = 0
+    investigating_score: int = 30
+    qualified_score: int = 60
+    highly_qualified_score: int = 80
+    max_score: int = 100
+    allow_downgrade: bool = False
+
+def score_batch(
+    interaction_counts: np.ndarray,
+    signal_points: np.ndarray,
+    idle_days: np.ndarray,
+    current_status: np.ndarray,
+    rules: ScoringRules
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Scores and status codes for a batch of users' feature arrays"""
+    engagement = rules.engagement_points * np.maximum(interaction_counts - rules.engagement_threshold, 0)
+    staleness = rules.stale_points_per_day * np.maximum(idle_days - rules.stale_after_days, 0)
+    scores = np.clip(np.rint(engagement + signal_points - staleness), 0, rules.max_score).astype(np.int64)
+    
+    status = np.select(
+        [
+            scores >= rules.highly_qualified_score,
+            scores >= rules.qualified_score,
+            scores >= rules.investigating_score,
+        ],
+        [
+            STATUS_CODES[QualificationStatus.HIGHLY_QUALIFIED],
+            STATUS_CODES[QualificationStatus.QUALIFIED],
+            STATUS_CODES[QualificationStatus.INVESTIGATING],
+        ],
+        default=STATUS_CODES[QualificationStatus.NEW]
+    )
+    if not rules.allow_downgrade:
+        # Codes are ordered, so this keeps the higher of the two
+        return scores, np.maximum(status, current_status)
+    # Customers stay customers whatever their score
+    customer = STATUS_CODES[QualificationStatus.CUSTOMER]
+    status = np.where(current_status == customer, customer, status)
+    return scores, status
+
+@dataclass
+class RescoreReport:
+    client_id: str
+    dry_run: bool
+    users: int = 0
+    changed: int = 0
+    written: int = 0
+    conflicts: int = 0
+    seconds: float = 0.0
+    transitions: CounterType[Tuple[str, str]] = field(default_factory=Counter)
+    
+    def as_dict(self) -> Dict:
+        return {
+            "client_id": self.client_id,
+            "dry_run": self.dry_run,
+            "users": self.users,
+            "changed": self.changed,
+            "written": self.written,
+            "conflicts": self.conflicts,
+            "seconds": round(self.seconds, 3),
+            "status_transitions": {
+                f"{old}->{new}": count for (old, new), count in self.transitions.most_common()
+            },
+        }
+
+class LeadRescorer:
+    """Re-scores every user of a client with the current rules and signals"""
+    
+    def __init__(
+        self,
+        user_manager: "UserManager",
+        rules: Optional[ScoringRules] = None,
+        batch_size: int = 10_000,
+        now: Callable[[], datetime] = datetime.now
+    ):
+        self.user_manager = user_manager
+        self.rules = rules or ScoringRules()
+        self.batch_size = batch_size
+        self.now = now
+    
+    def features(
+        self,
+        users: List[UserProfile],
+        matcher: LeadSignalMatcher
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Per-user feature arrays; the only per-user Python work"""
+        now = self.now().timestamp()
+        counts = np.fromiter((user.interaction_count for user in users), np.int64, len(users))
+        signal_points = np.fromiter(
+            (self._signal_points(user, matcher) for user in users), np.float64, len(users)
+        )
+        idle_days = (now - np.fromiter(
+            (user.last_interaction.timestamp() for user in users), np.float64, len(users)
+        )) / 86400
+        status = np.fromiter(
+            (STATUS_CODES[user.qualification_status] for user in users), np.int64, len(users)
+        )
+        return counts, signal_points, idle_days, status
+    
+    def _signal_points(self, user: UserProfile, matcher: LeadSignalMatcher) -> float:
+        if user.untracked_signal_points is None:
+            # Never updated since signals were counted
+            return untracked_signal_points(
+                matcher,
+                user.lead_score.score,
+                user.interaction_count,
+                (entry.get("message", "") for entry in user.conversation_history)
+            )
+        return user.untracked_signal_points + sum(
+            matcher.points(combination.split(COMBINATION_SEPARATOR)) * count
+            for combination, count in user.signal_counts.items()
+        )
+    
+    def _rescored(self, user: UserProfile, score: int, status_code: int, signal_points: float) -> UserProfile:
+        reasons = []
+        if user.interaction_count > self.rules.engagement_threshold:
+            reasons.append("High engagement")
+        if signal_points > 0:
+            reasons.append("Showing buying intent")
+        update = {
+            "lead_score": LeadScore(score=score, reasons=reasons, confidence=user.lead_score.confidence or 0.8),
+            "qualification_status": STATUSES[status_code],
+        }
+        if user.untracked_signal_points is None:
+            # Keep the estimate, so later runs don't re-derive it from the new score
+            update["untracked_signal_points"] = float(signal_points)
+        return user.model_copy(update=update)
+    
+    async def rescore_client(
+        self,
+        client_id: str,
+        matcher: LeadSignalMatcher,
+        dry_run: bool = False,
+        diff_file: Optional[IO[str]] = None
+    ) -> RescoreReport:
+        report = RescoreReport(client_id=client_id, dry_run=dry_run)
+        started = time.perf_counter()
+        
+        async for users in self.user_manager.iter_user_batches(client_id, self.batch_size):
+            counts, signal_points, idle_days, status = self.features(users, matcher)
+            scores, new_status = score_batch(counts, signal_points, idle_days, status, self.rules)
+            old_scores = np.fromiter((user.lead_score.score for user in users), np.int64, len(users))
+            changed = np.flatnonzero((scores != old_scores) | (new_status != status))
+            
+            report.users += len(users)
+            report.changed += len(changed)
+            updated = []
+            for index in changed:
+                user = users[index]
+                old, new = user.qualification_status.value, STATUSES[new_status[index]].value
+                if old != new:
+                    report.transitions[(old, new)] += 1
+                if diff_file is not None:
+                    diff_file.write(json.dumps({
+                        "client_id": client_id,
+                        "user_id": user.user_id,
+                        "score": [user.lead_score.score, int(scores[index])],
+                        "status": [old, new],
+                    }) + "\n")
+                if not dry_run:
+                    updated.append(self._rescored(user, int(scores[index]), new_status[index], signal_points[index]))
+            
+            if updated:
+                conflicts = await self.user_manager.save_users(updated, flush=False)
+                report.conflicts += len(conflicts)
+                report.written += len(updated) - len(conflicts)
+        
+        if not dry_run and report.written:
+            self.user_manager.flush()
+        report.seconds = time.perf_counter() - started
+        logger.info("Rescored client", extra=report.as_dict())
+        return report
+
+async def rescore(
+    client_ids: Optional[List[str]] = None,
+    dry_run: bool = False,
+    diff_file: Optional[IO[str]] = None,
+    batch_size: int = 10_000,
+    rules: Optional[ScoringRules] = None
+) -> List[RescoreReport]:
+    """Re-score the given clients (all clients with users when None)"""
+    from ..clients import get_client_manager, get_user_manager
+    from .lead_signals import get_signal_matcher
+    
+    user_manager = get_user_manager()
+    client_manager = get_client_manager()
+    rescorer = LeadRescorer(user_manager, rules=rules, batch_size=batch_size)
+    reports = []
+    for client_id in client_ids or await user_manager.client_ids():
+        client = await client_manager.get_client(client_id)
+        matcher = (
+            get_signal_matcher(client_id, client.lead_signals, client.sum_lead_signals)
+            if client else get_signal_matcher(client_id)
+        )
+        reports.append(await rescorer.rescore_client(client_id, matcher, dry_run=dry_run, diff_file=diff_file))
+    return reports
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-score leads with the current rules")
+    parser.add_argument("client_ids", nargs="*", help="clients to re-score")
+    parser.add_argument("--all", action="store_true", help="re-score every client with users")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing them")
+    parser.add_argument("--diff", help="write one JSON line per changed user to this file")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args(argv)
+    if not args.client_ids and not args.all:
+        parser.error("give client IDs or --all")
+    
+    diff_file = open(args.diff, "w") if args.diff else None
+    try:
+        reports = asyncio.run(rescore(
+            args.client_ids or None, dry_run=args.dry_run, diff_file=diff_file, batch_size=args.batch_size
+        ))
+    finally:
+        if diff_file is not None:
+            diff_file.close()
+    for report in reports:
+        print(json.dumps(report.as_dict()))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Header, HTTPException
+from typing import Optional
+import hmac
+from ..config import RELOADABLE_SETTINGS, changed_settings, get_settings, reload_settings
+from ..ai import get_scheduler
+
+router = APIRouter()
+
+def _check_admin_token(token: Optional[str]) -> None:
+    """Reject the request unless it carries the configured admin token"""
+    expected = get_settings().ADMIN_API_TOKEN
+    if not expected or not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+@router.post("/reload-config")
+async def reload_config(x_admin_token: Optional[str] = Header(None)):
+    _check_admin_token(x_admin_token)
+    before = get_settings()
+    try:
+        after = reload_settings()
+    except Exception as e:
+        # The previous snapshot is still active
+        raise HTTPException(status_code=422, detail=f"Invalid configuration: {e}")
+    changed = changed_settings(before, after)
+    return {
+        "status": "reloaded",
+        "changed": changed,
+        # Captured by clients, pools and workers at creation; applied on restart
+        "restart_required": [name for name in changed if name not in RELOADABLE_SETTINGS],
+    }
+
+@router.get("/scheduler")
+async def scheduler_stats(x_admin_token: Optional[str] = Header(None)):
+    """Per-client LLM queue depth and queue-wait times"""
+    _check_admin_token(x_admin_token)
+    return get_scheduler().stats()
@@ -0,0 +1,70 @@
+from typing import Callable, Dict
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from ..config import get_settings
+from ..ai import get_openai_client
+from ..observability import get_registry
+from .messaging import get_message_provider
+
+router = APIRouter()
+
+def _warm_clients() -> None:
+    from ..clients import get_client_manager
+    get_client_manager()
+
+def _warm_database() -> None:
+    from ..database.connection import get_engine
+    get_engine()
+
+def _warm_vector_store() -> None:
+    from ..database import get_vector_store
+    get_vector_store()
+
+# Subsystems the webhook needs before it can serve traffic
+REQUIRED_WARMERS: Dict[str, Callable[[], object]] = {
+    "settings": get_settings,
+    "openai": get_openai_client,
+    "messaging": get_message_provider,
+    "clients": _warm_clients,
+}
+
+# Warmed and reported, but a failure here doesn't mark the instance unready
+OPTIONAL_WARMERS: Dict[str, Callable[[], object]] = {
+    "database": _warm_database,
+    "vector_store": _warm_vector_store,
+}
+
+async def _run_warmers(warmers: Dict[str, Callable[[], object]]) -> Dict[str, str]:
+    checks = {}
+    for name, warm in warmers.items():
+        try:
+            # Warmers may import packages or open connections
+            await run_in_threadpool(warm)
+            checks[name] = "ok"
+        except Exception as e:
+            checks[name] = f"error: {e}"
+    return checks
+
+@router.get("/ready")
+async def ready():
+    """Readiness probe: initializes lazy clients on first call"""
+    required = await _run_warmers(REQUIRED_WARMERS)
+    optional = await _run_warmers(OPTIONAL_WARMERS)
+    is_ready = all(status == "ok" for status in required.values())
+    
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "status": "ready" if is_ready else "not_ready",
+            "checks": {**required, **optional}
+        }
+    )
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(
+        content=get_registry().render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,9 +1,13 @@
 from enum import Enum
 from typing import Dict, Any, Optional
 from abc import ABC, abstractmethod
-from twilio.rest import Client
-import httpx
+import asyncio
+import logging
+import threading
 from ..config import get_settings
+from ..observability.tracing import span
+
+logger = logging.getLogger(__name__)
 
 class MessageProvider(ABC):
     @abstractmethod
@@ -16,6 +20,8 @@ class MessageProvider(ABC):
 
 class TwilioProvider(MessageProvider):
     def __init__(self):
+        from twilio.rest import Client
+        
         settings = get_settings()
         self.client = Client(
             settings.TWILIO_ACCOUNT_SID,
@@ -23,27 +29,31 @@ class TwilioProvider(MessageProvider):
         )
         # Always use the sandbox number format
         self.from_number = f"whatsapp:+14155238886"  # Hardcode the sandbox number for testing
-        print(f"Initialized TwilioProvider with number: {self.from_number}")  # Debug print
+        logger.info("Initialized TwilioProvider", extra={"from_number": self.from_number})
 
     async def send_message(self, to: str, message: str, **kwargs) -> Dict[str, Any]:
         try:
             # Ensure WhatsApp format for to_number
             to_number = f"whatsapp:{to}" if not to.startswith("whatsapp:") else to
             
-            print(f"\nDebug Info:")
-            print(f"From Number: {self.from_number}")
-            print(f"To Number: {to_number}")
-            print(f"Message: {message}\n")
-            
-            response = self.client.messages.create(
-                from_=self.from_number,
-                body=message,
-                to=to_number
+            logger.debug(
+                "Sending message",
+                extra={"from_number": self.from_number, "to_number": to_number, "body": message}
             )
-            print(f"Message sent successfully: {response.sid}")
+            
+            with span("twilio.send_message") as send_span:
+                # The Twilio client is blocking; keep it off the event loop
+                response = await asyncio.to_thread(
+                    self.client.messages.create,
+                    from_=self.from_number,
+                    body=message,
+                    to=to_number
+                )
+                send_span.set_attribute("message_id", response.sid)
+            logger.info("Message sent", extra={"message_id": response.sid, "to_number": to_number})
             return {"message_id": response.sid, "status": response.status}
         except Exception as e:
-            print(f"Error details: {str(e)}")
+            logger.error(f"Error sending message: {e}", extra={"to_number": to})
             raise
 
     async def process_webhook(self, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -62,4 +72,31 @@ class MetaProvider(MessageProvider):
         self.phone_number_id = settings.WHATSAPP_PHONE_NUMBER_ID
         self.base_url = f"https://graph.facebook.com/v17.0"
 
-    # Your existing Meta implementation... 
\ No newline at end of file
+    # Your existing Meta implementation... 
+
+# MetaProvider is registered once it implements send_message and process_webhook
+PROVIDERS = {
+    "twilio": TwilioProvider,
+}
+
+# Singleton instance
+message_provider: MessageProvider = None
+_message_provider_lock = threading.Lock()
+
+def get_message_provider() -> MessageProvider:
+    """Get or create the configured WhatsApp message provider"""
+    global message_provider
+    provider = message_provider
+    if provider is None:
+        # /ready warms this from the threadpool, concurrently with requests
+        with _message_provider_lock:
+            if message_provider is None:
+                provider_name = get_settings().WHATSAPP_PROVIDER
+                if provider_name not in PROVIDERS:
+                    logger.warning(
+                        f"WhatsApp provider {provider_name!r} is not implemented, sending through Twilio"
+                    )
+                    provider_name = "twilio"
+                message_provider = PROVIDERS[provider_name]()
+            provider = message_provider
+    return provider
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from ..config import get_settings
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -11,11 +14,9 @@ async def incoming_sms(request: Request):
         message = form_data.get('Body')
         from_number = form_data.get('From')
         
-        print(f"\nReceived SMS:")
-        print(f"From: {from_number}")
-        print(f"Message: {message}\n")
+        logger.info("Received SMS", extra={"from_number": from_number, "message_body": message})
         
         return {"status": "success"}
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.error(f"Error handling SMS: {e}")
         return {"status": "error"} 
\ No newline at end of file
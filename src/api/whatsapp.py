@@ -1,12 +1,104 @@
 from fastapi import APIRouter, Request, HTTPException
 from twilio.request_validator import RequestValidator
 from ..config import get_settings
-from openai import OpenAI
+from ..ai import get_llm_client, get_scheduler, route_message
+from ..whatsapp import get_deduplicator, get_coalescer
+from ..observability.metrics import MESSAGE_SEND_LATENCY, CACHE_HITS, ERRORS
+from ..observability.tracing import span
+from .messaging import get_message_provider
 import logging
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
-settings = get_settings()
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+
+# Client used for numbers that aren't registered with the ClientManager
+DEFAULT_CLIENT_ID = "default"
+
+async def resolve_client_id(to_number: str) -> str:
+    """Map the number a message was sent to onto the owning client"""
+    # Imported here to keep the client store (and SQLAlchemy) off the import path
+    from ..clients import get_client_manager
+    
+    with span("resolve_client"):
+        client = await get_client_manager().get_client_by_number(to_number)
+        return client.client_id if client else DEFAULT_CLIENT_ID
+
+async def generate_reply(message_body: str, client_id: str = DEFAULT_CLIENT_ID) -> str:
+    """Generate the AI response for a (possibly merged) user message"""
+    from ..clients import get_client_manager
+    from ..document_processing.faq_index import get_faq_store
+    
+    client = await get_client_manager().get_client(client_id)
+    
+    # Curated FAQ answers are sent verbatim, without an LLM call
+    threshold = client.faq_threshold if client and client.faq_threshold is not None else get_settings().FAQ_MATCH_THRESHOLD
+    faq_answer = await get_faq_store().answer(message_body, client_id, threshold)
+    if faq_answer is not None:
+        return faq_answer
+    
+    route = route_message(message_body, client_id, client)
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant for Dubai real estate services and inforamtion. Keep responses clear and concise, under 1500 characters. Provide brief, actionable information."},
+        {"role": "user", "content": message_body}
+    ]
+    
+    # The LLM client bounds the call with timeouts, hedging and fallbacks.
+    # The scheduler keeps one client's burst from using all OpenAI concurrency.
+    # Time spent queued in the scheduler is the gap before llm.completion.
+    with span("generate_reply", client_id=client_id, merged_length=len(message_body), tier=route.tier) as reply_span:
+        result = await get_scheduler().run(
+            client_id,
+            lambda: get_llm_client().complete(
+                messages,
+                tenant_id=client_id,
+                model=route.model,
+                max_tokens=route.max_tokens,
+                temperature=route.temperature
+            )
+        )
+        reply_span.set_attribute("model", result.model)
+        reply_span.set_attribute("fallback", result.fallback)
+    logger.debug("AI response generated", extra={"client_id": client_id, "reply": result.text})
+    return result.text
+
+async def send_reply(to: str, message: str, client_id: str = DEFAULT_CLIENT_ID) -> None:
+    settings = get_settings()
+    provider = get_message_provider()
+    try:
+        with MESSAGE_SEND_LATENCY.time(tenant=client_id, provider=settings.WHATSAPP_PROVIDER):
+            await provider.send_message(to=to, message=message)
+    except Exception:
+        ERRORS.inc(tenant=client_id, stage="send")
+        raise
+
+async def handle_message(form_data) -> dict:
+    """Generate and send the reply for one inbound message"""
+    settings = get_settings()
+    
+    # Extract message details
+    message_body = form_data.get("Body", "")
+    from_number = form_data.get("From", "")
+    client_id = await resolve_client_id(form_data.get("To", ""))
+    
+    logger.info(
+        "Received message",
+        extra={"client_id": client_id, "from_number": from_number, "message_body": message_body}
+    )
+    
+    if settings.DEBOUNCE_WINDOW_MS <= 0:
+        ai_response = await generate_reply(message_body, client_id)
+        await send_reply(from_number, ai_response, client_id)
+        return {"status": "success"}
+    
+    # Bursts of short messages are answered once, in the background
+    await get_coalescer().submit(
+        f"{client_id}:{from_number}",
+        message_body,
+        generate=lambda text: generate_reply(text, client_id),
+        deliver=lambda reply: send_reply(from_number, reply, client_id)
+    )
+    return {"status": "queued"}
 
 @router.post("/webhook")
 async def webhook(request: Request):
@@ -14,32 +106,22 @@ async def webhook(request: Request):
         # Get the form data from the request
         form_data = await request.form()
         
-        # Extract message details
-        message_body = form_data.get("Body", "")
-        from_number = form_data.get("From", "")
+        with span("webhook", message_id=form_data.get("MessageSid", "")) as webhook_span:
+            # Provider retries reuse the MessageSid; process each one only once
+            result, duplicate = await get_deduplicator().process_once(
+                form_data.get("MessageSid", ""),
+                lambda: handle_message(form_data)
+            )
+            webhook_span.set_attribute("duplicate", duplicate)
+            if duplicate:
+                client_id = await resolve_client_id(form_data.get("To", ""))
+                CACHE_HITS.inc(tenant=client_id, cache="webhook_dedup")
+                logger.info(
+                    "Duplicate delivery",
+                    extra={"client_id": client_id, "message_id": form_data.get("MessageSid")}
+                )
         
-        # Print message details
-        print(f"\nReceived Message:")
-        print(f"From: {from_number}")
-        print(f"Message: {message_body}\n")
-        
-        # Generate AI response
-        response = client.chat.completions.create(
-            model=settings.MODEL_NAME,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant for Dubai real estate services and inforamtion. Keep responses clear and concise, under 1500 characters. Provide brief, actionable information."},
-                {"role": "user", "content": message_body}
-            ]
-        )
-        ai_response = response.choices[0].message.content
-        print(f"AI Response: {ai_response}\n")
-        
-        # Send response
-        from ..api.messaging import TwilioProvider
-        provider = TwilioProvider()
-        await provider.send_message(to=from_number, message=ai_response)
-        
-        return {"status": "success"}
+        return result
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.exception(f"Error handling webhook: {e}")
         raise HTTPException(status_code=500, detail=str(e))
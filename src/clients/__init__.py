@@ -1,4 +1,8 @@
 from .user_manager import get_user_manager
 from .client_manager import get_client_manager, ClientSettings
+from .state_backend import get_state_backend, StateBackend, VersionConflict
 
-__all__ = ['get_user_manager', 'get_client_manager', 'ClientSettings']
+__all__ = [
+    'get_user_manager', 'get_client_manager', 'ClientSettings',
+    'get_state_backend', 'StateBackend', 'VersionConflict'
+]
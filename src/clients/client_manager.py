@@ -1,11 +1,22 @@
 from typing import Dict, Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+import asyncio
 import json
+import logging
+import time
 from pathlib import Path
 
+from ..config import get_settings
+from .state_backend import StateBackend, get_state_backend
+
+logger = logging.getLogger(__name__)
+
 class ClientSettings(BaseModel):
     """Client-specific settings"""
+    # Allows the model_tiers field
+    model_config = ConfigDict(protected_namespaces=())
+    
     client_id: str
     whatsapp_number: str
     active: bool = True
@@ -15,12 +26,57 @@ class ClientSettings(BaseModel):
     updated_at: datetime = datetime.now()
     custom_instructions: Optional[str] = None
     allowed_file_types: List[str] = [".txt", ".pdf", ".csv", ".json"]
+    # Share of LLM/embedding capacity relative to other clients
+    scheduling_weight: float = 1.0
+    max_concurrent_requests: int = 4
+    # Model per routing tier ("fast", "standard", "advanced"); unset tiers use the defaults
+    model_tiers: Dict[str, str] = {}
+    # Buying signals (word or phrase -> lead score points); empty uses the defaults
+    lead_signals: Dict[str, float] = {}
+    # Add up every signal in a message instead of scoring only the strongest
+    sum_lead_signals: bool = False
+    # Similarity needed to answer from the client's FAQ; None uses FAQ_MATCH_THRESHOLD
+    faq_threshold: Optional[float] = None
 
 class ClientManager:
-    def __init__(self):
+    """
+    Client settings, cached in memory.
+    
+    With a StateBackend the cache is shared state: writes go to the backend
+    row by row, and reads reload the cache when the backend's change counter
+    shows another worker changed a client (checked at most every
+    `refresh_seconds`).
+    """
+    
+    def __init__(self, backend: Optional[StateBackend] = None, refresh_seconds: float = 2.0):
         self.clients: Dict[str, ClientSettings] = {}
+        self.clients_by_number: Dict[str, str] = {}  # whatsapp_number -> client_id
         self.data_file = Path("data/clients.json")
-        self._load_clients()
+        self.backend = backend
+        self.refresh_seconds = refresh_seconds
+        self._version = -1
+        self._next_check = 0.0
+        if backend is None:
+            self._load_clients()
+        else:
+            self._refresh()
+    
+    def _refresh(self) -> None:
+        """Reload the cache from the backend if any client changed"""
+        version = self.backend.clients_version()
+        self._next_check = time.monotonic() + self.refresh_seconds
+        if version == self._version:
+            return
+        self.clients = {
+            client_id: ClientSettings(**settings)
+            for client_id, settings in self.backend.load_clients().items()
+        }
+        self._index_numbers()
+        self._version = version
+    
+    async def _refresh_if_due(self) -> None:
+        if self.backend is not None and time.monotonic() >= self._next_check:
+            await asyncio.to_thread(self._refresh)
     
     def _load_clients(self) -> None:
         """Load clients from JSON file"""
@@ -35,8 +91,20 @@ class ClientManager:
                         for client_id, settings in data.items()
                     }
             except Exception as e:
-                print(f"Error loading clients: {e}")
+                logger.error(f"Error loading clients: {e}")
                 self.clients = {}
+        self._index_numbers()
+    
+    @staticmethod
+    def _normalize_number(number: str) -> str:
+        return number.replace("whatsapp:", "").strip()
+    
+    def _index_numbers(self) -> None:
+        """Rebuild the WhatsApp number -> client lookup"""
+        self.clients_by_number = {
+            self._normalize_number(client.whatsapp_number): client_id
+            for client_id, client in self.clients.items()
+        }
     
     def _save_clients(self) -> None:
         """Save clients to JSON file"""
@@ -52,7 +120,16 @@ class ClientManager:
                     indent=2
                 )
         except Exception as e:
-            print(f"Error saving clients: {e}")
+            logger.error(f"Error saving clients: {e}")
+    
+    async def _store(self, client: ClientSettings) -> None:
+        """Persist one client and update the cache"""
+        self.clients[client.client_id] = client
+        self._index_numbers()
+        if self.backend is None:
+            self._save_clients()
+        else:
+            await asyncio.to_thread(self.backend.save_client, client.client_id, client.dict())
     
     async def create_client(
         self,
@@ -61,6 +138,7 @@ class ClientManager:
         custom_instructions: Optional[str] = None
     ) -> ClientSettings:
         """Create a new client"""
+        await self._refresh_if_due()
         if client_id in self.clients:
             raise ValueError(f"Client {client_id} already exists")
         
@@ -70,14 +148,26 @@ class ClientManager:
             custom_instructions=custom_instructions
         )
         
-        self.clients[client_id] = client
-        self._save_clients()
+        if self.backend is not None:
+            if not await asyncio.to_thread(self.backend.add_client, client_id, client.dict()):
+                raise ValueError(f"Client {client_id} already exists")
+            self.clients[client_id] = client
+            self._index_numbers()
+        else:
+            await self._store(client)
         return client
     
     async def get_client(self, client_id: str) -> Optional[ClientSettings]:
         """Get client settings"""
+        await self._refresh_if_due()
         return self.clients.get(client_id)
     
+    async def get_client_by_number(self, whatsapp_number: str) -> Optional[ClientSettings]:
+        """Get the client that owns a WhatsApp number"""
+        await self._refresh_if_due()
+        client_id = self.clients_by_number.get(self._normalize_number(whatsapp_number))
+        return self.clients.get(client_id) if client_id else None
+    
     async def update_client(
         self,
         client_id: str,
@@ -87,6 +177,7 @@ class ClientManager:
         **kwargs
     ) -> ClientSettings:
         """Update client settings"""
+        await self._refresh_if_due()
         if client_id not in self.clients:
             raise ValueError(f"Client {client_id} not found")
         
@@ -105,17 +196,21 @@ class ClientManager:
         updated_client = client.copy(update=update_data)
         updated_client.updated_at = datetime.now()
         
-        self.clients[client_id] = updated_client
-        self._save_clients()
+        await self._store(updated_client)
         return updated_client
     
     async def delete_client(self, client_id: str) -> None:
         """Delete a client"""
+        await self._refresh_if_due()
         if client_id not in self.clients:
             raise ValueError(f"Client {client_id} not found")
         
         del self.clients[client_id]
-        self._save_clients()
+        self._index_numbers()
+        if self.backend is None:
+            self._save_clients()
+        else:
+            await asyncio.to_thread(self.backend.delete_client, client_id)
 
 # Singleton instance
 client_manager: ClientManager = None
@@ -124,5 +219,8 @@ def get_client_manager() -> ClientManager:
     """Get or create client manager instance"""
     global client_manager
     if client_manager is None:
-        client_manager = ClientManager()
+        client_manager = ClientManager(
+            backend=get_state_backend(),
+            refresh_seconds=get_settings().CLIENT_CONFIG_REFRESH_SECONDS
+        )
     return client_manager 
\ No newline at end of file
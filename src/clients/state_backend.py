@@ -0,0 +1,280 @@
+from typing import Dict, List, Optional
+from abc import ABC, abstractmethod
+import json
+import logging
+
+from sqlalchemy import (
+    Column, Integer, MetaData, String, Table, Text, create_engine, event, select
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateTable
+
+from ..config import get_settings
+from ..database.models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+class VersionConflict(Exception):
+    """Raised when a profile was changed by another worker since it was read"""
+    pass
+
+class StateBackend(ABC):
+    """Storage for client settings and user profiles shared by all workers"""
+    
+    @abstractmethod
+    def get_user(self, client_id: str, user_id: str) -> Optional[UserProfile]:
+        pass
+    
+    @abstractmethod
+    def save_user(self, profile: UserProfile) -> UserProfile:
+        """
+        Write `profile` if it is still at the version it was read at.
+        
+        Returns the stored profile with its new version, or raises
+        VersionConflict when another worker wrote the row in between.
+        A profile at version 0 is new and conflicts if the row exists.
+        """
+        pass
+    
+    @abstractmethod
+    def list_users(self, client_id: str) -> List[UserProfile]:
+        pass
+    
+    @abstractmethod
+    def list_users_page(self, client_id: str, after: Optional[str], limit: int) -> List[UserProfile]:
+        """Up to `limit` users ordered by user ID, starting after `after`"""
+        pass
+    
+    @abstractmethod
+    def save_users(self, profiles: List[UserProfile]) -> List[str]:
+        """Write many profiles in one transaction; returns the IDs that conflicted"""
+        pass
+    
+    @abstractmethod
+    def user_client_ids(self) -> List[str]:
+        """Clients that have at least one user"""
+        pass
+    
+    @abstractmethod
+    def load_clients(self) -> Dict[str, Dict]:
+        """All client settings as stored dicts, keyed by client ID"""
+        pass
+    
+    @abstractmethod
+    def add_client(self, client_id: str, settings: Dict) -> bool:
+        """Insert a client; False if the ID is already taken"""
+        pass
+    
+    @abstractmethod
+    def save_client(self, client_id: str, settings: Dict) -> None:
+        pass
+    
+    @abstractmethod
+    def delete_client(self, client_id: str) -> bool:
+        pass
+    
+    @abstractmethod
+    def clients_version(self) -> int:
+        """Counter bumped by every client write, for cache invalidation"""
+        pass
+
+metadata = MetaData()
+
+user_profiles = Table(
+    "user_profiles", metadata,
+    Column("client_id", String(100), primary_key=True),
+    Column("user_id", String(50), primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("data", Text, nullable=False),
+)
+
+client_settings = Table(
+    "client_settings", metadata,
+    Column("client_id", String(100), primary_key=True),
+    Column("data", Text, nullable=False),
+)
+
+state_versions = Table(
+    "state_versions", metadata,
+    Column("name", String(50), primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+class SQLStateBackend(StateBackend):
+    """
+    State in a SQL database: a SQLite file in WAL mode for several workers on
+    one host, or Postgres for several hosts.
+    
+    Every write touches only its own row. User profiles carry a version that
+    is compared on update, so concurrent read-modify-write cycles on the same
+    user fail with VersionConflict instead of silently losing an interaction.
+    """
+    
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(url, pool_pre_ping=True)
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", _configure_sqlite)
+        with self.engine.begin() as conn:
+            # IF NOT EXISTS because workers start, and create tables, concurrently
+            for table in metadata.sorted_tables:
+                conn.execute(CreateTable(table, if_not_exists=True))
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(state_versions.insert().values(name="clients", version=0))
+        except IntegrityError:
+            pass  # Another worker seeded it
+    
+    def _profile(self, row) -> UserProfile:
+        profile = UserProfile.model_validate_json(row.data)
+        profile.version = row.version
+        return profile
+    
+    def get_user(self, client_id: str, user_id: str) -> Optional[UserProfile]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(user_profiles.c.version, user_profiles.c.data).where(
+                    user_profiles.c.client_id == client_id,
+                    user_profiles.c.user_id == user_id
+                )
+            ).first()
+        return self._profile(row) if row else None
+    
+    def save_user(self, profile: UserProfile) -> UserProfile:
+        data = profile.model_dump_json(exclude={"version"})
+        with self.engine.begin() as conn:
+            if profile.version == 0:
+                try:
+                    conn.execute(user_profiles.insert().values(
+                        client_id=profile.client_id, user_id=profile.user_id, version=1, data=data
+                    ))
+                except IntegrityError:
+                    raise VersionConflict(f"User {profile.user_id} already exists")
+            else:
+                result = conn.execute(
+                    user_profiles.update()
+                    .where(
+                        user_profiles.c.client_id == profile.client_id,
+                        user_profiles.c.user_id == profile.user_id,
+                        user_profiles.c.version == profile.version
+                    )
+                    .values(version=user_profiles.c.version + 1, data=data)
+                )
+                if result.rowcount != 1:
+                    raise VersionConflict(
+                        f"User {profile.user_id} changed since version {profile.version}"
+                    )
+        return profile.model_copy(update={"version": profile.version + 1})
+    
+    def list_users(self, client_id: str) -> List[UserProfile]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(user_profiles.c.version, user_profiles.c.data)
+                .where(user_profiles.c.client_id == client_id)
+            )
+            return [self._profile(row) for row in rows]
+    
+    def list_users_page(self, client_id: str, after: Optional[str], limit: int) -> List[UserProfile]:
+        query = (
+            select(user_profiles.c.version, user_profiles.c.data)
+            .where(user_profiles.c.client_id == client_id)
+            .order_by(user_profiles.c.user_id)
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(user_profiles.c.user_id > after)
+        with self.engine.connect() as conn:
+            return [self._profile(row) for row in conn.execute(query)]
+    
+    def save_users(self, profiles: List[UserProfile]) -> List[str]:
+        conflicts = []
+        with self.engine.begin() as conn:
+            for profile in profiles:
+                result = conn.execute(
+                    user_profiles.update()
+                    .where(
+                        user_profiles.c.client_id == profile.client_id,
+                        user_profiles.c.user_id == profile.user_id,
+                        user_profiles.c.version == profile.version
+                    )
+                    .values(
+                        version=user_profiles.c.version + 1,
+                        data=profile.model_dump_json(exclude={"version"})
+                    )
+                )
+                if result.rowcount != 1:
+                    conflicts.append(profile.user_id)
+        return conflicts
+    
+    def user_client_ids(self) -> List[str]:
+        with self.engine.connect() as conn:
+            return list(conn.execute(select(user_profiles.c.client_id).distinct()).scalars())
+    
+    def load_clients(self) -> Dict[str, Dict]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(client_settings.c.client_id, client_settings.c.data))
+            return {row.client_id: json.loads(row.data) for row in rows}
+    
+    def _bump_clients_version(self, conn) -> None:
+        conn.execute(
+            state_versions.update()
+            .where(state_versions.c.name == "clients")
+            .values(version=state_versions.c.version + 1)
+        )
+    
+    def add_client(self, client_id: str, settings: Dict) -> bool:
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(client_settings.insert().values(
+                    client_id=client_id, data=json.dumps(settings, default=str)
+                ))
+                self._bump_clients_version(conn)
+        except IntegrityError:
+            return False
+        return True
+    
+    def save_client(self, client_id: str, settings: Dict) -> None:
+        data = json.dumps(settings, default=str)
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                client_settings.update()
+                .where(client_settings.c.client_id == client_id)
+                .values(data=data)
+            )
+            if result.rowcount == 0:
+                conn.execute(client_settings.insert().values(client_id=client_id, data=data))
+            self._bump_clients_version(conn)
+    
+    def delete_client(self, client_id: str) -> bool:
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                client_settings.delete().where(client_settings.c.client_id == client_id)
+            )
+            if result.rowcount:
+                self._bump_clients_version(conn)
+        return result.rowcount > 0
+    
+    def clients_version(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(state_versions.c.version).where(state_versions.c.name == "clients")
+            ).scalar_one()
+
+def _configure_sqlite(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+# Singleton instance
+state_backend: Optional[StateBackend] = None
+
+def get_state_backend() -> Optional[StateBackend]:
+    """Get the shared state backend, or None to keep state in local JSON files"""
+    global state_backend
+    if state_backend is None:
+        url = get_settings().STATE_BACKEND_URL
+        if url:
+            state_backend = SQLStateBackend(url)
+    return state_backend
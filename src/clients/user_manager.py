@@ -1,20 +1,62 @@
-from typing import Dict, Optional, List
+from typing import AsyncIterator, Callable, Dict, Optional, List
 from datetime import datetime, timedelta
 from pathlib import Path
+import asyncio
 import json
 import logging
+import random
 
 from ..database.models import UserProfile, LeadScore, QualificationStatus
 from ..analytics import get_analytics_manager
+from ..analytics.lead_signals import (
+    COMBINATION_SEPARATOR,
+    ENGAGEMENT_POINTS,
+    ENGAGEMENT_THRESHOLD,
+    LeadSignalMatcher,
+    get_signal_matcher,
+    untracked_signal_points,
+)
+from ..observability.metrics import RETRIES
+from ..observability.tracing import span
+from .state_backend import StateBackend, VersionConflict, get_state_backend
 
 logger = logging.getLogger(__name__)
 
+# Attempts at an interaction update when other workers keep writing the same user
+MAX_UPDATE_ATTEMPTS = 10
+
+# Returns the compiled buying-signal matcher for a client
+SignalMatcherResolver = Callable[[str], LeadSignalMatcher]
+
+def _client_signal_matcher(client_id: str) -> LeadSignalMatcher:
+    from .client_manager import get_client_manager
+    
+    client = get_client_manager().clients.get(client_id)
+    if client is None:
+        return get_signal_matcher(client_id)
+    return get_signal_matcher(client_id, client.lead_signals, client.sum_lead_signals)
+
 class UserManager:
-    def __init__(self):
+    """
+    User profiles per client.
+    
+    Without a backend, profiles live in memory and are saved to a JSON file,
+    which is only safe for a single worker. With a StateBackend, every read
+    and write goes to the shared store row by row.
+    """
+    
+    def __init__(
+        self,
+        backend: Optional[StateBackend] = None,
+        signal_matcher: Optional[SignalMatcherResolver] = None
+    ):
         self.users: Dict[str, Dict[str, UserProfile]] = {}  # client_id -> {user_id -> profile}
         self.data_file = Path("data/users.json")
         self.analytics = get_analytics_manager()
-        self._load_users()
+        self.backend = backend
+        self.signal_matcher = signal_matcher or _client_signal_matcher
+        if backend is None:
+            self._load_users()
     
     def _load_users(self) -> None:
         """Load users from JSON file"""
@@ -38,7 +80,7 @@ class UserManager:
     def _save_users(self) -> None:
         """Save users to JSON file"""
         try:
-            with open(self.data_file, "w") as f:
+            with span("user.save"), open(self.data_file, "w") as f:
                 json.dump(
                     {
                         client_id: {
@@ -61,6 +103,9 @@ class UserManager:
         name: Optional[str] = None
     ) -> UserProfile:
         """Get existing user or create new one"""
+        if self.backend is not None:
+            return await self._get_or_create_stored_user(phone_number, client_id, name)
+        
         if client_id not in self.users:
             self.users[client_id] = {}
             
@@ -72,10 +117,30 @@ class UserManager:
             )
             self.users[client_id][phone_number] = user
             self._save_users()
-            logger.info(f"Created new user profile for {phone_number}")
+            logger.info("Created new user profile", extra={"client_id": client_id, "phone_number": phone_number})
         
         return self.users[client_id][phone_number]
 
+    async def _get_or_create_stored_user(
+        self,
+        phone_number: str,
+        client_id: str,
+        name: Optional[str]
+    ) -> UserProfile:
+        user = await asyncio.to_thread(self.backend.get_user, client_id, phone_number)
+        if user is not None:
+            return user
+        try:
+            user = await asyncio.to_thread(
+                self.backend.save_user,
+                UserProfile(user_id=phone_number, client_id=client_id, name=name)
+            )
+        except VersionConflict:
+            # Another worker created it first
+            return await asyncio.to_thread(self.backend.get_user, client_id, phone_number)
+        logger.info("Created new user profile", extra={"client_id": client_id, "phone_number": phone_number})
+        return user
+
     async def update_user_interaction(
         self,
         phone_number: str,
@@ -85,8 +150,49 @@ class UserManager:
         detected_interests: Optional[List[str]] = None
     ) -> UserProfile:
         """Update user interaction and analyze engagement"""
-        user = await self.get_or_create_user(phone_number, client_id)
+        with span("user.update_interaction", client_id=client_id):
+            return await self._update_user_interaction(
+                phone_number, client_id, message, response, detected_interests
+            )
+
+    async def _update_user_interaction(
+        self,
+        phone_number: str,
+        client_id: str,
+        message: str,
+        response: str,
+        detected_interests: Optional[List[str]] = None
+    ) -> UserProfile:
+        if self.backend is None:
+            user = await self.get_or_create_user(phone_number, client_id)
+            await self._apply_interaction(user, message, response, detected_interests)
+            self._save_users()
+            return user
         
+        # Optimistic concurrency: re-read and re-apply when another worker won
+        for attempt in range(1, MAX_UPDATE_ATTEMPTS + 1):
+            user = await self.get_or_create_user(phone_number, client_id)
+            await self._apply_interaction(user, message, response, detected_interests)
+            try:
+                return await asyncio.to_thread(self.backend.save_user, user)
+            except VersionConflict:
+                if attempt == MAX_UPDATE_ATTEMPTS:
+                    raise
+                RETRIES.inc(tenant=client_id, stage="user.update_interaction")
+                logger.info(
+                    "Retrying user update after a concurrent write",
+                    extra={"client_id": client_id, "phone_number": phone_number}
+                )
+                # Jitter so that colliding workers don't retry in lockstep
+                await asyncio.sleep(random.uniform(0, 0.01 * attempt))
+
+    async def _apply_interaction(
+        self,
+        user: UserProfile,
+        message: str,
+        response: str,
+        detected_interests: Optional[List[str]]
+    ) -> None:
         # Update basic metrics
         user.last_interaction = datetime.now()
         user.interaction_count += 1
@@ -106,25 +212,38 @@ class UserManager:
         
         # Update lead score based on interaction
         await self._update_lead_score(user, message)
-        
-        self._save_users()
-        return user
 
     async def _update_lead_score(self, user: UserProfile, message: str) -> None:
         """Update user's lead score based on interaction"""
         score = user.lead_score.score
         reasons = []
+        matcher = self.signal_matcher(user.client_id)
+        
+        if user.untracked_signal_points is None:
+            # First update that counts signal matches; earlier interactions
+            # are estimated from the history before this message and the score
+            user.untracked_signal_points = untracked_signal_points(
+                matcher,
+                score,
+                user.interaction_count - 1,
+                (entry.get("message", "") for entry in user.conversation_history[:-1])
+            )
         
         # Scoring based on interaction frequency
-        if user.interaction_count > 10:
-            score += 2
+        if user.interaction_count > ENGAGEMENT_THRESHOLD:
+            score += ENGAGEMENT_POINTS
             reasons.append("High engagement")
         
-        # Scoring based on buying signals in message
-        buying_signals = ["price", "cost", "buy", "purchase", "interested", "demo"]
-        if any(signal in message.lower() for signal in buying_signals):
-            score += 5
-            reasons.append("Showing buying intent")
+        # Scoring based on the client's buying signals in the message
+        signals = matcher.match(message)
+        if signals:
+            score += round(matcher.points(signals))
+            reasons.append(f"Showing buying intent ({', '.join(signals)})")
+            combination = COMBINATION_SEPARATOR.join(sorted(signals))
+            user.signal_counts = {
+                **user.signal_counts,
+                combination: user.signal_counts.get(combination, 0) + 1,
+            }
         
         # Update lead score
         user.lead_score = LeadScore(
@@ -141,20 +260,67 @@ class UserManager:
         elif score >= 30:
             user.qualification_status = QualificationStatus.INVESTIGATING
 
+    async def list_users(self, client_id: str) -> List[UserProfile]:
+        """All users of a client"""
+        if self.backend is not None:
+            return await asyncio.to_thread(self.backend.list_users, client_id)
+        return list(self.users.get(client_id, {}).values())
+
+    async def client_ids(self) -> List[str]:
+        """Clients that have users"""
+        if self.backend is not None:
+            return await asyncio.to_thread(self.backend.user_client_ids)
+        return [client_id for client_id, users in self.users.items() if users]
+
+    async def iter_user_batches(self, client_id: str, batch_size: int = 10_000) -> AsyncIterator[List[UserProfile]]:
+        """Stream a client's users in batches, without loading them all at once from a backend"""
+        if self.backend is None:
+            users = list(self.users.get(client_id, {}).values())
+            for start in range(0, len(users), batch_size):
+                yield users[start:start + batch_size]
+            return
+        
+        after = None
+        while True:
+            batch = await asyncio.to_thread(self.backend.list_users_page, client_id, after, batch_size)
+            if not batch:
+                return
+            yield batch
+            after = batch[-1].user_id
+
+    async def save_users(self, profiles: List[UserProfile], flush: bool = True) -> List[str]:
+        """
+        Store many updated profiles at once; returns the user IDs that were
+        changed concurrently and not written (backend only).
+        
+        Without a backend, `flush=False` only updates memory so that a bulk
+        job can write the JSON file once with flush() at the end.
+        """
+        if self.backend is not None:
+            return await asyncio.to_thread(self.backend.save_users, profiles)
+        for profile in profiles:
+            self.users.setdefault(profile.client_id, {})[profile.user_id] = profile
+        if flush:
+            self._save_users()
+        return []
+
+    def flush(self) -> None:
+        """Write in-memory users to the JSON file (no-op with a backend)"""
+        if self.backend is None:
+            self._save_users()
+
     async def get_client_analytics(self, client_id: str) -> Dict:
         """Get analytics for a client's users"""
-        if client_id not in self.users:
+        users = await self.list_users(client_id)
+        if not users:
             return {}
-            
-        users = list(self.users[client_id].values())
         return await self.analytics.get_client_analytics(users)
 
     async def get_user_segments(self, client_id: str) -> Dict:
         """Get user segments for a client"""
-        if client_id not in self.users:
+        users = await self.list_users(client_id)
+        if not users:
             return {}
-            
-        users = list(self.users[client_id].values())
         return await self.analytics.get_user_segments(users)
 
 # Singleton instance
@@ -164,5 +330,5 @@ def get_user_manager() -> UserManager:
     """Get or create user manager instance"""
     global user_manager
     if user_manager is None:
-        user_manager = UserManager()
+        user_manager = UserManager(backend=get_state_backend())
     return user_manager
@@ -1,11 +1,17 @@
 from pydantic_settings import BaseSettings
-from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv, find_dotenv
+from typing import Optional
+from dotenv import dotenv_values, load_dotenv, find_dotenv
+import logging
+import os
+import signal
+import threading
 
 # Force reload of environment variables
 load_dotenv(find_dotenv(), override=True)
 
+logger = logging.getLogger(__name__)
+
 class Settings(BaseSettings):
     # Base paths
     BASE_DIR: Path = Path(__file__).parent.parent
@@ -14,23 +20,82 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str
     PINECONE_API_KEY: str = "your_pinecone_api_key"  # Remove default if exists
     PINECONE_ENVIRONMENT: str = "us-east-1"  # Make sure this matches your env
+    OPENAI_BASE_URL: Optional[str] = None  # Proxy or compatible API; default is api.openai.com
     WHATSAPP_API_TOKEN: str
     
     # AI Settings
-    MODEL_NAME: str = "gpt-3.5-turbo"
+    MODEL_NAME: str = "gpt-3.5-turbo"  # "standard" tier
+    MODEL_FAST: Optional[str] = None  # greetings and FAQs; defaults to MODEL_NAME
+    MODEL_ADVANCED: Optional[str] = None  # comparisons and long queries; defaults to MODEL_NAME
     MAX_TOKENS: int = 500
     TEMPERATURE: float = 0.7
+    LLM_MAX_CONCURRENCY: int = 16  # concurrent OpenAI calls across all clients
+    
+    # Completion timeouts and degradation during provider incidents
+    LLM_TIMEOUT_SECONDS: float = 10  # per attempt
+    LLM_DEADLINE_SECONDS: float = 20  # per reply, across fallbacks
+    LLM_SLOW_CALL_SECONDS: float = 8  # slower calls count as circuit breaker failures
+    LLM_HEDGE: bool = True  # re-send attempts slower than the model's p95
+    LLM_BREAKER_FAILURE_RATIO: float = 0.5
+    LLM_BREAKER_OPEN_SECONDS: float = 30
+    LLM_FALLBACK_MODEL: Optional[str] = None  # e.g. a cheaper or secondary model
+    LLM_FALLBACK_RESPONSE: Optional[str] = (
+        "Sorry, I can't answer right now. Please try again in a few minutes."
+    )
     
     # Vector DB Settings
     PINECONE_INDEX_NAME: str = "whatsapp-bot"
+    PINECONE_INDEX_HOST: Optional[str] = None  # Skips the control-plane lookup of the index host
+    
+    # Lexical (BM25) index built at ingestion, fused with vector results
+    LEXICAL_INDEX_DIR: str = "data/lexical"
+    LEXICAL_ONLY_MARGIN: float = 1.5  # best/second-best BM25 score to skip the vector search (0 disables)
+    FAQ_INDEX_DIR: str = "data/faq"
+    FAQ_MATCH_THRESHOLD: float = 0.92  # cosine similarity to answer from the FAQ (clients can override)
     
     # Server Settings
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # or "text"
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01  # fraction of DEBUG records kept
+    LOG_REDACT: bool = True  # hide message bodies and phone numbers
+    
+    # Tracing
+    TRACE_EXPORTER: str = "none"  # "jsonl", "otlp" or "none"
+    TRACE_JSONL_PATH: str = "data/traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318"
+    TRACE_TAIL_SAMPLING: bool = False  # keep only slow or failed traces
+    TRACE_SLOW_MS: float = 2000
+    TRACE_SAMPLE_RATE: float = 0.0  # fraction of other traces kept when tail sampling
+    
+    # Admin settings (admin endpoints are disabled when no token is set)
+    ADMIN_API_TOKEN: Optional[str] = None
+    
     # Database URL
     DATABASE_URL: str
     
+    # Async engine pool (DB_POOL_SIZE + DB_MAX_OVERFLOW connections per worker).
+    # Recycle below the server's idle timeout; Neon suspends after 5 minutes.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 240
+    DB_POOL_PRE_PING: bool = True
+    
+    # Interactions older than the retention window are moved to compressed
+    # files by `python -m src.database.archive run`
+    ARCHIVE_DIR: str = "data/archive"
+    ARCHIVE_RETENTION_DAYS: int = 90
+    ARCHIVE_COMPRESSION: str = "zstd"  # or "gzip"
+    
+    # Shared client/user state for multiple workers or hosts, e.g.
+    # "sqlite:///data/state.sqlite3" or "postgresql://..." (unset keeps JSON files)
+    STATE_BACKEND_URL: Optional[str] = None
+    CLIENT_CONFIG_REFRESH_SECONDS: float = 2.0
+    
     # WhatsApp settings
     WHATSAPP_PHONE_NUMBER_ID: str
     
@@ -40,13 +105,88 @@ class Settings(BaseSettings):
     TWILIO_WHATSAPP_NUMBER: str
     
     # Provider selection
-    WHATSAPP_PROVIDER: str = "twilio"  # or "meta"
+    # Only "twilio" is implemented; other values (e.g. "meta") fall back to it
+    WHATSAPP_PROVIDER: str = "twilio"
+    
+    # Webhook deduplication (provider retries of the same MessageSid)
+    DEDUP_TTL_SECONDS: float = 3600
+    DEDUP_MAX_ENTRIES: int = 100_000
+    DEDUP_BACKEND_PATH: Optional[str] = None  # e.g. "data/dedup.sqlite3" to share across workers
+    
+    # Merge bursts of messages from one user into a single reply (0 disables)
+    DEBOUNCE_WINDOW_MS: int = 1000
+    DEBOUNCE_MAX_WAIT_MS: int = 4000
     
     class Config:
         env_file = ".env"
+        frozen = True
+
+# Settings read on every use, so a reload applies to them at once. The rest
+# are captured when their client, pool or worker is created and need a restart.
+RELOADABLE_SETTINGS = frozenset({
+    "ADMIN_API_TOKEN",
+    "MODEL_NAME",
+    "MODEL_FAST",
+    "MODEL_ADVANCED",
+    "MAX_TOKENS",
+    "TEMPERATURE",
+    "FAQ_MATCH_THRESHOLD",
+    "LEXICAL_ONLY_MARGIN",
+})
+
+# Current settings snapshot, swapped as a whole by reload_settings()
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
 
-@lru_cache()
-def get_settings():
-    # Clear the LRU cache to ensure fresh settings
-    get_settings.cache_clear()
-    return Settings() 
\ No newline at end of file
+def get_settings() -> Settings:
+    """Get the current settings snapshot, loading it on first use"""
+    global _settings
+    settings = _settings
+    if settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings()
+            settings = _settings
+    return settings
+
+def reload_settings() -> Settings:
+    """
+    Re-read the environment and .env file and swap in a new settings snapshot.
+    
+    The new snapshot is fully validated before it replaces the current one, so a
+    broken configuration raises and leaves the running settings and the process
+    environment untouched. As at startup, .env values override the environment.
+    """
+    global _settings
+    dotenv = {key: value for key, value in dotenv_values(find_dotenv()).items() if value is not None}
+    settings = Settings(**{
+        key: value for key, value in dotenv.items() if key in Settings.model_fields
+    })
+    with _settings_lock:
+        os.environ.update(dotenv)
+        _settings = settings
+    logger.info("Settings reloaded")
+    return settings
+
+def changed_settings(before: Settings, after: Settings) -> list:
+    """Names of the settings that differ between two snapshots"""
+    return sorted(
+        name for name in Settings.model_fields if getattr(before, name) != getattr(after, name)
+    )
+
+def install_reload_signal_handler(signum: int = getattr(signal, "SIGHUP", 0)) -> bool:
+    """Reload settings when the process receives `signum` (SIGHUP by default)"""
+    if not signum or threading.current_thread() is not threading.main_thread():
+        return False
+    
+    def _handle_reload(received_signum, frame):
+        try:
+            before = get_settings()
+            restart_required = sorted(set(changed_settings(before, reload_settings())) - RELOADABLE_SETTINGS)
+            if restart_required:
+                logger.warning(f"Changed settings that need a restart: {', '.join(restart_required)}")
+        except Exception as e:
+            logger.error(f"Settings reload failed, keeping current settings: {e}")
+    
+    signal.signal(signum, _handle_reload)
+    return True
@@ -0,0 +1,268 @@
+"""
+Archival of old interactions to compressed JSONL files.
+
+Interactions older than the retention window are streamed out of the hot
+`interactions` table in batches (oldest first), written to one file per
+batch and day, and deleted. Batches are numbered, and a checkpoint records
+the last batch written along with its row IDs:
+
+- a run that stopped before deleting a checkpointed batch deletes exactly
+  those rows when it resumes;
+- a batch that was written but not checkpointed has its files removed and
+  is written again under the same number, whatever the new cutoff or
+  batch size, so no record is archived twice.
+
+    <ARCHIVE_DIR>/interactions/day=2024-01-31/part-00000042.jsonl.zst
+    <ARCHIVE_DIR>/interactions/_checkpoint.json
+
+    python -m src.database.archive run --retention-days 90
+    python -m src.database.archive read --start 2024-01-01 --end 2024-02-01 > january.jsonl
+"""
+from typing import IO, Any, Dict, Iterator, List, Optional
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import time
+
+from sqlalchemy import and_, delete, or_, select
+
+from ..config import get_settings
+from .models import Interaction
+
+logger = logging.getLogger(__name__)
+
+# File suffix per ARCHIVE_COMPRESSION value
+SUFFIXES = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz"}
+
+def _open_write(path: Path, compression: str) -> IO[str]:
+    if compression == "zstd":
+        import zstandard
+        
+        return io.TextIOWrapper(zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb")), encoding="utf-8")
+    return gzip.open(path, "wt", encoding="utf-8")
+
+def _open_read(path: Path) -> IO[str]:
+    if path.name.endswith(SUFFIXES["zstd"]):
+        import zstandard
+        
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+def _write_json_atomically(path: Path, data: Any) -> None:
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+@dataclass
+class ArchiveReport:
+    cutoff: datetime
+    dry_run: bool
+    archived: int = 0
+    batches: int = 0
+    files: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    
+    def as_dict(self) -> Dict:
+        return {
+            "cutoff": self.cutoff.isoformat(),
+            "dry_run": self.dry_run,
+            "archived": self.archived,
+            "batches": self.batches,
+            "files": len(self.files),
+            "seconds": round(self.seconds, 3),
+        }
+
+class InteractionArchiver:
+    """Moves interactions older than the retention window into the archive"""
+    
+    table = Interaction.__table__
+    
+    def __init__(
+        self,
+        engine,
+        directory: str,
+        retention_days: int = 90,
+        batch_size: int = 5000,
+        compression: str = "zstd",
+        now=datetime.utcnow
+    ):
+        if compression not in SUFFIXES:
+            raise ValueError(f"Unsupported archive compression: {compression}. Supported: {', '.join(SUFFIXES)}")
+        self.engine = engine
+        self.directory = Path(directory) / "interactions"
+        self.retention = timedelta(days=retention_days)
+        self.batch_size = batch_size
+        self.compression = compression
+        self.now = now
+        self.checkpoint_path = self.directory / "_checkpoint.json"
+    
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Number and row IDs of the last archived batch, or None before the first run"""
+        if not self.checkpoint_path.exists():
+            return None
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+    
+    def _after(self, row):
+        """Rows after `row` in (created_at, id) order"""
+        created_at, row_id = self.table.c.created_at, self.table.c.id
+        return or_(created_at > row.created_at, and_(created_at == row.created_at, row_id > row.id))
+    
+    def _part_name(self, batch: int) -> str:
+        return f"part-{batch:08d}{SUFFIXES[self.compression]}"
+    
+    def _remove_unfinished(self, batch: int) -> None:
+        """Delete files of a batch that was written but never checkpointed"""
+        for path in self.directory.glob(f"day=*/part-{batch:08d}.*"):
+            path.unlink()
+    
+    def _write_batch(self, batch: int, rows) -> List[str]:
+        """Write a batch as one file per day"""
+        days = defaultdict(list)
+        for row in rows:
+            days[row.created_at.date()].append(row)
+        
+        paths = []
+        for day, day_rows in days.items():
+            partition = self.directory / f"day={day.isoformat()}"
+            partition.mkdir(parents=True, exist_ok=True)
+            path = partition / self._part_name(batch)
+            temporary = path.with_name(path.name + ".tmp")
+            with _open_write(temporary, self.compression) as f:
+                for row in day_rows:
+                    f.write(json.dumps({
+                        "id": row.id,
+                        "customer_id": row.customer_id,
+                        "message": row.message,
+                        "response": row.response,
+                        "created_at": row.created_at.isoformat(),
+                    }) + "\n")
+            with open(temporary, "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(temporary, path)
+            paths.append(str(path))
+        return paths
+    
+    def run(self, dry_run: bool = False, max_batches: Optional[int] = None) -> ArchiveReport:
+        """
+        Archive and delete everything older than the retention window.
+        
+        Memory is bounded by the batch size. With `dry_run` nothing is written
+        or deleted; the report counts what would be archived.
+        """
+        started = time.perf_counter()
+        cutoff = self.now() - self.retention
+        report = ArchiveReport(cutoff=cutoff, dry_run=dry_run)
+        checkpoint = self.load_checkpoint()
+        batch = checkpoint["batch"] + 1 if checkpoint else 1
+        
+        if not dry_run:
+            if checkpoint is not None:
+                # Rows archived by a run that stopped before deleting them
+                with self.engine.begin() as conn:
+                    conn.execute(delete(self.table).where(self.table.c.id.in_(checkpoint["ids"])))
+            self._remove_unfinished(batch)
+        
+        last = None
+        while max_batches is None or report.batches < max_batches:
+            query = select(self.table).where(self.table.c.created_at < cutoff)
+            if dry_run and last is not None:
+                # Nothing is deleted, so skip what was already counted
+                query = query.where(self._after(last))
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    query.order_by(self.table.c.created_at, self.table.c.id).limit(self.batch_size)
+                ).all()
+            if not rows:
+                break
+            
+            report.archived += len(rows)
+            report.batches += 1
+            last = rows[-1]
+            if dry_run:
+                continue
+            
+            # Written, then checkpointed, then deleted: a crash at any point
+            # leaves the rows either in the table or in the archive
+            ids = [row.id for row in rows]
+            report.files.extend(self._write_batch(batch, rows))
+            _write_json_atomically(self.checkpoint_path, {"batch": batch, "ids": ids})
+            with self.engine.begin() as conn:
+                conn.execute(delete(self.table).where(self.table.c.id.in_(ids)))
+            logger.info("Archived interactions", extra={"batch": batch, "rows": len(rows)})
+            batch += 1
+        
+        report.seconds = time.perf_counter() - started
+        return report
+
+def read_archive(
+    directory: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    customer_id: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream archived interactions, in day order, from `start` up to but not
+    including `end`. Only the matching day partitions are opened.
+    """
+    root = Path(directory) / "interactions"
+    if not root.exists():
+        return
+    for partition in sorted(root.glob("day=*")):
+        day = date.fromisoformat(partition.name[len("day="):])
+        if (start and day < start) or (end and day >= end):
+            continue
+        for path in sorted(partition.iterdir()):
+            if not path.name.endswith(tuple(SUFFIXES.values())):
+                continue
+            with _open_read(path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    if customer_id is not None and record["customer_id"] != customer_id:
+                        continue
+                    record["created_at"] = datetime.fromisoformat(record["created_at"])
+                    yield record
+
+def main(argv=None) -> int:
+    from .connection import get_engine
+    
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Archive old interactions or read the archive")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="archive and delete interactions past the retention window")
+    run_parser.add_argument("--retention-days", type=int, default=settings.ARCHIVE_RETENTION_DAYS)
+    run_parser.add_argument("--batch-size", type=int, default=5000)
+    run_parser.add_argument("--dry-run", action="store_true", help="count without writing or deleting")
+    read_parser = commands.add_parser("read", help="print archived interactions as JSON lines")
+    read_parser.add_argument("--start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    read_parser.add_argument("--end", type=date.fromisoformat, help="day after the last one")
+    read_parser.add_argument("--customer-id", type=int)
+    args = parser.parse_args(argv)
+    
+    if args.command == "run":
+        archiver = InteractionArchiver(
+            get_engine(),
+            settings.ARCHIVE_DIR,
+            retention_days=args.retention_days,
+            batch_size=args.batch_size,
+            compression=settings.ARCHIVE_COMPRESSION
+        )
+        print(json.dumps(archiver.run(dry_run=args.dry_run).as_dict()))
+    else:
+        for record in read_archive(settings.ARCHIVE_DIR, args.start, args.end, args.customer_id):
+            print(json.dumps({**record, "created_at": record["created_at"].isoformat()}))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
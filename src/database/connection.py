@@ -1,23 +1,141 @@
-from sqlalchemy import create_engine
+from typing import AsyncIterator, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+import time
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from ..config import get_settings
+from ..observability.metrics import DB_LATENCY, ERRORS
 
-settings = get_settings()
+# SQLAlchemy engine and SessionLocal class, created on first use so that
+# importing the models doesn't require a database configuration
+engine = None
+SessionLocal = None
 
-# Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL)
+# Async engine for the API, created in the app lifespan (see init_async_engine)
+async_engine = None
+AsyncSessionLocal = None
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async drivers for the URL schemes used in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
 # Create Base class
 Base = declarative_base()
 
+def _instrument(engine) -> None:
+    """Record the latency of every statement in DB_LATENCY"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        DB_LATENCY.observe(time.perf_counter() - started, operation=operation)
+    
+    @event.listens_for(engine, "handle_error")
+    def _count_error(context):
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+        ERRORS.inc(tenant="", stage="db")
+
+def get_engine():
+    """Get or create the SQLAlchemy engine"""
+    global engine, SessionLocal
+    if engine is None:
+        settings = get_settings()
+        engine = create_engine(
+            settings.DATABASE_URL,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING
+        )
+        _instrument(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return engine
+
 # Dependency to get DB session
 def get_db():
+    get_engine()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def async_database_url(url: str) -> str:
+    """
+    The async-driver form of a database URL.
+    
+    asyncpg takes `ssl` instead of libpq's `sslmode` and rejects
+    `channel_binding`, both of which appear in Neon connection strings.
+    """
+    parsed = make_url(url)
+    parsed = parsed.set(drivername=ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername))
+    if parsed.drivername == "postgresql+asyncpg":
+        query = dict(parsed.query)
+        query.pop("channel_binding", None)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+def create_async_db_engine(url: Optional[str] = None, pooled: bool = True):
+    """
+    Create an instrumented async engine with the DB_POOL_* settings.
+    
+    Connections are pre-pinged on checkout and recycled before serverless
+    Postgres drops them as idle. `pooled=False` opens a connection per
+    session instead, e.g. for comparison or behind an external pooler.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    
+    settings = get_settings()
+    url = async_database_url(url or settings.DATABASE_URL)
+    if not pooled:
+        options = {"poolclass": NullPool}
+    elif make_url(url).get_backend_name() == "sqlite" and make_url(url).database in (None, "", ":memory:"):
+        # In-memory SQLite is a single shared connection; there is no pool to size
+        options = {}
+    else:
+        options = {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+    async_engine = create_async_engine(url, **options)
+    _instrument(async_engine.sync_engine)
+    return async_engine
+
+def init_async_engine():
+    """Create the async engine and session factory; called from the app lifespan"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    
+    global async_engine, AsyncSessionLocal
+    if async_engine is None:
+        async_engine = create_async_db_engine()
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return async_engine
+
+async def dispose_async_engine() -> None:
+    """Close pooled connections on shutdown"""
+    global async_engine, AsyncSessionLocal
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+        AsyncSessionLocal = None
+
+# Dependency to get an async DB session in async routes
+async def get_async_db() -> AsyncIterator:
+    init_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
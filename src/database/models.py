@@ -1,5 +1,8 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
 from sqlalchemy.orm import relationship
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from enum import Enum
 from .connection import Base
 import datetime
 
@@ -38,4 +41,38 @@ class Interaction(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     
     # Relationships
-    customer = relationship("Customer", back_populates="interactions") 
\ No newline at end of file
+    customer = relationship("Customer", back_populates="interactions") 
+
+class QualificationStatus(str, Enum):
+    NEW = "new"
+    INVESTIGATING = "investigating"
+    QUALIFIED = "qualified"
+    HIGHLY_QUALIFIED = "highly_qualified"
+    CUSTOMER = "customer"
+
+class LeadScore(BaseModel):
+    """Lead score with the reasons behind the last update"""
+    score: int = 0
+    reasons: List[str] = []
+    confidence: float = 0.0
+
+class UserProfile(BaseModel):
+    """End user of a client, stored by the UserManager"""
+    user_id: str
+    client_id: str
+    name: Optional[str] = None
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    last_interaction: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    interaction_count: int = 0
+    conversation_history: List[Dict[str, Any]] = []
+    product_interests: List[str] = []
+    lead_score: LeadScore = LeadScore()
+    qualification_status: QualificationStatus = QualificationStatus.NEW
+    # Messages per combination of buying signals matched together ("buy|price"),
+    # over every interaction since they were first counted, so re-scoring
+    # isn't limited to the stored history
+    signal_counts: Dict[str, int] = {}
+    # Signal points of the interactions from before that (None until counting starts)
+    untracked_signal_points: Optional[float] = None
+    # Bumped on every write to the shared state backend (0 = never stored)
+    version: int = 0
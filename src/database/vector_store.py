@@ -1,27 +1,36 @@
-from typing import List, Dict, Any
-from pinecone import Pinecone
-from openai import OpenAI
+from typing import List, Dict, Any, Optional, Sequence, Union
+import asyncio
 from ..config import get_settings
-
-settings = get_settings()
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+from ..ai.embeddings import embed_texts, get_embeddings
+from ..observability.tracing import span
+from ..observability.metrics import (
+    VECTOR_QUERY_LATENCY,
+    VECTOR_UPSERT_LATENCY,
+    ERRORS,
+)
 
 class VectorStore:
     def __init__(self):
         """Initialize Pinecone client"""
+        from pinecone import Pinecone
+        
+        settings = get_settings()
         self.pc = Pinecone(
             api_key=settings.PINECONE_API_KEY,
             environment=settings.PINECONE_ENVIRONMENT
         )
-        self.index = self.pc.Index(settings.PINECONE_INDEX_NAME)
+        if settings.PINECONE_INDEX_HOST:
+            self.index = self.pc.Index(host=settings.PINECONE_INDEX_HOST)
+        else:
+            self.index = self.pc.Index(settings.PINECONE_INDEX_NAME)
     
     def get_embedding(self, text: str) -> List[float]:
         """Get OpenAI embedding for text"""
-        response = client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        return response.data[0].embedding
+        return get_embeddings([text])[0]
+    
+    async def _embed(self, text: str, namespace: str) -> List[float]:
+        """Get an embedding through the per-client scheduler"""
+        return (await embed_texts([text], namespace))[0]
     
     async def store_embeddings(
         self,
@@ -30,49 +39,113 @@ class VectorStore:
         namespace: str
     ):
         """Store text embeddings in Pinecone"""
-        vectors = []
-        
-        for i, text in enumerate(texts):
-            embedding = self.get_embedding(text)
-            vectors.append({
+        embeddings = await embed_texts(texts, namespace)
+        vectors = [
+            {
                 'id': f"{namespace}-{i}",
                 'values': embedding,
                 'metadata': {
                     'text': text,
                     **metadata[i]
                 }
-            })
+            }
+            for i, (text, embedding) in enumerate(zip(texts, embeddings))
+        ]
         
         # Batch upsert to Pinecone
-        self.index.upsert(
-            vectors=vectors,
-            namespace=namespace
-        )
+        try:
+            with span("vector.upsert", namespace=namespace, vectors=len(vectors)), \
+                    VECTOR_UPSERT_LATENCY.time(tenant=namespace):
+                # Blocking client; ingestion mustn't hold up concurrent searches
+                await asyncio.to_thread(
+                    self.index.upsert,
+                    vectors=vectors,
+                    namespace=namespace
+                )
+        except Exception:
+            ERRORS.inc(tenant=namespace, stage="vector_upsert")
+            raise
     
     async def search(
         self,
         query: str,
         namespace: str,
-        top_k: int = 5
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        min_score: Optional[float] = None
     ) -> List[Dict]:
         """Search for similar texts in the vector store"""
-        query_embedding = self.get_embedding(query)
+        return await self.search_many([query], namespace, top_k, filter, min_score)
+    
+    async def search_many(
+        self,
+        queries: List[str],
+        namespaces: Union[str, Sequence[str]],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        min_score: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Search several queries across one or more namespaces at once.
         
-        results = self.index.query(
-            vector=query_embedding,
-            namespace=namespace,
-            top_k=top_k,
-            include_metadata=True
-        )
+        The queries are embedded in one request and every (query, namespace)
+        pair is queried concurrently, keeping the `top_k` matches of each.
+        `filter` is a Pinecone metadata filter, e.g. {"source": "listings.csv"}
+        or {"file_type": {"$in": [".csv", ".json"]}}. Matches below `min_score`
+        are dropped. A chunk matched by several queries appears once, with its
+        best score and the indices of the queries that found it. Results are
+        sorted by score and cut to `limit` when given.
+        """
+        if isinstance(namespaces, str):
+            namespaces = [namespaces]
+        if not queries or not namespaces:
+            return []
         
-        return [
-            {
-                'text': match['metadata']['text'],
-                'score': match['score'],
-                'metadata': match['metadata']
-            }
-            for match in results['matches']
-        ]
+        # Embeddings are billed and scheduled to the first namespace's client
+        embeddings = await embed_texts(list(queries), namespaces[0])
+        
+        async def query(embedding: List[float], namespace: str):
+            try:
+                with span("vector.query", namespace=namespace, top_k=top_k), \
+                        VECTOR_QUERY_LATENCY.time(tenant=namespace):
+                    return await asyncio.to_thread(
+                        self.index.query,
+                        vector=embedding,
+                        namespace=namespace,
+                        top_k=top_k,
+                        filter=filter,
+                        include_metadata=True
+                    )
+            except Exception:
+                ERRORS.inc(tenant=namespace, stage="vector_query")
+                raise
+        
+        pairs = [(index, namespace) for index in range(len(queries)) for namespace in namespaces]
+        responses = await asyncio.gather(*(query(embeddings[index], namespace) for index, namespace in pairs))
+        
+        merged: Dict[tuple, Dict] = {}
+        for (index, namespace), response in zip(pairs, responses):
+            for match in response['matches']:
+                if min_score is not None and match['score'] < min_score:
+                    continue
+                key = (namespace, match['id'])
+                result = merged.get(key)
+                if result is None:
+                    merged[key] = {
+                        'id': match['id'],
+                        'text': match['metadata']['text'],
+                        'score': match['score'],
+                        'metadata': match['metadata'],
+                        'namespace': namespace,
+                        'queries': [index]
+                    }
+                else:
+                    result['score'] = max(result['score'], match['score'])
+                    result['queries'].append(index)
+        
+        results = sorted(merged.values(), key=lambda result: result['score'], reverse=True)
+        return results[:limit] if limit is not None else results
 
 # Singleton instance
 vector_store: VectorStore = None
@@ -1,3 +1,5 @@
 from .processor import get_processor
+from .lexical_index import get_lexical_store, LexicalIndex
+from .faq_index import get_faq_store, FaqIndex
 
-__all__ = ['get_processor']
+__all__ = ['get_processor', 'get_lexical_store', 'LexicalIndex', 'get_faq_store', 'FaqIndex']
\ No newline at end of file
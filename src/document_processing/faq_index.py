@@ -0,0 +1,140 @@
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+import json
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+
+from ..config import get_settings
+from ..observability.metrics import CACHE_HITS
+from ..observability.tracing import span
+
+logger = logging.getLogger(__name__)
+
+def normalize_question(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+class FaqIndex:
+    """A client's curated Q&A pairs with unit-length question embeddings"""
+    
+    def __init__(self, pairs: List[Dict[str, str]], embeddings: np.ndarray):
+        self.pairs = pairs
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True) if len(embeddings) else 1.0
+        self.embeddings = (embeddings / np.maximum(norms, 1e-12)).astype(np.float32)
+        self._exact = {normalize_question(pair["question"]): i for i, pair in enumerate(pairs)}
+    
+    def __len__(self) -> int:
+        return len(self.pairs)
+    
+    def exact(self, text: str) -> Optional[int]:
+        """Index of a question that matches `text` word for word"""
+        return self._exact.get(normalize_question(text))
+    
+    def nearest(self, embedding: List[float]) -> Tuple[int, float]:
+        """Index and cosine similarity of the closest question"""
+        query = np.asarray(embedding, dtype=np.float32)
+        scores = self.embeddings @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+class FaqStore:
+    """
+    Per-client FAQ indexes, answering matching messages without the LLM.
+    
+    Each client's pairs and question embeddings are kept together in
+    `<directory>/<client_id>.npz`, so questions are embedded once, at
+    ingestion. Indexes are reloaded when the file changes; a file that
+    can't be read leaves the previously loaded index in use.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._indexes: Dict[str, Tuple[Tuple[int, int], Optional[FaqIndex]]] = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, client_id: str) -> Path:
+        return self.directory / f"{client_id}.npz"
+    
+    def get(self, client_id: str) -> Optional[FaqIndex]:
+        path = self._path(client_id)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._indexes.get(client_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                pairs = json.loads(str(data["pairs"]))
+                embeddings = data["embeddings"]
+            if len(embeddings) != len(pairs):
+                raise ValueError(f"{len(pairs)} pairs but {len(embeddings)} embeddings")
+            index = FaqIndex(pairs, embeddings)
+        except Exception as e:
+            logger.warning(f"Could not load the FAQ of {client_id}, keeping the loaded one: {e!r}")
+            return cached[1] if cached else None
+        self._indexes[client_id] = (version, index)
+        return index
+    
+    def save(self, client_id: str, pairs: List[Dict[str, str]], embeddings: List[List[float]]) -> FaqIndex:
+        """Replace a client's FAQ; readers see either the old file or the new one"""
+        path = self._path(client_id)
+        temporary = path.with_name(path.name + ".tmp")
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(temporary, "wb") as f:
+                np.savez(
+                    f,
+                    pairs=np.array(json.dumps(pairs)),
+                    embeddings=np.asarray(embeddings, dtype=np.float32).reshape(len(pairs), -1 if pairs else 0)
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, path)
+        return self.get(client_id)
+    
+    async def answer(self, text: str, client_id: str, threshold: float) -> Optional[str]:
+        """The curated answer for `text`, or None when no question is close enough"""
+        index = self.get(client_id)
+        if not index:
+            return None
+        
+        # Imported here: embeddings pull in the OpenAI client
+        from ..ai.embeddings import embed_texts
+        
+        with span("faq_match", client_id=client_id) as faq_span:
+            best = index.exact(text)
+            score = 1.0
+            if best is None:
+                try:
+                    best, score = index.nearest((await embed_texts([text], client_id))[0])
+                except Exception as e:
+                    logger.warning(f"FAQ matching failed, falling back to the LLM: {e!r}")
+                    return None
+            faq_span.set_attribute("score", round(score, 4))
+            if score < threshold:
+                return None
+            faq_span.set_attribute("matched", True)
+        
+        CACHE_HITS.inc(tenant=client_id, cache="faq")
+        logger.info(
+            "Answered from FAQ",
+            extra={"client_id": client_id, "question": index.pairs[best]["question"], "score": round(score, 4)}
+        )
+        return index.pairs[best]["answer"]
+
+# Singleton instance
+faq_store: FaqStore = None
+
+def get_faq_store() -> FaqStore:
+    """Get or create the FAQ store"""
+    global faq_store
+    if faq_store is None:
+        faq_store = FaqStore(get_settings().FAQ_INDEX_DIR)
+    return faq_store
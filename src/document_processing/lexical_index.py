@@ -0,0 +1,215 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from array import array
+from collections import Counter
+from pathlib import Path
+import json
+import math
+import re
+import threading
+
+import numpy as np
+
+from ..config import get_settings
+
+TOKEN_PATTERN = re.compile(r"\w+")
+STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "by", "do", "for", "from", "has", "have",
+    "i", "in", "is", "it", "me", "my", "of", "on", "or", "the", "to", "we", "what",
+    "with", "you", "your",
+}
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """The subset of Pinecone metadata filters used here: equality, $eq, $ne, $in"""
+    for key, condition in (filter or {}).items():
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            if "$eq" in condition and value != condition["$eq"]:
+                return False
+            if "$ne" in condition and value == condition["$ne"]:
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+class LexicalIndex:
+    """
+    BM25 inverted index over one client's chunks.
+    
+    Postings are compact arrays (chunk IDs and term frequencies) that new
+    chunks are appended to, so adding a document doesn't touch existing
+    entries. Removing a source rebuilds the postings.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._reset()
+    
+    def _reset(self) -> None:
+        self.texts: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.lengths = array("I")
+        self.postings: Dict[str, Tuple[array, array]] = {}  # term -> (chunk ids, term frequencies)
+        self.total_length = 0
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def add(self, texts: Iterable[str], metadata: Iterable[Dict[str, Any]]) -> None:
+        for text, meta in zip(texts, metadata):
+            chunk_id = len(self.texts)
+            terms = Counter(tokenize(text))
+            self.texts.append(text)
+            self.metadata.append(meta)
+            length = sum(terms.values())
+            self.lengths.append(length)
+            self.total_length += length
+            for term, frequency in terms.items():
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = (array("I"), array("I"))
+                posting[0].append(chunk_id)
+                posting[1].append(frequency)
+    
+    def remove_source(self, source: str) -> int:
+        """Drop every chunk from `source`; returns how many were removed"""
+        keep = [i for i, meta in enumerate(self.metadata) if meta.get("source") != source]
+        removed = len(self.texts) - len(keep)
+        if removed:
+            texts, metadata = [self.texts[i] for i in keep], [self.metadata[i] for i in keep]
+            self._reset()
+            self.add(texts, metadata)
+        return removed
+    
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Best chunks by BM25, with the share of query terms each contains"""
+        terms = set(tokenize(query))
+        count = len(self.texts)
+        if not terms or not count:
+            return []
+        
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32).astype(np.float64)
+        norm = self.k1 * (1 - self.b + self.b * lengths / (self.total_length / count))
+        scores = np.zeros(count)
+        matched = np.zeros(count, dtype=np.int32)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            ids = np.frombuffer(posting[0], dtype=np.uint32)
+            frequencies = np.frombuffer(posting[1], dtype=np.uint32).astype(np.float64)
+            idf = math.log(1 + (count - len(ids) + 0.5) / (len(ids) + 0.5))
+            scores[ids] += idf * frequencies * (self.k1 + 1) / (frequencies + norm[ids])
+            matched[ids] += 1
+        
+        candidates = np.flatnonzero(scores)
+        if filter:
+            candidates = np.array(
+                [i for i in candidates if matches_filter(self.metadata[i], filter)], dtype=np.int64
+            )
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            {
+                "text": self.texts[i],
+                "score": float(scores[i]),
+                "coverage": matched[i] / len(terms),
+                "metadata": self.metadata[i],
+            }
+            for i in ranked
+        ]
+
+class LexicalIndexStore:
+    """
+    Per-client lexical indexes, persisted as the chunks they were built from.
+    
+    Each client's chunks live in `<directory>/<client_id>.jsonl`. An index is
+    rebuilt from that file when it is first used, or when another worker has
+    changed the file since.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._indexes: Dict[str, Tuple[Tuple[int, int], LexicalIndex]] = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, client_id: str) -> Path:
+        return self.directory / f"{client_id}.jsonl"
+    
+    def _version(self, path: Path) -> Tuple[int, int]:
+        if not path.exists():
+            return (0, 0)
+        stat = path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def get(self, client_id: str) -> LexicalIndex:
+        path = self._path(client_id)
+        version = self._version(path)
+        cached = self._indexes.get(client_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        index = LexicalIndex()
+        if version != (0, 0):
+            with open(path) as f:
+                chunks = [json.loads(line) for line in f if line.strip()]
+            index.add((chunk["text"] for chunk in chunks), (chunk["metadata"] for chunk in chunks))
+        self._indexes[client_id] = (version, index)
+        return index
+    
+    def replace_source(
+        self,
+        client_id: str,
+        source: str,
+        texts: List[str],
+        metadata: List[Dict[str, Any]]
+    ) -> None:
+        """Index a document's chunks, replacing any earlier version of it"""
+        with self._lock:
+            index = self.get(client_id)
+            removed = index.remove_source(source)
+            index.add(texts, metadata)
+            path = self._path(client_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if removed:
+                # Rewrite without the old version; appends are enough otherwise
+                chunks = zip(index.texts, index.metadata)
+                mode = "w"
+            else:
+                chunks = zip(texts, metadata)
+                mode = "a"
+            with open(path, mode) as f:
+                for text, meta in chunks:
+                    f.write(json.dumps({"text": text, "metadata": meta}, default=str) + "\n")
+            self._indexes[client_id] = (self._version(path), index)
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
+    """Merge ranked result lists by summing 1 / (k + rank); chunks are matched by text"""
+    fused: Dict[str, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            entry = fused.get(result["text"])
+            if entry is None:
+                entry = fused[result["text"]] = {**result, "score": 0.0}
+            entry["score"] += 1 / (k + rank)
+    return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)
+
+# Singleton instance
+lexical_store: LexicalIndexStore = None
+
+def get_lexical_store() -> LexicalIndexStore:
+    """Get or create the lexical index store"""
+    global lexical_store
+    if lexical_store is None:
+        lexical_store = LexicalIndexStore(get_settings().LEXICAL_INDEX_DIR)
+    return lexical_store
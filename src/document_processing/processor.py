@@ -1,23 +1,31 @@
 from typing import List, Dict, Any, Optional
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.document_loaders import (
-    TextLoader,
-    PDFLoader,
-    CSVLoader,
-    JSONLoader
-)
+import asyncio
+import csv
 import json
+import logging
 from pathlib import Path
+from ..config import get_settings
 from ..database.vector_store import get_vector_store
+from ..observability.metrics import CACHE_HITS
+from ..observability.tracing import span
+from .faq_index import get_faq_store
+from .lexical_index import get_lexical_store, reciprocal_rank_fusion
+
+logger = logging.getLogger(__name__)
 
 class DocumentProcessor:
     def __init__(self):
+        # langchain is only imported once a processor is actually needed
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
             chunk_overlap=200,
             length_function=len,
         )
         self.vector_store = get_vector_store()
+        self.lexical = get_lexical_store()
+        self.faq = get_faq_store()
     
     def _extract_text_from_json(self, json_data: Dict) -> List[str]:
         """Recursively extract all string values from JSON"""
@@ -45,6 +53,13 @@ class DocumentProcessor:
             client_id: Client identifier
             json_fields: Optional list of specific JSON fields to process (e.g., ['description', 'title'])
         """
+        from langchain.docstore.document import Document
+        from langchain.document_loaders import (
+            TextLoader,
+            PyPDFLoader,
+            CSVLoader,
+        )
+        
         path = Path(file_path)
         extension = path.suffix.lower()
         
@@ -53,7 +68,7 @@ class DocumentProcessor:
                 loader = TextLoader(file_path)
                 documents = loader.load()
             elif extension == '.pdf':
-                loader = PDFLoader(file_path)
+                loader = PyPDFLoader(file_path)
                 documents = loader.load()
             elif extension == '.csv':
                 loader = CSVLoader(file_path)
@@ -104,12 +119,14 @@ class DocumentProcessor:
                 } for doc in texts
             ]
             
-            # Store in vector database
+            # Store in vector database, then index locally for keyword queries
+            # so the lexical side never has chunks the vector side lacks
             await self.vector_store.store_embeddings(
                 texts=text_chunks,
                 metadata=metadata,
                 namespace=client_id
             )
+            await asyncio.to_thread(self.lexical.replace_source, client_id, file_path, text_chunks, metadata)
             
         except Exception as e:
             raise Exception(f"Error processing document {file_path}: {str(e)}")
@@ -131,6 +148,81 @@ class DocumentProcessor:
             metadata=metadata,
             namespace=client_id
         )
+        await asyncio.to_thread(self.lexical.replace_source, client_id, source_name, texts, metadata)
+
+    async def process_faq(self, file_path: str, client_id: str) -> int:
+        """
+        Load a client's curated FAQ, replacing the previous one
+        
+        Args:
+            file_path: .json (a list of {"question", "answer"} objects, or a
+                question -> answer object) or .csv with question and answer columns
+            client_id: Client identifier
+        
+        Returns:
+            Number of question/answer pairs loaded
+        """
+        path = Path(file_path)
+        extension = path.suffix.lower()
+        
+        if extension == '.json':
+            with open(file_path, 'r') as f:
+                json_data = json.load(f)
+            if isinstance(json_data, dict):
+                pairs = [{"question": q, "answer": a} for q, a in json_data.items()]
+            else:
+                pairs = [{"question": item["question"], "answer": item["answer"]} for item in json_data]
+        elif extension == '.csv':
+            with open(file_path, 'r', newline='') as f:
+                pairs = [{"question": row["question"], "answer": row["answer"]} for row in csv.DictReader(f)]
+        else:
+            raise ValueError(f"Unsupported FAQ file type: {extension}. Supported types: .json, .csv")
+        
+        return await self.process_faq_pairs(pairs, client_id)
+    
+    async def process_faq_pairs(self, pairs: List[Dict[str, str]], client_id: str) -> int:
+        """Embed the questions once and replace the client's FAQ index"""
+        # Imported here: embeddings pull in the OpenAI client
+        from ..ai.embeddings import embed_texts
+        
+        pairs = [
+            {"question": pair["question"].strip(), "answer": pair["answer"].strip()}
+            for pair in pairs if pair["question"].strip() and pair["answer"].strip()
+        ]
+        embeddings = await embed_texts([pair["question"] for pair in pairs], client_id) if pairs else []
+        self.faq.save(client_id, pairs, embeddings)
+        logger.info("FAQ loaded", extra={"client_id": client_id, "pairs": len(pairs)})
+        return len(pairs)
+
+    async def search(
+        self,
+        query: str,
+        client_id: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        """
+        Hybrid search over a client's documents.
+        
+        BM25 runs locally first. When its best chunk contains every query
+        term and clearly outscores the runner-up (LEXICAL_ONLY_MARGIN), as for
+        project names or unit numbers, that answer is returned without an
+        embedding call or vector query. Otherwise lexical and vector results
+        are merged with reciprocal rank fusion.
+        """
+        margin = get_settings().LEXICAL_ONLY_MARGIN
+        with span("retrieve", client_id=client_id) as retrieve_span:
+            lexical = self.lexical.get(client_id).search(query, top_k=top_k, filter=filter)
+            if margin and lexical and lexical[0]["coverage"] == 1.0 and (
+                len(lexical) == 1 or lexical[0]["score"] >= margin * lexical[1]["score"]
+            ):
+                retrieve_span.set_attribute("strategy", "lexical")
+                CACHE_HITS.inc(tenant=client_id, cache="lexical_only")
+                return lexical
+            
+            retrieve_span.set_attribute("strategy", "hybrid")
+            vector = await self.vector_store.search(query, client_id, top_k=top_k, filter=filter)
+            return reciprocal_rank_fusion([lexical, vector])[:top_k]
 
 # Singleton instance
 processor: DocumentProcessor = None
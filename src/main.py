@@ -1,8 +1,48 @@
+from contextlib import asynccontextmanager
+import logging
 from fastapi import FastAPI
 from src.api.whatsapp import router as whatsapp_router
-from src.api import sms
+from src.api import sms, admin, health
+from src.config import get_settings, install_reload_signal_handler
+from src.observability import configure_logging, shutdown_logging, tracing
+from src.whatsapp import debounce
 
-app = FastAPI(title="WhatsApp AI Bot")
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        settings = get_settings()
+        configure_logging(
+            level=settings.LOG_LEVEL,
+            json_format=settings.LOG_FORMAT == "json",
+            debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+            redact=settings.LOG_REDACT
+        )
+    except Exception as e:
+        # Keep serving so /ready can report the configuration error
+        configure_logging()
+        logger.error(f"Invalid settings, using default logging: {e}")
+    # `kill -HUP <pid>` re-reads the environment without a restart
+    install_reload_signal_handler()
+    # Imported here to keep SQLAlchemy off the import path
+    from src.database import connection
+    try:
+        # Connections are opened on first use, not here
+        connection.init_async_engine()
+    except Exception as e:
+        logger.error(f"Database engine unavailable: {e}")
+    yield
+    # Torn down in dependency order: replies still waiting in a debounce
+    # window may use the engine, and their spans and logs are flushed last
+    if debounce.coalescer is not None:
+        await debounce.coalescer.drain()
+    await connection.dispose_async_engine()
+    if tracing.tracer is not None:
+        tracing.tracer.shutdown()
+    shutdown_logging()
+
+app = FastAPI(title="WhatsApp AI Bot", lifespan=lifespan)
 
 # Add WhatsApp webhook routes
 app.include_router(whatsapp_router, prefix="/whatsapp", tags=["whatsapp"])
@@ -10,6 +50,12 @@ app.include_router(whatsapp_router, prefix="/whatsapp", tags=["whatsapp"])
 # Add SMS router
 app.include_router(sms.router, prefix="/sms", tags=["sms"])
 
+# Add admin routes
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
+
+# Add readiness probe and metrics
+app.include_router(health.router, tags=["health"])
+
 @app.get("/")
 async def root():
-    return {"status": "running"} 
\ No newline at end of file
+    return {"status": "running"}
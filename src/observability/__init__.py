@@ -0,0 +1,5 @@
+from .metrics import get_registry
+from .log import configure_logging, shutdown_logging
+from .tracing import get_tracer, span
+
+__all__ = ['get_registry', 'configure_logging', 'shutdown_logging', 'get_tracer', 'span']
@@ -0,0 +1,150 @@
+from typing import Any, Dict, Optional
+from logging.handlers import QueueHandler, QueueListener
+import json
+import logging
+import queue
+import random
+import re
+import sys
+
+from .tracing import current_span
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Fields whose values are message content and are never written out
+REDACTED_FIELDS = {"message_body", "reply", "body"}
+
+# Phone numbers, with or without a "whatsapp:" prefix; the last 4 digits are kept
+PHONE_PATTERN = re.compile(r"(?<![\w])\+?\d[\d\s\-()]{6,}(\d{4})(?!\d)")
+
+def redact_phone_numbers(text: str) -> str:
+    return PHONE_PATTERN.sub(r"***\1", text)
+
+def _redact_value(key: str, value: Any) -> Any:
+    if key in REDACTED_FIELDS and value is not None:
+        return f"<redacted:{len(str(value))} chars>"
+    if isinstance(value, str):
+        return redact_phone_numbers(value)
+    return value
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including fields passed through `extra`"""
+    
+    def __init__(self, redact: bool = True):
+        super().__init__()
+        self.redact = redact
+    
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        entry: Dict[str, Any] = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact_phone_numbers(message) if self.redact else message,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = _redact_value(key, value) if self.redact else value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Plain text lines, with phone numbers redacted like the JSON output"""
+    
+    def __init__(self, redact: bool = True):
+        super().__init__("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+        self.redact = redact
+    
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        return redact_phone_numbers(text) if self.redact else text
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep only a fraction of DEBUG records; other levels always pass"""
+    
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+class TraceContextFilter(logging.Filter):
+    """Tag records with the trace and span they were logged from"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = current_span()
+        if span is not None:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queue the record as-is and leave formatting to the listener thread.
+    
+    Only the message is merged with its args here (args may be mutable);
+    exception info is rendered to text since tracebacks can't cross threads.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+# Background listener, stopped by shutdown_logging()
+listener: Optional[QueueListener] = None
+
+def configure_logging(
+    level: str = "INFO",
+    json_format: bool = True,
+    debug_sample_rate: float = 1.0,
+    redact: bool = True,
+    stream=None
+) -> QueueListener:
+    """
+    Route all logging through a queue drained by a background thread.
+    
+    Request handlers only pay for putting the record on the queue; the
+    formatting and the (possibly blocking) write to `stream` happen on the
+    listener thread.
+    """
+    global listener
+    shutdown_logging()
+    
+    output = logging.StreamHandler(stream or sys.stdout)
+    if json_format:
+        output.setFormatter(JsonFormatter(redact=redact))
+    else:
+        output.setFormatter(TextFormatter(redact=redact))
+    
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(log_queue)
+    handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+    handler.addFilter(TraceContextFilter())
+    
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
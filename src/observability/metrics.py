@@ -0,0 +1,234 @@
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+import threading
+import time
+
+# Latency buckets in seconds, from cache hits to slow LLM completions
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class _ShardedMetric(ABC):
+    """
+    Base for metrics recorded into per-thread shards.
+    
+    Each thread writes only to its own shard, so recording needs no lock and
+    never contends with other threads; shards are summed when scraped.
+    """
+    
+    type_name = ""
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], List[float]]] = []
+        self._shards_lock = threading.Lock()
+    
+    def _shard(self) -> Dict[Tuple[str, ...], List[float]]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            # Only taken once per thread
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+    
+    def _merged(self) -> Dict[Tuple[str, ...], List[float]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged: Dict[Tuple[str, ...], List[float]] = {}
+        for shard in shards:
+            for key, values in list(shard.items()):
+                total = merged.get(key)
+                if total is None:
+                    merged[key] = list(values)
+                else:
+                    for i, value in enumerate(values):
+                        total[i] += value
+        return merged
+    
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        for key, values in sorted(self._merged().items()):
+            yield from self._render_series(key, values)
+    
+    @abstractmethod
+    def _render_series(self, key: Tuple[str, ...], values: List[float]) -> Iterable[str]:
+        """Exposition lines for one label set's merged values"""
+        pass
+
+class Counter(_ShardedMetric):
+    type_name = "counter"
+    
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        shard = self._shard()
+        key = self._key(labels)
+        values = shard.get(key)
+        if values is None:
+            shard[key] = [amount]
+        else:
+            values[0] += amount
+    
+    def value(self, **labels: str) -> float:
+        return self._merged().get(self._key(labels), [0])[0]
+    
+    def _render_series(self, key, values):
+        yield f"{self.name}{_format_labels(self.labelnames, key)} {values[0]:g}"
+
+class Histogram(_ShardedMetric):
+    type_name = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels: str) -> None:
+        shard = self._shard()
+        key = self._key(labels)
+        values = shard.get(key)
+        if values is None:
+            # Per-bucket counts (the last one is +Inf), then sum and count
+            values = shard[key] = [0] * (len(self.buckets) + 3)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+    
+    def time(self, **labels: str) -> "_Timer":
+        """Observe the duration of the `with` block in seconds"""
+        return _Timer(self, labels)
+    
+    def count(self, **labels: str) -> int:
+        return int(self._merged().get(self._key(labels), [0])[-1])
+    
+    def _render_series(self, key, values):
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), values):
+            cumulative += bucket_count
+            le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative:g}"
+        yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {values[-2]:g}"
+        yield f"{self.name}_count{_format_labels(self.labelnames, key)} {values[-1]:g}"
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+    
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+# Collectors return (name, type, help, [(labels, value), ...]) for values
+# read at scrape time, such as queue depths
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _ShardedMetric] = {}
+        self._collectors: List[Collector] = []
+    
+    def _register(self, metric: _ShardedMetric) -> _ShardedMetric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+    
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, type_name, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {value:g}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# Latency of every external call on the reply path
+LLM_LATENCY = registry.histogram(
+    "llm_completion_seconds", "OpenAI chat completion latency", ("tenant", "model")
+)
+EMBEDDING_LATENCY = registry.histogram(
+    "embedding_seconds", "OpenAI embedding latency", ("tenant",)
+)
+VECTOR_QUERY_LATENCY = registry.histogram(
+    "pinecone_query_seconds", "Pinecone query latency", ("tenant",)
+)
+VECTOR_UPSERT_LATENCY = registry.histogram(
+    "pinecone_upsert_seconds", "Pinecone upsert latency", ("tenant",)
+)
+MESSAGE_SEND_LATENCY = registry.histogram(
+    "message_send_seconds", "Outbound message send latency", ("tenant", "provider")
+)
+DB_LATENCY = registry.histogram(
+    "db_query_seconds", "Database statement latency", ("operation",)
+)
+QUEUE_WAIT = registry.histogram(
+    "llm_queue_wait_seconds", "Time LLM/embedding calls waited for a scheduler slot", ("tenant",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+# Counters
+CACHE_HITS = registry.counter(
+    "cache_hits_total", "Requests answered from a cache", ("tenant", "cache")
+)
+ERRORS = registry.counter(
+    "errors_total", "Failed external calls and pipeline stages", ("tenant", "stage")
+)
+RETRIES = registry.counter(
+    "retries_total", "Retried or duplicated external calls", ("tenant", "stage")
+)
+ROUTES = registry.counter(
+    "llm_routes_total", "Messages routed to each model tier", ("tenant", "tier")
+)
+
+def get_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry"""
+    return registry
@@ -0,0 +1,293 @@
+from typing import Any, Callable, Dict, List, Optional
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+        }
+
+# Innermost open span of the current task; asyncio tasks and
+# loop.call_later callbacks inherit it, so background work stays in the trace
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        """Write one finished batch of spans (called on the export thread)"""
+        pass
+
+class JsonlSpanExporter(SpanExporter):
+    """Append spans, one JSON object per line, to a local file"""
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+    
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """POST spans to an OTLP/HTTP collector using the JSON encoding"""
+    
+    def __init__(self, endpoint: str, service_name: str = "business-ai-chat-assistant", timeout: float = 5.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+    
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+    
+    def encode(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [
+                        {
+                            "traceId": span.trace_id,
+                            "spanId": span.span_id,
+                            "parentSpanId": span.parent_id or "",
+                            "name": span.name,
+                            "kind": 1,
+                            "startTimeUnixNano": str(span.start_ns),
+                            "endTimeUnixNano": str(span.end_ns),
+                            "attributes": [self._attribute(k, v) for k, v in span.attributes.items()],
+                            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                        }
+                        for span in spans
+                    ],
+                }],
+            }]
+        }
+    
+    def export(self, spans: List[Span]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(self.encode(spans)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+class TailSampler:
+    """
+    Decide which finished traces to keep once all their spans are known.
+    
+    Traces with a failed span or lasting at least `slow_ms` are always kept;
+    the rest are kept with probability `rate`.
+    """
+    
+    def __init__(self, slow_ms: float = 2000, rate: float = 0.0):
+        self.slow_ms = slow_ms
+        self.rate = rate
+    
+    def keep(self, spans: List[Span]) -> bool:
+        if any(span.error for span in spans):
+            return True
+        started = min(span.start_ns for span in spans)
+        ended = max(span.end_ns for span in spans)
+        if (ended - started) / 1e6 >= self.slow_ms:
+            return True
+        return random.random() < self.rate
+
+class Tracer:
+    """
+    Creates spans and hands finished traces to an exporter thread.
+    
+    Spans are buffered per trace until the last open one ends, and the
+    sampler sees the whole trace. Work that outlives the request (debounced
+    replies) keeps the trace open with `hold()`; untracked background work
+    is exported as a later batch with the same trace ID.
+    """
+    
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter] = None,
+        sampler: Optional[TailSampler] = None
+    ):
+        self.exporter = exporter
+        self.sampler = sampler
+        self._traces: Dict[str, List[Span]] = {}
+        self._open: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.SimpleQueue[Optional[List[Span]]]" = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
+        if exporter is not None:
+            self._worker = threading.Thread(target=self._export_loop, name="span-exporter", daemon=True)
+            self._worker.start()
+    
+    def span(self, name: str, **attributes: Any) -> "_SpanScope":
+        """Context manager timing `name` as a child of the current span"""
+        return _SpanScope(self, name, attributes)
+    
+    def _start(self, name: str, attributes: Dict[str, Any]) -> Span:
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        with self._lock:
+            self._open[span.trace_id] = self._open.get(span.trace_id, 0) + 1
+        return span
+    
+    def _finish(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        with self._lock:
+            self._traces.setdefault(span.trace_id, []).append(span)
+        self._close(span.trace_id)
+    
+    def _close(self, trace_id: str) -> None:
+        """Drop one open span or hold; the last one sends the trace for export"""
+        with self._lock:
+            self._open[trace_id] -= 1
+            if self._open[trace_id]:
+                return
+            del self._open[trace_id]
+            spans = self._traces.pop(trace_id, [])
+        if spans and self.exporter is not None and (self.sampler is None or self.sampler.keep(spans)):
+            self._queue.put(spans)
+    
+    def hold(self) -> Callable[[], None]:
+        """
+        Keep the current trace open until the returned function is called,
+        for work scheduled to run after the request's spans have ended.
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return lambda: None
+        trace_id = parent.trace_id
+        with self._lock:
+            self._open[trace_id] = self._open.get(trace_id, 0) + 1
+        released = threading.Event()
+        
+        def release() -> None:
+            if not released.is_set():
+                released.set()
+                self._close(trace_id)
+        return release
+    
+    def _export_loop(self) -> None:
+        while True:
+            spans = self._queue.get()
+            if spans is None:
+                return
+            try:
+                self.exporter.export(spans)
+            except Exception as e:
+                logger.warning(f"Span export failed: {e}")
+    
+    def shutdown(self) -> None:
+        """Export queued traces and stop the exporter thread"""
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join(timeout=10)
+            self._worker = None
+
+class _SpanScope:
+    __slots__ = ("tracer", "name", "attributes", "span", "token")
+    
+    def __init__(self, tracer: Tracer, name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+    
+    def __enter__(self) -> Span:
+        self.span = self.tracer._start(self.name, self.attributes)
+        self.token = _current_span.set(self.span)
+        return self.span
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_span.reset(self.token)
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        self.tracer._finish(self.span)
+        return False
+
+def _build_exporter(settings) -> Optional[SpanExporter]:
+    if settings.TRACE_EXPORTER == "jsonl":
+        return JsonlSpanExporter(settings.TRACE_JSONL_PATH)
+    if settings.TRACE_EXPORTER == "otlp":
+        return OtlpHttpSpanExporter(settings.TRACE_OTLP_ENDPOINT)
+    return None
+
+# Singleton instance
+tracer: Tracer = None
+
+def get_tracer() -> Tracer:
+    """Get or create the tracer configured by the TRACE_* settings"""
+    global tracer
+    if tracer is None:
+        settings = get_settings()
+        sampler = None
+        if settings.TRACE_TAIL_SAMPLING:
+            sampler = TailSampler(slow_ms=settings.TRACE_SLOW_MS, rate=settings.TRACE_SAMPLE_RATE)
+        tracer = Tracer(exporter=_build_exporter(settings), sampler=sampler)
+    return tracer
+
+def span(name: str, **attributes: Any) -> _SpanScope:
+    """Trace a pipeline stage: `with span("llm.completion", model=...):`"""
+    return get_tracer().span(name, **attributes)
+
+def hold_trace() -> Callable[[], None]:
+    """Keep the current trace open until the returned function is called"""
+    return get_tracer().hold()
@@ -0,0 +1,4 @@
+from .idempotency import get_deduplicator, MessageDeduplicator
+from .debounce import get_coalescer, MessageCoalescer
+
+__all__ = ['get_deduplicator', 'MessageDeduplicator', 'get_coalescer', 'MessageCoalescer']
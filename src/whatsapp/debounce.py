@@ -0,0 +1,189 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from dataclasses import dataclass, field
+import asyncio
+import contextvars
+import logging
+import time
+
+from ..config import get_settings
+from ..observability.metrics import get_registry
+from ..observability.tracing import hold_trace
+
+logger = logging.getLogger(__name__)
+
+GenerateFn = Callable[[str], Awaitable[str]]
+DeliverFn = Callable[[str], Awaitable[None]]
+
+@dataclass
+class _Conversation:
+    """Messages buffered for one conversation and the generation serving them"""
+    messages: List[str] = field(default_factory=list)
+    first_at: Optional[float] = None
+    timer: Optional[asyncio.TimerHandle] = None
+    generation: Optional[asyncio.Task] = None
+    in_flight: List[str] = field(default_factory=list)
+    in_flight_first_at: Optional[float] = None
+    # Releases for the traces of buffered and in-flight messages
+    holds: List[Callable[[], None]] = field(default_factory=list)
+    in_flight_holds: List[Callable[[], None]] = field(default_factory=list)
+    # Context of the latest message, so the reply is traced under its request
+    context: Optional[contextvars.Context] = None
+    generate: Optional[GenerateFn] = None
+    deliver: Optional[DeliverFn] = None
+
+class MessageCoalescer:
+    """
+    Per-conversation debounce in front of reply generation.
+    
+    Messages for the same conversation that arrive less than `window_ms`
+    apart are merged into one generation, flushed at the latest `max_wait_ms`
+    after the first of them. A message that arrives while the previous batch
+    is still generating cancels that generation and is merged with it, so
+    only the newest batch is answered. Delivery is never cancelled.
+    
+    Each message keeps its request's trace open until its batch has been
+    delivered, so the trace is sampled with the reply's spans in it.
+    """
+    
+    def __init__(self, window_ms: int = 1000, max_wait_ms: int = 4000):
+        self.window = window_ms / 1000
+        self.max_wait = max_wait_ms / 1000
+        self._conversations: Dict[str, _Conversation] = {}
+        self._deliveries: Set[asyncio.Task] = set()
+    
+    async def submit(
+        self,
+        key: str,
+        message: str,
+        generate: GenerateFn,
+        deliver: DeliverFn
+    ) -> None:
+        """Buffer `message`; the merged batch is answered in the background"""
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        conversation = self._conversations.setdefault(key, _Conversation())
+        
+        if conversation.generation is not None:
+            # Superseded: the pending answer would ignore this message
+            conversation.generation.cancel()
+            conversation.generation = None
+            conversation.messages = conversation.in_flight + conversation.messages
+            conversation.first_at = conversation.in_flight_first_at
+            conversation.holds = conversation.in_flight_holds + conversation.holds
+            conversation.in_flight = []
+            conversation.in_flight_holds = []
+            logger.debug("Cancelled superseded generation", extra={"conversation": key})
+        
+        conversation.messages.append(message)
+        conversation.holds.append(hold_trace())
+        conversation.generate = generate
+        conversation.deliver = deliver
+        conversation.context = contextvars.copy_context()
+        if conversation.first_at is None:
+            conversation.first_at = now
+        
+        if conversation.timer is not None:
+            conversation.timer.cancel()
+        delay = max(0.0, min(self.window, conversation.first_at + self.max_wait - now))
+        conversation.timer = loop.call_later(delay, self._flush, key)
+    
+    def _flush(self, key: str) -> None:
+        conversation = self._conversations[key]
+        conversation.timer = None
+        conversation.in_flight = conversation.messages
+        conversation.in_flight_first_at = conversation.first_at
+        conversation.in_flight_holds = conversation.holds
+        conversation.messages = []
+        conversation.first_at = None
+        conversation.holds = []
+        conversation.generation = conversation.context.run(
+            asyncio.get_running_loop().create_task,
+            self._generate(key, conversation, list(conversation.in_flight))
+        )
+    
+    async def _generate(
+        self,
+        key: str,
+        conversation: _Conversation,
+        messages: List[str]
+    ) -> None:
+        deliver = conversation.deliver
+        holds = conversation.in_flight_holds
+        try:
+            reply = await conversation.generate("\n".join(messages))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating reply: {e}", extra={"conversation": key})
+            reply = None
+        
+        # Past this point newer messages start a new batch instead of
+        # cancelling this one
+        conversation.generation = None
+        conversation.in_flight = []
+        conversation.in_flight_holds = []
+        if conversation.timer is None and not conversation.messages:
+            self._conversations.pop(key, None)
+        
+        if reply is None:
+            _release(holds)
+            return
+        task = asyncio.get_running_loop().create_task(self._deliver(key, reply, deliver, holds))
+        self._deliveries.add(task)
+        task.add_done_callback(self._deliveries.discard)
+    
+    async def _deliver(
+        self,
+        key: str,
+        reply: str,
+        deliver: DeliverFn,
+        holds: List[Callable[[], None]]
+    ) -> None:
+        try:
+            await deliver(reply)
+        except Exception as e:
+            logger.error(f"Error delivering reply: {e}", extra={"conversation": key})
+        finally:
+            _release(holds)
+    
+    @property
+    def pending(self) -> int:
+        """Number of conversations with buffered or generating messages"""
+        return len(self._conversations)
+    
+    async def drain(self) -> None:
+        """Flush every buffered batch now and wait for all replies to be sent"""
+        for key, conversation in list(self._conversations.items()):
+            if conversation.timer is not None:
+                conversation.timer.cancel()
+                self._flush(key)
+        generations = [
+            conversation.generation
+            for conversation in self._conversations.values()
+            if conversation.generation is not None
+        ]
+        await asyncio.gather(*generations, return_exceptions=True)
+        await asyncio.gather(*self._deliveries, return_exceptions=True)
+
+def _release(holds: List[Callable[[], None]]) -> None:
+    for release in holds:
+        release()
+
+# Singleton instance
+coalescer: MessageCoalescer = None
+
+def get_coalescer() -> MessageCoalescer:
+    """Get or create the inbound message coalescer"""
+    global coalescer
+    if coalescer is None:
+        settings = get_settings()
+        coalescer = MessageCoalescer(
+            window_ms=settings.DEBOUNCE_WINDOW_MS,
+            max_wait_ms=settings.DEBOUNCE_MAX_WAIT_MS
+        )
+        get_registry().register_collector(lambda: [(
+            "debounce_pending_conversations", "gauge",
+            "Conversations with buffered or generating messages",
+            [({}, coalescer.pending)]
+        )])
+    return coalescer
@@ -0,0 +1,173 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class IdempotencyBackend(ABC):
+    """Shared store that lets several workers agree on who handles a message"""
+    
+    @abstractmethod
+    def claim(self, key: str, ttl_seconds: float) -> bool:
+        """Atomically claim `key`; False if another worker already holds it"""
+        pass
+    
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Drop a claim so a provider retry can process the message again"""
+        pass
+
+class SQLiteIdempotencyBackend(IdempotencyBackend):
+    """Claims stored in a SQLite file shared by all workers on one host"""
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS processed_messages ("
+                "message_id TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+            )
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+    
+    def claim(self, key: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        conn = self._connection()
+        # Expired claims can be taken over; live ones can't
+        cursor = conn.execute(
+            "INSERT INTO processed_messages (message_id, expires_at) VALUES (?, ?) "
+            "ON CONFLICT(message_id) DO UPDATE SET expires_at = excluded.expires_at "
+            "WHERE processed_messages.expires_at <= ?",
+            (key, now + ttl_seconds, now)
+        )
+        return cursor.rowcount == 1
+    
+    def release(self, key: str) -> None:
+        self._connection().execute(
+            "DELETE FROM processed_messages WHERE message_id = ?", (key,)
+        )
+    
+    def purge_expired(self) -> int:
+        cursor = self._connection().execute(
+            "DELETE FROM processed_messages WHERE expires_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+class MessageDeduplicator:
+    """
+    Runs the handler for each provider message ID at most once.
+    
+    Duplicates that arrive while the first delivery is still being processed
+    wait for, and share, its result. Completed results are remembered for
+    `ttl_seconds` (bounded by `max_entries`). A failed run is forgotten so
+    that the provider's retry is processed normally.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_entries: int = 100_000,
+        backend: Optional[IdempotencyBackend] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.backend = backend
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._completed: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    def _evict(self, now: float) -> None:
+        # Entries share one TTL, so insertion order is expiry order
+        while self._completed:
+            key, (expires_at, _) = next(iter(self._completed.items()))
+            if expires_at > now and len(self._completed) <= self.max_entries:
+                break
+            self._completed.popitem(last=False)
+    
+    async def process_once(
+        self,
+        message_id: str,
+        handler: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Return (result, is_duplicate) for `message_id`"""
+        if not message_id:
+            return await handler(), False
+        
+        now = time.monotonic()
+        self._evict(now)
+        
+        if message_id in self._completed:
+            return self._completed[message_id][1], True
+        
+        inflight = self._inflight.get(message_id)
+        if inflight is not None:
+            return await asyncio.shield(inflight), True
+        
+        # Registered before the claim so that duplicates arriving meanwhile wait
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[message_id] = future
+        try:
+            # The SQLite backend blocks (up to its busy timeout); keep it off the loop
+            if self.backend is not None and not await asyncio.to_thread(
+                self.backend.claim, message_id, self.ttl_seconds
+            ):
+                # Another worker owns this message
+                logger.info(f"Skipping message {message_id} claimed by another worker")
+                result = {"status": "duplicate"}
+                future.set_result(result)
+                return result, True
+            
+            try:
+                result = await handler()
+            except BaseException:
+                if self.backend is not None:
+                    await asyncio.to_thread(self.backend.release, message_id)
+                raise
+        except BaseException as e:
+            if not future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    future.exception()  # Mark retrieved when nobody attached
+            raise
+        finally:
+            del self._inflight[message_id]
+        
+        future.set_result(result)
+        self._completed[message_id] = (time.monotonic() + self.ttl_seconds, result)
+        self._evict(time.monotonic())
+        return result, False
+
+# Singleton instance
+deduplicator: MessageDeduplicator = None
+
+def get_deduplicator() -> MessageDeduplicator:
+    """Get or create the webhook deduplicator"""
+    global deduplicator
+    if deduplicator is None:
+        settings = get_settings()
+        backend = None
+        if settings.DEDUP_BACKEND_PATH:
+            backend = SQLiteIdempotencyBackend(settings.DEDUP_BACKEND_PATH)
+        deduplicator = MessageDeduplicator(
+            ttl_seconds=settings.DEDUP_TTL_SECONDS,
+            max_entries=settings.DEDUP_MAX_ENTRIES,
+            backend=backend
+        )
+    return deduplicator
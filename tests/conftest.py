@@ -0,0 +1,14 @@
+import os
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Placeholder values so Settings() validates in offline tests
+for key in (
+    "OPENAI_API_KEY", "WHATSAPP_API_TOKEN", "DATABASE_URL",
+    "WHATSAPP_PHONE_NUMBER_ID", "TWILIO_ACCOUNT_SID",
+    "TWILIO_AUTH_TOKEN", "TWILIO_WHATSAPP_NUMBER",
+):
+    os.environ.setdefault(key, "test")
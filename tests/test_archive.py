@@ -0,0 +1,113 @@
+"""Old interactions move to compressed day partitions and can be read back"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+
+from src.database import archive
+from src.database.archive import InteractionArchiver, read_archive
+from src.database.connection import Base
+from src.database.models import Interaction
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/app.db")
+    Base.metadata.create_all(engine)
+    # Two interactions a day for ten days, the last five inside the retention window
+    rows = [
+        {"customer_id": i % 3, "message": f"message {i}", "response": f"reply {i}",
+         "created_at": NOW - timedelta(days=10 - i // 2) + timedelta(hours=i % 2)}
+        for i in range(20)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Interaction.__table__), rows)
+    return engine
+
+def remaining(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(Interaction.__table__)).scalar()
+
+def archiver(engine, tmp_path, **kwargs):
+    return InteractionArchiver(engine, tmp_path / "archive", retention_days=5, batch_size=3, now=lambda: NOW, **kwargs)
+
+def test_rows_past_retention_are_archived_by_day_and_deleted(engine, tmp_path):
+    report = archiver(engine, tmp_path).run()
+    records = list(read_archive(tmp_path / "archive"))
+    
+    assert report.archived == 10
+    assert report.batches == 4
+    assert remaining(engine) == 10
+    assert [record["message"] for record in records] == [f"message {i}" for i in range(10)]
+    assert {path.parent.name for path in (tmp_path / "archive" / "interactions").rglob("*.zst")} == {
+        f"day=2024-05-{day:02d}" for day in range(22, 27)
+    }
+    assert all(record["created_at"] < NOW - timedelta(days=5) for record in records)
+
+def test_dry_run_changes_nothing(engine, tmp_path):
+    report = archiver(engine, tmp_path).run(dry_run=True)
+    
+    assert report.archived == 10
+    assert remaining(engine) == 20
+    assert list(read_archive(tmp_path / "archive")) == []
+
+def test_interrupted_run_resumes_without_duplicates(engine, tmp_path, monkeypatch):
+    def crash(*args):
+        raise RuntimeError("killed")
+    
+    # Stop after the first batch is written and checkpointed, before the delete
+    monkeypatch.setattr(archive, "delete", crash)
+    with pytest.raises(RuntimeError):
+        archiver(engine, tmp_path).run()
+    monkeypatch.undo()
+    assert remaining(engine) == 20
+    
+    report = archiver(engine, tmp_path).run()
+    ids = [record["id"] for record in read_archive(tmp_path / "archive")]
+    
+    assert report.archived == 7
+    assert remaining(engine) == 10
+    assert sorted(ids) == ids == list(range(1, 11))
+
+def test_reader_filters_days_and_customers(engine, tmp_path):
+    archiver(engine, tmp_path, compression="gzip").run()
+    
+    records = list(read_archive(tmp_path / "archive", start=date(2024, 5, 24), end=date(2024, 5, 26), customer_id=1))
+    
+    assert [record["message"] for record in records] == ["message 4", "message 7"]
+    assert next((tmp_path / "archive" / "interactions").rglob("part-*")).name.endswith(".jsonl.gz")
+
+def test_rerun_with_another_batch_size_rewrites_the_unfinished_batch(engine, tmp_path, monkeypatch):
+    def crash(*args):
+        raise RuntimeError("killed")
+    
+    # Stop after the first batch's files are written, before its checkpoint
+    monkeypatch.setattr(archive, "_write_json_atomically", crash)
+    with pytest.raises(RuntimeError):
+        archiver(engine, tmp_path).run()
+    monkeypatch.undo()
+    
+    report = InteractionArchiver(
+        engine, tmp_path / "archive", retention_days=5, batch_size=4, now=lambda: NOW
+    ).run()
+    ids = [record["id"] for record in read_archive(tmp_path / "archive")]
+    
+    assert report.archived == 10
+    assert sorted(ids) == list(range(1, 11))
+
+def test_late_rows_with_old_timestamps_are_archived_not_lost(engine, tmp_path):
+    archiver(engine, tmp_path).run()
+    # Backfilled after the first run, older than everything archived so far
+    with engine.begin() as conn:
+        conn.execute(insert(Interaction.__table__), [
+            {"customer_id": 1, "message": "backfill", "response": "ok", "created_at": NOW - timedelta(days=30)}
+        ])
+    
+    report = archiver(engine, tmp_path).run()
+    messages = [record["message"] for record in read_archive(tmp_path / "archive")]
+    
+    assert report.archived == 1
+    assert remaining(engine) == 10
+    assert messages[0] == "backfill"
+    assert len(messages) == 11
@@ -0,0 +1,48 @@
+"""The regression gate compares against the direction each metric improves in"""
+import json
+
+from benchmarks.suite import compare, main, metric
+
+def results(**values):
+    return {"results": {name: value for name, value in values.items()}}
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = results(
+        latency=metric(10.0, "ms"),
+        throughput=metric(100.0, "MB/s", better="higher"),
+        steady=metric(5.0, "ms"),
+    )
+    current = results(
+        latency=metric(13.0, "ms"),
+        throughput=metric(70.0, "MB/s", better="higher"),
+        steady=metric(5.5, "ms"),
+    )
+    
+    rows = {row["metric"]: row for row in compare(baseline, current, threshold=0.2)}
+    
+    assert rows["latency"]["regressed"]
+    assert rows["throughput"]["regressed"]
+    assert not rows["steady"]["regressed"]
+
+def test_compare_ignores_improvements():
+    baseline = results(latency=metric(10.0, "ms"), throughput=metric(100.0, "MB/s", better="higher"))
+    current = results(latency=metric(2.0, "ms"), throughput=metric(400.0, "MB/s", better="higher"))
+    
+    rows = compare(baseline, current, threshold=0.1)
+    
+    assert [row["metric"] for row in rows] == ["latency", "throughput"]
+    assert not any(row["regressed"] or row["missing"] for row in rows)
+
+def test_missing_metrics_fail_the_gate_unless_allowed(tmp_path, capsys):
+    baseline = results(latency=metric(10.0, "ms"), gone=metric(1.0, "ms"))
+    current = results(latency=metric(10.0, "ms"))
+    baseline_path, current_path = tmp_path / "baseline.json", tmp_path / "current.json"
+    baseline_path.write_text(json.dumps(baseline))
+    current_path.write_text(json.dumps(current))
+    
+    rows = {row["metric"]: row for row in compare(baseline, current, threshold=0.1)}
+    
+    assert rows["gone"]["missing"] and rows["gone"]["current"] is None
+    assert main(["compare", str(baseline_path), str(current_path)]) == 1
+    assert "gone" in capsys.readouterr().err
+    assert main(["compare", str(baseline_path), str(current_path), "--allow-missing"]) == 0
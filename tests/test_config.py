@@ -0,0 +1,87 @@
+import asyncio
+import os
+
+import pytest
+from pydantic import ValidationError
+
+from src import config
+from src.api import admin, messaging
+from src.config import get_settings, reload_settings
+
+def test_get_settings_returns_cached_snapshot():
+    assert get_settings() is get_settings()
+
+def test_settings_are_immutable():
+    with pytest.raises(ValidationError):
+        get_settings().MODEL_NAME = "other"
+
+def test_reload_swaps_in_new_snapshot(monkeypatch):
+    before = get_settings()
+    monkeypatch.setenv("MODEL_NAME", "gpt-4")
+    
+    after = reload_settings()
+    
+    assert after is not before
+    assert get_settings() is after
+    assert after.MODEL_NAME == "gpt-4"
+    monkeypatch.delenv("MODEL_NAME")
+    reload_settings()
+
+def test_invalid_reload_keeps_current_snapshot(monkeypatch):
+    before = get_settings()
+    monkeypatch.setenv("MAX_TOKENS", "not-a-number")
+    
+    with pytest.raises(ValidationError):
+        reload_settings()
+    
+    assert config.get_settings() is before
+
+def test_unimplemented_message_provider_falls_back_to_twilio(monkeypatch, caplog):
+    class StubTwilio:
+        pass
+    
+    monkeypatch.setenv("WHATSAPP_PROVIDER", "meta")
+    monkeypatch.setitem(messaging.PROVIDERS, "twilio", StubTwilio)
+    monkeypatch.setattr(messaging, "message_provider", None)
+    try:
+        reload_settings()
+        provider = messaging.get_message_provider()
+    finally:
+        monkeypatch.undo()
+        reload_settings()
+    
+    assert isinstance(provider, StubTwilio)
+    assert "'meta' is not implemented" in caplog.text
+
+def test_rejected_dotenv_leaves_the_environment_alone(monkeypatch, tmp_path):
+    dotenv = tmp_path / ".env"
+    dotenv.write_text("MAX_TOKENS=not-a-number\nSOME_OTHER_VALUE=1\n")
+    monkeypatch.setattr(config, "find_dotenv", lambda: str(dotenv))
+    
+    with pytest.raises(ValidationError):
+        reload_settings()
+    
+    assert "SOME_OTHER_VALUE" not in os.environ
+    assert os.environ.get("MAX_TOKENS") != "not-a-number"
+
+def test_reload_endpoint_reports_settings_that_need_a_restart(monkeypatch, tmp_path):
+    monkeypatch.setenv("ADMIN_API_TOKEN", "secret")
+    reload_settings()
+    dotenv = tmp_path / ".env"
+    dotenv.write_text("MODEL_NAME=gpt-4\nLLM_TIMEOUT_SECONDS=3\nDEBOUNCE_WINDOW_MS=250\n")
+    monkeypatch.setattr(config, "find_dotenv", lambda: str(dotenv))
+    
+    try:
+        response = asyncio.run(admin.reload_config(x_admin_token="secret"))
+    finally:
+        monkeypatch.undo()
+        for name in ("MODEL_NAME", "LLM_TIMEOUT_SECONDS", "DEBOUNCE_WINDOW_MS"):
+            os.environ.pop(name, None)
+        reload_settings()
+    
+    assert response == {
+        "status": "reloaded",
+        "changed": ["DEBOUNCE_WINDOW_MS", "LLM_TIMEOUT_SECONDS", "MODEL_NAME"],
+        # The coalescer keeps the window it was created with
+        "restart_required": ["DEBOUNCE_WINDOW_MS", "LLM_TIMEOUT_SECONDS"],
+    }
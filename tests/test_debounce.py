@@ -0,0 +1,86 @@
+import asyncio
+
+from src.whatsapp.debounce import MessageCoalescer
+
+class Recorder:
+    def __init__(self, generate_delay: float = 0.0):
+        self.generate_delay = generate_delay
+        self.generated = []
+        self.completed = []
+        self.delivered = []
+    
+    async def generate(self, text: str) -> str:
+        self.generated.append(text)
+        await asyncio.sleep(self.generate_delay)
+        self.completed.append(text)
+        return f"reply to {text!r}"
+    
+    async def deliver(self, reply: str) -> None:
+        self.delivered.append(reply)
+
+async def _submit(coalescer, recorder, key, message):
+    await coalescer.submit(key, message, recorder.generate, recorder.deliver)
+
+def test_burst_is_merged_into_one_generation():
+    recorder = Recorder()
+    
+    async def scenario():
+        coalescer = MessageCoalescer(window_ms=30, max_wait_ms=1000)
+        for message in ["hi", "looking for", "2BR in JVC"]:
+            await _submit(coalescer, recorder, "+971", message)
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.06)
+        await coalescer.drain()
+        return coalescer
+    
+    coalescer = asyncio.run(scenario())
+    
+    assert recorder.generated == ["hi\nlooking for\n2BR in JVC"]
+    assert len(recorder.delivered) == 1
+    assert coalescer.pending == 0
+
+def test_conversations_are_debounced_independently():
+    recorder = Recorder()
+    
+    async def scenario():
+        coalescer = MessageCoalescer(window_ms=20, max_wait_ms=1000)
+        await _submit(coalescer, recorder, "+1", "a")
+        await _submit(coalescer, recorder, "+2", "b")
+        await asyncio.sleep(0.05)
+        await coalescer.drain()
+    
+    asyncio.run(scenario())
+    
+    assert sorted(recorder.generated) == ["a", "b"]
+
+def test_max_wait_bounds_a_continuous_burst():
+    recorder = Recorder()
+    
+    async def scenario():
+        coalescer = MessageCoalescer(window_ms=50, max_wait_ms=70)
+        for i in range(6):
+            await _submit(coalescer, recorder, "+971", str(i))
+            await asyncio.sleep(0.02)
+        await coalescer.drain()
+    
+    asyncio.run(scenario())
+    
+    # The first flush happens at max_wait even though messages kept coming
+    assert len(recorder.completed) >= 2
+    assert "".join(recorder.completed).replace("\n", "") == "012345"
+
+def test_new_message_cancels_superseded_generation():
+    recorder = Recorder(generate_delay=0.05)
+    
+    async def scenario():
+        coalescer = MessageCoalescer(window_ms=10, max_wait_ms=1000)
+        await _submit(coalescer, recorder, "+971", "hi")
+        await asyncio.sleep(0.02)  # "hi" is now generating
+        await _submit(coalescer, recorder, "+971", "budget 1.2M")
+        await coalescer.drain()
+    
+    asyncio.run(scenario())
+    
+    assert recorder.generated == ["hi", "hi\nbudget 1.2M"]
+    assert recorder.completed == ["hi\nbudget 1.2M"]
+    assert recorder.delivered == ["reply to 'hi\\nbudget 1.2M'"]
@@ -0,0 +1,84 @@
+"""Curated FAQ questions are answered without the LLM"""
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from openai import OpenAI
+
+import src.ai.openai_client as openai_client_module
+from benchmarks.loadtest.fakes import FakeOpenAI
+from src.document_processing.faq_index import FaqIndex, FaqStore
+from src.document_processing.processor import DocumentProcessor
+
+FAQ = {
+    "What is the service charge?": "Service charge is 15 AED per sqft per year.",
+    "Do you offer payment plans?": "Yes, off-plan projects have 60/40 payment plans.",
+}
+
+@pytest.fixture
+def processor(monkeypatch, tmp_path):
+    openai_fake = FakeOpenAI().start()
+    monkeypatch.setattr(
+        openai_client_module, "openai_client",
+        OpenAI(api_key="test", base_url=openai_fake.url + "/v1", max_retries=0)
+    )
+    processor = DocumentProcessor.__new__(DocumentProcessor)
+    processor.faq = FaqStore(tmp_path / "faq")
+    faq_file = tmp_path / "faq.json"
+    faq_file.write_text(json.dumps(FAQ))
+    asyncio.run(processor.process_faq(str(faq_file), "acme"))
+    yield processor, openai_fake
+    openai_fake.stop()
+
+def test_questions_are_embedded_once_at_ingestion(processor):
+    processor, openai_fake = processor
+    
+    assert len(processor.faq.get("acme")) == 2
+    assert openai_fake.stats()["requests"]["embeddings"] == 1
+
+def test_exact_questions_are_answered_without_embedding(processor):
+    processor, openai_fake = processor
+    
+    answer = asyncio.run(processor.faq.answer("what is the SERVICE charge", "acme", 0.92))
+    
+    assert answer == FAQ["What is the service charge?"]
+    assert openai_fake.stats()["requests"]["embeddings"] == 1
+
+def test_other_messages_are_matched_by_similarity(processor):
+    processor, openai_fake = processor
+    
+    # The fake's embeddings of different texts are unrelated
+    unrelated = asyncio.run(processor.faq.answer("Show me villas in Arabian Ranches", "acme", 0.92))
+    nearest = asyncio.run(processor.faq.answer("Show me villas in Arabian Ranches", "acme", -1.0))
+    
+    assert unrelated is None
+    assert nearest in FAQ.values()
+    assert openai_fake.stats()["requests"]["embeddings"] == 3
+    assert asyncio.run(processor.faq.answer("What is the service charge?", "other", 0.92)) is None
+
+def test_nearest_question_by_cosine_similarity():
+    pairs = [{"question": "a", "answer": "A"}, {"question": "b", "answer": "B"}]
+    index = FaqIndex(pairs, np.array([[3.0, 0.0], [0.0, 0.5]]))
+    
+    best, score = index.nearest([0.1, 1.0])
+    
+    assert best == 1
+    assert score == pytest.approx(1.0 / np.sqrt(1.01))
+
+def test_store_reloads_updates_and_keeps_serving_through_bad_files(tmp_path):
+    writer = FaqStore(tmp_path)
+    reader = FaqStore(tmp_path)
+    writer.save("acme", [{"question": "a", "answer": "A"}], [[1.0, 0.0]])
+    assert reader.get("acme").pairs[0]["answer"] == "A"
+    
+    writer.save("acme", [{"question": "a", "answer": "A2"}, {"question": "b", "answer": "B"}], [[1.0, 0.0], [0.0, 1.0]])
+    assert reader.get("acme").pairs[0]["answer"] == "A2"
+    
+    # A file truncated or replaced by something else
+    (tmp_path / "acme.npz").write_bytes(b"PK\x03\x04 truncated")
+    
+    assert reader.get("acme").pairs[0]["answer"] == "A2"
+    assert asyncio.run(reader.answer("a", "acme", 0.92)) == "A2"
+    assert FaqStore(tmp_path).get("acme") is None
+    assert list(tmp_path.glob("*.tmp")) == []
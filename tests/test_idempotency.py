@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.whatsapp.idempotency import IdempotencyBackend, MessageDeduplicator, SQLiteIdempotencyBackend
+
+def test_inflight_duplicates_share_one_run():
+    calls = []
+    
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"status": "success"}
+    
+    async def scenario():
+        dedup = MessageDeduplicator()
+        return await asyncio.gather(*(
+            dedup.process_once("SM1", handler) for _ in range(3)
+        ))
+    
+    results = asyncio.run(scenario())
+    
+    assert len(calls) == 1
+    assert [duplicate for _, duplicate in results] == [False, True, True]
+    assert all(result == {"status": "success"} for result, _ in results)
+
+def test_completed_result_is_reused_until_expiry():
+    calls = []
+    
+    async def handler():
+        calls.append(1)
+        return len(calls)
+    
+    async def scenario():
+        dedup = MessageDeduplicator(ttl_seconds=0.05)
+        first = await dedup.process_once("SM1", handler)
+        second = await dedup.process_once("SM1", handler)
+        await asyncio.sleep(0.06)
+        third = await dedup.process_once("SM1", handler)
+        return first, second, third
+    
+    assert asyncio.run(scenario()) == ((1, False), (1, True), (2, False))
+
+def test_failed_run_allows_retry():
+    attempts = []
+    
+    async def handler():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("provider down")
+        return "ok"
+    
+    async def scenario():
+        dedup = MessageDeduplicator()
+        with pytest.raises(RuntimeError):
+            await dedup.process_once("SM1", handler)
+        return await dedup.process_once("SM1", handler)
+    
+    assert asyncio.run(scenario()) == ("ok", False)
+
+def test_shared_backend_skips_message_claimed_by_other_worker(tmp_path):
+    path = tmp_path / "dedup.sqlite3"
+    calls = []
+    
+    async def handler():
+        calls.append(1)
+        return "ok"
+    
+    async def scenario():
+        worker_a = MessageDeduplicator(backend=SQLiteIdempotencyBackend(path))
+        worker_b = MessageDeduplicator(backend=SQLiteIdempotencyBackend(path))
+        return (
+            await worker_a.process_once("SM1", handler),
+            await worker_b.process_once("SM1", handler),
+        )
+    
+    first, second = asyncio.run(scenario())
+    
+    assert first == ("ok", False)
+    assert second[1] is True
+    assert len(calls) == 1
+
+class BlockingBackend(IdempotencyBackend):
+    """Claims that wait on a lock, like SQLite under write contention"""
+    
+    def __init__(self):
+        self.unblocked = threading.Event()
+    
+    def claim(self, key, ttl_seconds):
+        return self.unblocked.wait(5)
+    
+    def release(self, key):
+        pass
+
+def test_blocked_claims_do_not_stall_the_event_loop():
+    backend = BlockingBackend()
+    
+    async def handler():
+        return "ok"
+    
+    async def scenario():
+        dedup = MessageDeduplicator(backend=backend)
+        first = asyncio.create_task(dedup.process_once("SM1", handler))
+        duplicate = asyncio.create_task(dedup.process_once("SM1", handler))
+        # Runs while the claim is blocked; the duplicate waits for the first
+        await asyncio.sleep(0.05)
+        backend.unblocked.set()
+        return await first, await duplicate
+    
+    assert asyncio.run(scenario()) == (("ok", False), ("ok", True))
+
+def test_completed_results_are_bounded():
+    async def handler():
+        return "ok"
+    
+    async def scenario():
+        dedup = MessageDeduplicator(max_entries=2)
+        for message_id in ("SM1", "SM2", "SM3"):
+            await dedup.process_once(message_id, handler)
+        return dedup
+    
+    assert list(asyncio.run(scenario())._completed) == ["SM2", "SM3"]
@@ -0,0 +1,57 @@
+"""Buying signals match whole words, per client, in one pass"""
+import asyncio
+
+from src.analytics.lead_signals import LeadSignalMatcher, get_signal_matcher
+from src.clients.user_manager import UserManager
+from src.database.models import UserProfile
+
+def test_matches_words_and_phrases_with_weights():
+    matcher = LeadSignalMatcher({"price": 5, "Cost": 5, "payment": 1, "payment plan": 4, "off plan": 3})
+    
+    assert matcher.match("Costume party next week") == {}
+    assert matcher.match("What are the PRICES and costs?") == {"price": 5, "cost": 5}
+    assert matcher.match("Is there a payment plan for the off  plan unit?") == {"payment plan": 4, "off plan": 3}
+    assert matcher.score("payment due, price?") == 5
+    assert LeadSignalMatcher(matcher.signals, sum_signals=True).score("payment due, price?") == 6
+
+def test_large_signal_lists_compile():
+    signals = {f"signal{i}": 1 for i in range(5000)}
+    signals["villa"] = 10
+    matcher = LeadSignalMatcher(signals)
+    
+    assert matcher.match("signal4999 and a villa, not signal50000") == {"signal4999": 1, "villa": 10}
+
+def test_matcher_is_cached_until_signals_change():
+    signals = {"villa": 3}
+    matcher = get_signal_matcher("acme", signals)
+    
+    assert get_signal_matcher("acme", signals) is matcher
+    assert get_signal_matcher("acme", {"villa": 3}) is not matcher
+    assert get_signal_matcher("acme", signals, sum_signals=True).sum_signals
+    assert get_signal_matcher("other").match("price?") == {"price": 5}
+
+def test_lead_score_uses_the_clients_signals(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    
+    def score(message, **kwargs):
+        manager = UserManager(signal_matcher=lambda client_id: LeadSignalMatcher({"villa": 7, "viewing": 3}, **kwargs))
+        user = UserProfile(user_id="+1555", client_id="acme")
+        asyncio.run(manager._update_lead_score(user, message))
+        return user
+    
+    strongest = score("Can I book a viewing of the villa?")
+    
+    assert strongest.lead_score.score == 7
+    assert strongest.signal_counts == {"viewing|villa": 1}
+    assert score("Can I book a viewing of the villa?", sum_signals=True).lead_score.score == 10
+    assert score("what's the price?").lead_score.score == 0
+
+def test_default_signals_add_five_points_per_message(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    user = UserProfile(user_id="+1555", client_id="acme")
+    
+    asyncio.run(UserManager(signal_matcher=lambda client_id: get_signal_matcher("acme"))._update_lead_score(
+        user, "Interested! What's the price to buy?"
+    ))
+    
+    assert user.lead_score.score == 5
@@ -0,0 +1,101 @@
+"""Keyword queries are answered from the local BM25 index"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.document_processing.lexical_index import LexicalIndex, LexicalIndexStore, reciprocal_rank_fusion
+from src.document_processing.processor import DocumentProcessor
+
+CHUNKS = [
+    "Marina Gate 2, unit 1203: 2BR, sea view, 2.4M AED",
+    "Marina Gate 1, unit 804: 1BR, marina view, 1.6M AED",
+    "Bloom Towers JVC, unit 310: studio, pool view, 600k AED",
+    "Payment plans are available for off-plan projects in JVC and Dubai Hills",
+]
+METADATA = [{"source": "listings.csv"}] * 3 + [{"source": "faq.txt"}]
+
+def build():
+    index = LexicalIndex()
+    index.add(CHUNKS, METADATA)
+    return index
+
+def test_bm25_ranks_exact_identifiers_first():
+    results = build().search("unit 1203 Marina Gate", top_k=3)
+    
+    assert results[0]["text"] == CHUNKS[0]
+    assert results[0]["coverage"] == 1.0
+    assert results[1]["coverage"] < 1.0
+    assert results[0]["score"] > results[1]["score"]
+
+def test_filters_and_incremental_updates():
+    index = build()
+    index.add(["Unit 1203 parking is included"], [{"source": "notes.txt"}])
+    
+    filtered = index.search("JVC", filter={"source": "faq.txt"})
+    found = index.search("1203 parking")
+    index.remove_source("notes.txt")
+    
+    assert [result["text"] for result in filtered] == [CHUNKS[3]]
+    assert found[0]["text"] == "Unit 1203 parking is included"
+    assert index.search("parking") == []
+    assert len(index) == 4
+
+def test_store_persists_and_replaces_documents(tmp_path):
+    writer = LexicalIndexStore(tmp_path)
+    writer.replace_source("acme", "listings.csv", CHUNKS[:3], METADATA[:3])
+    writer.replace_source("acme", "faq.txt", CHUNKS[3:], METADATA[3:])
+    writer.replace_source("acme", "listings.csv", ["Marina Gate 2, unit 1203: sold"], [{"source": "listings.csv"}])
+    
+    # Another worker rebuilds the index from the chunk file
+    reader = LexicalIndexStore(tmp_path)
+    
+    assert len(reader.get("acme")) == 2
+    assert reader.get("acme").search("unit 1203")[0]["text"] == "Marina Gate 2, unit 1203: sold"
+    assert len(reader.get("other")) == 0
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    lexical = [{"text": "a"}, {"text": "b"}, {"text": "c"}]
+    vector = [{"text": "c"}, {"text": "d"}, {"text": "b"}]
+    
+    fused = [result["text"] for result in reciprocal_rank_fusion([lexical, vector])]
+    
+    assert fused[:2] == ["c", "b"]  # In both lists, ahead of "a" (lexical #1 only)
+    assert set(fused) == {"a", "b", "c", "d"}
+
+class RecordingVectorStore:
+    def __init__(self):
+        self.queries = []
+    
+    async def search(self, query, namespace, top_k=5, filter=None):
+        self.queries.append(query)
+        return [{"text": CHUNKS[3], "score": 0.9, "metadata": METADATA[3]}]
+
+def test_keyword_queries_skip_the_vector_search(tmp_path):
+    processor = DocumentProcessor.__new__(DocumentProcessor)
+    processor.vector_store = RecordingVectorStore()
+    processor.lexical = LexicalIndexStore(tmp_path)
+    processor.lexical.replace_source("acme", "listings.csv", CHUNKS, METADATA)
+    
+    exact = asyncio.run(processor.search("Marina Gate 2 unit 1203", "acme", top_k=3))
+    vague = asyncio.run(processor.search("payment options for new projects", "acme", top_k=3))
+    
+    assert exact[0]["text"] == CHUNKS[0]
+    assert processor.vector_store.queries == ["payment options for new projects"]
+    assert vague[0]["text"] == CHUNKS[3]
+
+class FailingVectorStore:
+    async def store_embeddings(self, texts, metadata, namespace):
+        raise ConnectionError("upsert failed")
+
+def test_chunks_are_indexed_only_after_the_vector_upsert(tmp_path):
+    processor = DocumentProcessor.__new__(DocumentProcessor)
+    processor.text_splitter = SimpleNamespace(split_text=lambda text: text.split("\n"))
+    processor.vector_store = FailingVectorStore()
+    processor.lexical = LexicalIndexStore(tmp_path)
+    
+    with pytest.raises(ConnectionError):
+        asyncio.run(processor.process_raw_text("\n".join(CHUNKS), "acme"))
+    
+    assert processor.lexical.get("acme").search("Marina Gate", top_k=3) == []
+    assert not (tmp_path / "acme.jsonl").exists()
@@ -0,0 +1,146 @@
+"""Completions stay bounded when the provider is slow or failing"""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from openai import OpenAI
+
+from benchmarks.loadtest.fakes import FakeOpenAI
+from src.ai.llm_client import CircuitBreaker, LLMUnavailable, ResilientLLMClient
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+class ScriptedCreate:
+    """
+    In-process `create` recording which models were called, in order.
+    
+    Models in `stalled` (and the next call after `stall()`) hang until their
+    timeout, like an HTTP request to a provider that never answers; the
+    others answer at once.
+    """
+    
+    def __init__(self, stalled=()):
+        self.stalled = set(stalled)
+        self.calls = []
+        self._stall_next = False
+        self._lock = threading.Lock()
+        self._released = threading.Event()
+    
+    def stall(self):
+        self._stall_next = True
+    
+    def release(self):
+        self._released.set()
+    
+    def __call__(self, model, messages, timeout, **params):
+        with self._lock:
+            self.calls.append(model)
+            stalled, self._stall_next = model in self.stalled or self._stall_next, False
+        if stalled:
+            self._released.wait(timeout)
+            raise TimeoutError(f"{model} did not answer")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"reply from {model}"))])
+
+def make_client(fake, **kwargs):
+    openai = OpenAI(api_key="test", base_url=fake.url + "/v1", max_retries=0)
+    kwargs.setdefault("default_model", "primary")
+    return ResilientLLMClient(create=openai.chat.completions.create, **kwargs)
+
+def complete(client):
+    return asyncio.run(client.complete(MESSAGES, tenant_id="acme"))
+
+def test_slow_model_falls_back_to_the_next_one():
+    create = ScriptedCreate(stalled={"primary"})
+    client = ResilientLLMClient(create, "primary", fallback_model="secondary", timeout_seconds=0.3, hedge=False)
+    
+    result = complete(client)
+    
+    assert result.model == "secondary"
+    assert result.fallback
+    assert result.text == "reply from secondary"
+    assert create.calls == ["primary", "secondary"]
+
+def test_fallback_is_skipped_past_the_deadline():
+    now = [0.0]
+    
+    def failing(model, **kwargs):
+        # The first attempt uses up the whole deadline
+        now[0] += 20
+        raise ConnectionError("reset")
+    
+    client = ResilientLLMClient(
+        failing, "primary", fallback_model="secondary", deadline_seconds=20, hedge=False,
+        clock=lambda: now[0]
+    )
+    
+    with pytest.raises(LLMUnavailable):
+        complete(client)
+    assert client.breakers.keys() == {"primary"}
+
+def test_canned_response_when_no_model_answers():
+    fake = FakeOpenAI(error_rate=1.0).start()
+    try:
+        canned = make_client(fake, fallback_model="secondary", fallback_response="Try again later")
+        strict = make_client(fake)
+        
+        result = complete(canned)
+        
+        assert result.text == "Try again later"
+        assert result.model is None
+        with pytest.raises(LLMUnavailable):
+            complete(strict)
+    finally:
+        fake.stop()
+
+def test_open_circuit_skips_the_slow_model():
+    create = ScriptedCreate(stalled={"primary"})
+    client = ResilientLLMClient(
+        create, "primary", fallback_model="secondary", timeout_seconds=0.1, hedge=False,
+        breaker_factory=lambda: CircuitBreaker(min_calls=3, open_seconds=60)
+    )
+    
+    results = [complete(client) for _ in range(4)]
+    
+    assert client.breakers["primary"].state == CircuitBreaker.OPEN
+    assert [result.model for result in results] == ["secondary"] * 4
+    # The fourth call no longer waits for the primary
+    assert create.calls == ["primary", "secondary"] * 3 + ["secondary"]
+
+def test_stalled_attempt_is_hedged():
+    create = ScriptedCreate()
+    client = ResilientLLMClient(create, "primary", timeout_seconds=5, hedge_min_samples=5)
+    for _ in range(5):
+        complete(client)
+    
+    async def stalled_call():
+        create.stall()
+        try:
+            return await client.complete(MESSAGES, tenant_id="acme")
+        finally:
+            # Unblock the abandoned attempt so the loop can shut down
+            create.release()
+    
+    result = asyncio.run(stalled_call())
+    
+    assert result.hedged
+    assert result.model == "primary"
+    assert result.text == "reply from primary"
+    assert create.calls == ["primary"] * 7
+
+def test_breaker_probes_once_after_open_period():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_ratio=0.5, window=4, min_calls=4, open_seconds=10, clock=lambda: now[0])
+    for success in (True, False, True, False):
+        breaker.record(success)
+    
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    
+    now[0] = 10
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one probe at a time
+    breaker.record(True)
+    
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
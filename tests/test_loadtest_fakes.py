@@ -0,0 +1,75 @@
+"""The load-test fakes must speak the real client libraries' protocols"""
+import pytest
+from openai import OpenAI
+from pinecone import Pinecone
+from twilio.rest import Client
+
+from benchmarks.loadtest.fakes import FakeOpenAI, FakePinecone, FakeTwilio, LatencyModel
+
+@pytest.fixture
+def fake(request):
+    service = request.param().start()
+    yield service
+    service.stop()
+
+@pytest.mark.parametrize("fake", [FakeOpenAI], indirect=True)
+def test_openai_client_against_fake(fake):
+    client = OpenAI(api_key="test", base_url=fake.url + "/v1", max_retries=0)
+    
+    completion = client.chat.completions.create(
+        model="gpt-3.5-turbo", messages=[{"role": "user", "content": "hi"}]
+    )
+    embedding = client.embeddings.create(model="text-embedding-ada-002", input="hi")
+    
+    assert "hi" in completion.choices[0].message.content
+    assert len(embedding.data[0].embedding) == 1536
+    assert fake.stats()["requests"] == {"chat.completions": 1, "embeddings": 1}
+
+@pytest.mark.parametrize("fake", [FakeTwilio], indirect=True)
+def test_twilio_client_against_fake(fake):
+    sent = []
+    fake.on_message = lambda to, body: sent.append((to, body))
+    client = Client("ACtest", "token")
+    client.api.base_url = fake.url
+    
+    message = client.messages.create(from_="whatsapp:+1", to="whatsapp:+2", body="hello")
+    
+    assert message.sid.startswith("SM")
+    assert sent == [("whatsapp:+2", "hello")]
+
+@pytest.mark.parametrize("fake", [FakePinecone], indirect=True)
+def test_pinecone_client_against_fake(fake):
+    index = Pinecone(api_key="test").Index(host=fake.url)
+    index.upsert(
+        vectors=[
+            {"id": "a", "values": [1.0, 0.0], "metadata": {"text": "A", "source": "listings.csv"}},
+            {"id": "b", "values": [0.0, 1.0], "metadata": {"text": "B", "source": "faq.txt"}},
+        ],
+        namespace="acme"
+    )
+    
+    results = index.query(vector=[0.9, 0.1], namespace="acme", top_k=2, include_metadata=True)
+    filtered = index.query(
+        vector=[0.9, 0.1], namespace="acme", top_k=2,
+        filter={"source": {"$eq": "faq.txt"}}, include_metadata=True
+    )
+    
+    assert [match["id"] for match in results["matches"]] == ["a", "b"]
+    assert [match["metadata"]["text"] for match in filtered["matches"]] == ["B"]
+
+def test_fakes_inject_errors():
+    fake = FakeOpenAI(error_rate=1.0).start()
+    try:
+        client = OpenAI(api_key="test", base_url=fake.url + "/v1", max_retries=0)
+        with pytest.raises(Exception):
+            client.embeddings.create(model="text-embedding-ada-002", input="hi")
+    finally:
+        fake.stop()
+    assert fake.stats()["errors"] == {"embeddings": 1}
+
+def test_latency_models():
+    assert LatencyModel("fixed:5").sample_ms() == 5
+    assert 10 <= LatencyModel("uniform:10:20", seed=1).sample_ms() <= 20
+    model = LatencyModel("lognormal:100:0.5", seed=1)
+    samples = sorted(model.sample_ms() for _ in range(1001))
+    assert 80 < samples[500] < 125
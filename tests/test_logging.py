@@ -0,0 +1,79 @@
+import io
+import json
+import logging
+
+import pytest
+
+from src.observability.log import configure_logging, shutdown_logging
+
+@pytest.fixture
+def log_output():
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", debug_sample_rate=1.0, stream=stream)
+    yield stream
+    shutdown_logging()
+    logging.getLogger().handlers.clear()
+
+def _entries(stream):
+    shutdown_logging()  # flush the queue
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+def test_records_are_written_as_json_with_extra_fields(log_output):
+    logging.getLogger("src.api.whatsapp").info(
+        "Received message", extra={"client_id": "acme", "message_id": "SM1"}
+    )
+    
+    [entry] = _entries(log_output)
+    
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "src.api.whatsapp"
+    assert entry["message"] == "Received message"
+    assert entry["client_id"] == "acme"
+    assert entry["message_id"] == "SM1"
+
+def test_message_bodies_and_phone_numbers_are_redacted(log_output):
+    logging.getLogger("test").info(
+        "Reply to whatsapp:+971501234567",
+        extra={"from_number": "whatsapp:+971501234567", "message_body": "budget 1.2M"}
+    )
+    
+    [entry] = _entries(log_output)
+    
+    assert entry["message"] == "Reply to whatsapp:***4567"
+    assert entry["from_number"] == "whatsapp:***4567"
+    assert entry["message_body"] == "<redacted:11 chars>"
+
+def test_text_format_redacts_phone_numbers():
+    stream = io.StringIO()
+    configure_logging(json_format=False, stream=stream)
+    try:
+        logging.getLogger("test").info("Reply to whatsapp:+971501234567")
+        shutdown_logging()
+    finally:
+        logging.getLogger().handlers.clear()
+    
+    assert stream.getvalue().rstrip().endswith("INFO [test] Reply to whatsapp:***4567")
+
+def test_exceptions_are_rendered(log_output):
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("test").exception("Failed")
+    
+    [entry] = _entries(log_output)
+    
+    assert "ValueError: boom" in entry["exc_info"]
+
+def test_debug_records_are_sampled():
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", debug_sample_rate=0.0, stream=stream)
+    try:
+        logger = logging.getLogger("test")
+        for _ in range(100):
+            logger.debug("noisy")
+        logger.warning("kept")
+        entries = _entries(stream)
+    finally:
+        logging.getLogger().handlers.clear()
+    
+    assert [entry["message"] for entry in entries] == ["kept"]
@@ -0,0 +1,55 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.observability.metrics import MetricsRegistry, LLM_LATENCY
+
+def test_counts_from_all_threads_are_merged():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events", ("tenant",))
+    histogram = registry.histogram("latency_seconds", "Latency", ("tenant",), buckets=(0.1, 1.0))
+    
+    def record():
+        for _ in range(1000):
+            counter.inc(tenant="a")
+            histogram.observe(0.5, tenant="a")
+    
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert counter.value(tenant="a") == 8000
+    assert histogram.count(tenant="a") == 8000
+
+def test_render_uses_prometheus_text_format():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("tenant",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, tenant="a")
+    histogram.observe(0.5, tenant="a")
+    histogram.observe(5, tenant="a")
+    registry.counter("errors_total", "Errors", ("stage",)).inc(stage='say "hi"')
+    registry.register_collector(lambda: [("queue_depth", "gauge", "Depth", [({"tenant": "a"}, 3)])])
+    
+    lines = registry.render().splitlines()
+    
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{tenant="a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{tenant="a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{tenant="a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{tenant="a"} 5.55' in lines
+    assert 'latency_seconds_count{tenant="a"} 3' in lines
+    assert 'errors_total{stage="say \\"hi\\""} 1' in lines
+    assert 'queue_depth{tenant="a"} 3' in lines
+
+def test_metrics_endpoint():
+    LLM_LATENCY.observe(0.2, tenant="acme", model="gpt-3.5-turbo")
+    
+    with TestClient(app) as client:
+        response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'llm_completion_seconds_count{tenant="acme",model="gpt-3.5-turbo"}' in response.text
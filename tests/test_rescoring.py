@@ -0,0 +1,140 @@
+"""Bulk re-scoring applies the current rules to every stored user"""
+import asyncio
+import io
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.analytics.lead_signals import LeadSignalMatcher
+from src.analytics.rescoring import STATUS_CODES, LeadRescorer, ScoringRules, score_batch
+from src.clients.state_backend import SQLStateBackend
+from src.clients.user_manager import UserManager
+from src.database.models import LeadScore, QualificationStatus, UserProfile
+
+NOW = datetime(2024, 6, 1)
+MATCHER = LeadSignalMatcher({"price": 5, "villa": 20})
+STATUS_CODES_BY_VALUE = {code: status.value for status, code in STATUS_CODES.items()}
+
+def profile(user_id, count=0, messages=(), status=QualificationStatus.NEW, score=0, idle_days=0):
+    return UserProfile(
+        user_id=user_id,
+        client_id="acme",
+        interaction_count=count,
+        last_interaction=NOW - timedelta(days=idle_days),
+        conversation_history=[{"message": message, "response": "ok"} for message in messages],
+        lead_score=LeadScore(score=score),
+        qualification_status=status,
+    )
+
+def test_score_batch_applies_rules_to_arrays():
+    rules = ScoringRules(stale_after_days=10, stale_points_per_day=1)
+    status = np.array([STATUS_CODES[QualificationStatus.NEW]] * 3 + [STATUS_CODES[QualificationStatus.CUSTOMER]])
+    
+    scores, new_status = score_batch(
+        interaction_counts=np.array([5, 20, 70, 0]),
+        signal_points=np.array([10.0, 15.0, 0.0, 0.0]),
+        idle_days=np.array([0.0, 25.0, 0.0, 0.0]),
+        current_status=status,
+        rules=rules,
+    )
+    
+    assert scores.tolist() == [10, 20, 100, 0]
+    assert [STATUS_CODES_BY_VALUE[code] for code in new_status] == [
+        "new", "new", "highly_qualified", "customer"
+    ]
+
+def test_dry_run_reports_without_writing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = UserManager(signal_matcher=lambda client_id: MATCHER)
+    manager.users = {"acme": {
+        "a": profile("a", count=12, messages=["villa price?", "villa"]),  # 4 + 20 + 20
+        "b": profile("b", count=3, score=0),
+    }}
+    diffs = io.StringIO()
+    rescorer = LeadRescorer(manager, batch_size=1, now=lambda: NOW)
+    
+    report = asyncio.run(rescorer.rescore_client("acme", MATCHER, dry_run=True, diff_file=diffs))
+    
+    assert (report.users, report.changed, report.written) == (2, 1, 0)
+    assert report.transitions == {("new", "investigating"): 1}
+    assert json.loads(diffs.getvalue()) == {
+        "client_id": "acme", "user_id": "a", "score": [0, 44], "status": ["new", "investigating"]
+    }
+    assert manager.users["acme"]["a"].lead_score.score == 0
+    
+    report = asyncio.run(rescorer.rescore_client("acme", MATCHER))
+    
+    assert report.written == 1
+    assert manager.users["acme"]["a"].lead_score.score == 44
+    assert (tmp_path / "data" / "users.json").exists()
+
+def test_backend_write_back_skips_concurrently_updated_users(tmp_path):
+    backend = SQLStateBackend(f"sqlite:///{tmp_path / 'state.sqlite3'}")
+    for user_id in ("a", "b", "c"):
+        backend.save_user(profile(user_id, count=40))
+    save_users = backend.save_users
+    
+    def save_after_live_update(profiles):
+        # A live message updates "a" between the read and the bulk write
+        live = backend.get_user("acme", "a")
+        if live.interaction_count == 40:
+            live.interaction_count += 1
+            backend.save_user(live)
+        return save_users(profiles)
+    
+    backend.save_users = save_after_live_update
+    rescorer = LeadRescorer(UserManager(backend=backend), batch_size=2, now=lambda: NOW)
+    
+    report = asyncio.run(rescorer.rescore_client("acme", MATCHER))
+    
+    assert (report.users, report.written, report.conflicts) == (3, 2, 1)
+    assert backend.get_user("acme", "a").lead_score.score == 0
+    assert backend.get_user("acme", "b").lead_score.score == 60
+    assert backend.get_user("acme", "c").qualification_status == QualificationStatus.QUALIFIED
+
+def test_unchanged_rules_keep_long_conversations_as_scored(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = UserManager(signal_matcher=lambda client_id: MATCHER)
+    
+    async def converse():
+        for i in range(25):
+            message = "what is the price?" if i % 5 < 3 else "thanks"
+            await manager.update_user_interaction("+971500000001", "acme", message, "ok")
+    
+    asyncio.run(converse())
+    live = manager.users["acme"]["+971500000001"]
+    # Profiles from before signal matches were counted, with the same outcome
+    manager.users["acme"]["legacy"] = live.model_copy(update={
+        "user_id": "legacy", "signal_counts": {}, "untracked_signal_points": None
+    })
+    
+    report = asyncio.run(LeadRescorer(manager, now=lambda: NOW).rescore_client("acme", MATCHER, dry_run=True))
+    
+    assert (live.interaction_count, live.lead_score.score) == (25, 100)
+    assert live.qualification_status == QualificationStatus.HIGHLY_QUALIFIED
+    assert (report.users, report.changed) == (2, 0)
+    assert report.transitions == {}
+
+def test_statuses_are_only_lowered_when_the_rules_allow_it():
+    status = np.array([STATUS_CODES[QualificationStatus.HIGHLY_QUALIFIED]])
+    stricter = dict(qualified_score=90, highly_qualified_score=95)
+    
+    _, kept = score_batch(np.array([0]), np.array([85.0]), np.array([0.0]), status, ScoringRules(**stricter))
+    _, lowered = score_batch(
+        np.array([0]), np.array([85.0]), np.array([0.0]), status, ScoringRules(allow_downgrade=True, **stricter)
+    )
+    
+    assert STATUS_CODES_BY_VALUE[kept[0]] == "highly_qualified"
+    assert STATUS_CODES_BY_VALUE[lowered[0]] == "investigating"
+
+def test_signal_combinations_are_rescored_at_the_current_weights():
+    user = profile("a").model_copy(update={
+        "signal_counts": {"price|villa": 2, "price": 1}, "untracked_signal_points": 0.0
+    })
+    rescorer = LeadRescorer(UserManager.__new__(UserManager), now=lambda: NOW)
+    
+    strongest = rescorer._signal_points(user, MATCHER)
+    summed = rescorer._signal_points(user, LeadSignalMatcher(MATCHER.signals, sum_signals=True))
+    
+    assert (strongest, summed) == (45, 55)
@@ -0,0 +1,52 @@
+"""Messages go to the cheapest model tier that can answer them"""
+import logging
+
+import pytest
+
+from src.ai.router import classify_message, route_message
+from src.clients.client_manager import ClientSettings
+from src.config import get_settings
+
+@pytest.mark.parametrize("text, category", [
+    ("hi", "greeting"),
+    ("Hello there!", "greeting"),
+    ("thanks so much", "greeting"),
+    ("ok what's the price of unit 4?", "general"),
+    ("What are your office hours?", "faq"),
+    ("Do you have villas in Arabian Ranches", "faq"),
+    ("Compare the JVC 2BR with the Marina 1BR", "complex"),
+    ("What's the yield? And the service charge?", "complex"),
+    ("I'm looking for " + "a spacious family apartment near good schools " * 10, "complex"),
+    ("Looking for a 2 bedroom in Downtown", "general"),
+])
+def test_classify_message(text, category):
+    assert classify_message(text) == category
+
+def test_client_tiers_and_limits_are_enforced():
+    client = ClientSettings(
+        client_id="acme",
+        whatsapp_number="+14155550100",
+        max_tokens=120,
+        temperature=0.2,
+        model_tiers={"fast": "small-model", "advanced": "big-model"},
+    )
+    
+    greeting = route_message("hey", "acme", client)
+    comparison = route_message("which is better, JVC or JLT?", "acme", client)
+    general = route_message("Looking for a 2 bedroom in Downtown", "acme", client)
+    
+    assert (greeting.tier, greeting.model) == ("fast", "small-model")
+    assert (comparison.tier, comparison.model) == ("advanced", "big-model")
+    assert general.model == get_settings().MODEL_NAME
+    assert (greeting.max_tokens, greeting.temperature) == (120, 0.2)
+
+def test_unknown_client_uses_global_defaults(caplog):
+    settings = get_settings()
+    
+    with caplog.at_level(logging.INFO, logger="src.ai.router"):
+        decision = route_message("hi", "default")
+    
+    assert decision.model == (settings.MODEL_FAST or settings.MODEL_NAME)
+    assert (decision.max_tokens, decision.temperature) == (settings.MAX_TOKENS, settings.TEMPERATURE)
+    record = caplog.records[-1]
+    assert (record.category, record.tier, record.model) == ("greeting", "fast", decision.model)
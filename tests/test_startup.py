@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from src.api import health
+from src.database import connection
+from src.main import app
+from src.whatsapp import debounce
+
+ROOT = Path(__file__).parent.parent
+
+def test_import_is_lazy_and_needs_no_env():
+    code = (
+        "import sys, src.main; "
+        "print(sorted(m for m in ('openai', 'pinecone', 'langchain', 'twilio.rest') "
+        "if m in sys.modules))"
+    )
+    env = {"PATH": os.environ.get("PATH", "")}
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=ROOT, env=env)
+    assert output.decode().strip() == "[]"
+
+def test_ready_warms_required_clients(monkeypatch):
+    monkeypatch.setattr(health, "OPTIONAL_WARMERS", {})
+    with TestClient(app) as client:
+        response = client.get("/ready")
+    
+    assert response.status_code == 200
+    assert response.json()["checks"] == {
+        "settings": "ok", "openai": "ok", "messaging": "ok", "clients": "ok"
+    }
+
+def test_ready_reports_failing_subsystem(monkeypatch):
+    def broken():
+        raise RuntimeError("boom")
+    
+    monkeypatch.setattr(health, "REQUIRED_WARMERS", {"openai": broken})
+    monkeypatch.setattr(health, "OPTIONAL_WARMERS", {})
+    with TestClient(app) as client:
+        response = client.get("/ready")
+    
+    assert response.status_code == 503
+    assert response.json()["checks"]["openai"] == "error: boom"
+
+def test_shutdown_drains_replies_before_disposing_the_engine(monkeypatch):
+    calls = []
+    
+    class RecordingCoalescer:
+        async def drain(self):
+            calls.append("drain")
+    
+    async def dispose():
+        calls.append("dispose")
+    
+    monkeypatch.setattr(debounce, "coalescer", RecordingCoalescer())
+    monkeypatch.setattr(connection, "dispose_async_engine", dispose)
+    with TestClient(app):
+        pass
+    
+    assert calls == ["drain", "dispose"]
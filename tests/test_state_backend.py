@@ -0,0 +1,77 @@
+"""Workers sharing a state backend must not lose each other's writes"""
+import asyncio
+import threading
+
+import pytest
+
+from src.clients.client_manager import ClientManager
+from src.clients.state_backend import SQLStateBackend, VersionConflict
+from src.clients.user_manager import UserManager
+from src.database.models import UserProfile
+
+@pytest.fixture
+def url(tmp_path):
+    return f"sqlite:///{tmp_path / 'state.sqlite3'}"
+
+def test_stale_profile_write_is_rejected(url):
+    backend = SQLStateBackend(url)
+    stored = backend.save_user(UserProfile(user_id="+1555", client_id="acme"))
+    
+    first = backend.get_user("acme", "+1555")
+    second = backend.get_user("acme", "+1555")
+    first.interaction_count = 1
+    backend.save_user(first)
+    second.interaction_count = 5
+    
+    assert stored.version == 1
+    with pytest.raises(VersionConflict):
+        backend.save_user(second)
+    with pytest.raises(VersionConflict):
+        backend.save_user(UserProfile(user_id="+1555", client_id="acme"))
+    assert backend.get_user("acme", "+1555").interaction_count == 1
+
+def test_concurrent_workers_keep_every_interaction(url):
+    errors = []
+    
+    # Each thread is a separate worker with its own engine and manager
+    def worker(index):
+        async def run():
+            manager = UserManager(backend=SQLStateBackend(url))
+            for n in range(10):
+                await manager.update_user_interaction("+1555", "acme", f"msg {index}-{n}", "ok")
+        
+        try:
+            asyncio.run(run())
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    user = SQLStateBackend(url).get_user("acme", "+1555")
+    assert errors == []
+    assert user.interaction_count == 40
+    assert user.version == 41  # creation + 40 updates
+
+def test_client_changes_reach_other_workers(url):
+    writer = ClientManager(backend=SQLStateBackend(url), refresh_seconds=0)
+    reader = ClientManager(backend=SQLStateBackend(url), refresh_seconds=0)
+    
+    async def scenario():
+        assert await reader.get_client("acme") is None
+        await writer.create_client("acme", "+14155550100")
+        assert (await reader.get_client_by_number("whatsapp:+14155550100")).client_id == "acme"
+        
+        await writer.update_client("acme", temperature=0.2)
+        assert (await reader.get_client("acme")).temperature == 0.2
+        
+        with pytest.raises(ValueError):
+            await reader.create_client("acme", "+14155550199")
+        
+        await writer.delete_client("acme")
+        assert await reader.get_client("acme") is None
+    
+    asyncio.run(scenario())
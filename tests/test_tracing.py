@@ -0,0 +1,164 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from src.observability import tracing
+from src.observability.tracing import (
+    JsonlSpanExporter,
+    OtlpHttpSpanExporter,
+    SpanExporter,
+    TailSampler,
+    Tracer,
+)
+from src.whatsapp.debounce import MessageCoalescer
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.batches = []
+    
+    def export(self, spans):
+        self.batches.append(spans)
+
+def test_nested_spans_form_one_trace():
+    exporter = ListExporter()
+    tracer = Tracer(exporter=exporter)
+    
+    with tracer.span("webhook") as root:
+        with tracer.span("llm.completion", model="gpt") as child:
+            pass
+    tracer.shutdown()
+    
+    [spans] = exporter.batches
+    assert {span.name for span in spans} == {"webhook", "llm.completion"}
+    assert child.trace_id == root.trace_id
+    assert child.parent_id == root.span_id
+    assert child.attributes == {"model": "gpt"}
+
+def test_background_task_keeps_trace_id():
+    exporter = ListExporter()
+    tracer = Tracer(exporter=exporter)
+    
+    async def background():
+        await asyncio.sleep(0.01)
+        with tracer.span("generate_reply") as span:
+            return span
+    
+    async def scenario():
+        with tracer.span("webhook") as root:
+            task = asyncio.get_running_loop().create_task(background())
+        return root, await task
+    
+    root, background_span = asyncio.run(scenario())
+    tracer.shutdown()
+    
+    assert background_span.trace_id == root.trace_id
+    assert background_span.parent_id == root.span_id
+    # The request finished first, so its spans were exported on their own
+    assert [[span.name for span in batch] for batch in exporter.batches] == [
+        ["webhook"], ["generate_reply"]
+    ]
+
+def test_errors_are_recorded_on_the_span():
+    exporter = ListExporter()
+    tracer = Tracer(exporter=exporter)
+    
+    with pytest.raises(RuntimeError):
+        with tracer.span("twilio.send_message"):
+            raise RuntimeError("timeout")
+    tracer.shutdown()
+    
+    assert exporter.batches[0][0].error == "RuntimeError: timeout"
+
+def test_tail_sampling_keeps_only_slow_or_failed_traces():
+    exporter = ListExporter()
+    tracer = Tracer(exporter=exporter, sampler=TailSampler(slow_ms=20, rate=0.0))
+    
+    with tracer.span("fast"):
+        pass
+    with tracer.span("slow"):
+        threading.Event().wait(0.03)
+    with pytest.raises(ValueError):
+        with tracer.span("failed"):
+            raise ValueError()
+    tracer.shutdown()
+    
+    assert [batch[0].name for batch in exporter.batches] == ["slow", "failed"]
+
+def test_debounced_reply_is_sampled_with_its_request(monkeypatch):
+    exporter = ListExporter()
+    monkeypatch.setattr(tracing, "tracer", Tracer(exporter=exporter, sampler=TailSampler(slow_ms=50, rate=0.0)))
+    delivered = []
+    
+    async def generate(text):
+        with tracing.span("generate_reply"):
+            await asyncio.sleep(0.06)
+        return text.upper()
+    
+    async def deliver(reply):
+        with tracing.span("twilio.send_message"):
+            delivered.append(reply)
+    
+    async def scenario():
+        coalescer = MessageCoalescer(window_ms=10)
+        with tracing.span("webhook"):
+            await coalescer.submit("user", "hi", generate, deliver)
+        await coalescer.drain()
+    
+    asyncio.run(scenario())
+    tracing.tracer.shutdown()
+    
+    # The webhook span was fast, but the trace is sampled once the reply is sent
+    assert delivered == ["HI"]
+    [spans] = exporter.batches
+    assert sorted(span.name for span in spans) == ["generate_reply", "twilio.send_message", "webhook"]
+    assert len({span.trace_id for span in spans}) == 1
+
+def test_jsonl_exporter(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(exporter=JsonlSpanExporter(str(path)))
+    
+    with tracer.span("webhook", message_id="SM1"):
+        with tracer.span("vector.query"):
+            pass
+    tracer.shutdown()
+    
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["vector.query", "webhook"]
+    assert lines[1]["attributes"] == {"message_id": "SM1"}
+    assert lines[0]["parent_id"] == lines[1]["span_id"]
+
+def test_otlp_exporter_posts_to_collector():
+    received = []
+    
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, json.loads(body)))
+            self.send_response(200)
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+        tracer = Tracer(exporter=OtlpHttpSpanExporter(endpoint))
+        with tracer.span("webhook", duplicate=False):
+            pass
+        tracer.shutdown()
+    finally:
+        server.shutdown()
+    
+    [(path, payload)] = received
+    assert path == "/v1/traces"
+    [otlp_span] = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert otlp_span["name"] == "webhook"
+    assert len(otlp_span["traceId"]) == 32
+    assert otlp_span["attributes"] == [{"key": "duplicate", "value": {"boolValue": False}}]
+    assert otlp_span["status"] == {"code": 1}
@@ -0,0 +1,82 @@
+"""Batched vector search against the load-test fakes"""
+import asyncio
+import threading
+
+import pytest
+from openai import OpenAI
+
+import src.ai.openai_client as openai_client_module
+from benchmarks.loadtest.fakes import FakeOpenAI, FakePinecone
+from src.config import reload_settings
+from src.database.vector_store import VectorStore
+
+LISTINGS = [
+    "2BR apartment in JVC with pool view, 1.2M AED",
+    "Studio in Dubai Marina, high floor, 850k AED",
+    "4BR villa in Arabian Ranches with garden",
+]
+
+@pytest.fixture
+def store(monkeypatch):
+    openai_fake = FakeOpenAI().start()
+    pinecone_fake = FakePinecone().start()
+    monkeypatch.setenv("PINECONE_INDEX_HOST", pinecone_fake.url)
+    reload_settings()
+    monkeypatch.setattr(
+        openai_client_module, "openai_client",
+        OpenAI(api_key="test", base_url=openai_fake.url + "/v1", max_retries=0)
+    )
+    store = VectorStore()
+    asyncio.run(store.store_embeddings(
+        LISTINGS + ["Service charge is 15 AED per sqft"],
+        [{"source": "listings.csv", "file_type": ".csv"}] * 3 + [{"source": "faq.txt", "file_type": ".txt"}],
+        namespace="acme"
+    ))
+    yield store, openai_fake
+    monkeypatch.delenv("PINECONE_INDEX_HOST")
+    reload_settings()
+    openai_fake.stop()
+    pinecone_fake.stop()
+
+def test_chunks_are_embedded_in_one_request(store):
+    _, openai_fake = store
+    
+    assert openai_fake.stats()["requests"]["embeddings"] == 1
+
+def test_queries_share_one_embedding_request_and_merge_duplicates(store):
+    store, openai_fake = store
+    
+    # The fake embeds equal texts equally, so these queries hit exact chunks
+    results = asyncio.run(store.search_many([LISTINGS[0], LISTINGS[1], LISTINGS[0]], "acme", top_k=2))
+    
+    assert openai_fake.stats()["requests"]["embeddings"] == 2
+    by_text = {result["text"]: result for result in results}
+    assert {0, 2} <= set(by_text[LISTINGS[0]]["queries"])
+    assert len(results) == len({result["id"] for result in results})
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert results == sorted(results, key=lambda result: result["score"], reverse=True)
+
+def test_metadata_filter_and_score_threshold(store):
+    store, _ = store
+    
+    listings_only = asyncio.run(store.search_many(
+        ["Service charge is 15 AED per sqft"], "acme", top_k=10, filter={"source": "listings.csv"}
+    ))
+    strong_only = asyncio.run(store.search(LISTINGS[2], "acme", top_k=10, min_score=0.9))
+    
+    assert {result["metadata"]["source"] for result in listings_only} == {"listings.csv"}
+    assert [result["text"] for result in strong_only] == [LISTINGS[2]]
+
+def test_upsert_runs_off_the_event_loop(store, monkeypatch):
+    store, _ = store
+    upsert = store.index.upsert
+    threads = []
+    
+    def recording_upsert(**kwargs):
+        threads.append(threading.current_thread())
+        return upsert(**kwargs)
+    
+    monkeypatch.setattr(store.index, "upsert", recording_upsert)
+    asyncio.run(store.store_embeddings(["Townhouse in Damac Hills 2"], [{"source": "new.csv"}], namespace="acme"))
+    
+    assert threads and threads[0] is not threading.main_thread()